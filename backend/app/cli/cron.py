@@ -1,17 +1,24 @@
 import click
 from flask.cli import with_appcontext
 from app.services.market import (
+    backfill_market_data,
+    import_binance_dumps,
     sync_crypto_asset_with_coingecko,
     sync_top_coingecko_crypto_metadata,
     sync_binance_crypto_market_information,
 )
+from app.services.market.constants import BINANCE_FETCH_MAX_WORKERS
 from app.services.sentiment import (
     collect_youtube_crypto_comments,
     process_crypto_sentiment_analysis,
     collect_crypto_news,
     collect_reddit_crypto_discussions,
+    rebuild_sentiment,
 )
+from app.services.sentiment.engines import SENTIMENT_ENGINES
+from app.services.sentiment.rebuild import REBUILD_WINDOW_DAYS
 
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +36,49 @@ def sync_binance_crypto_market_information_command():
     sync_binance_crypto_market_information()
 
 
+@cron.command("backfill-market")
+@click.option(
+    "--since",
+    required=True,
+    type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%dT%H:%M"]),
+    help="UTC date or time to backfill hourly candles from.",
+)
+@click.option(
+    "--workers",
+    default=8,
+    type=click.IntRange(1, BINANCE_FETCH_MAX_WORKERS, clamp=True),
+    help=(
+        "Number of trading pairs fetched concurrently, at most "
+        f"{BINANCE_FETCH_MAX_WORKERS}."
+    ),
+)
+@with_appcontext
+def backfill_market_data_command(since: datetime, workers: int = 8):
+    """Backfill hourly Binance candles, resuming interrupted runs."""
+    report = backfill_market_data(since, workers=workers)
+    click.echo(
+        f"Backfilled {report.rows} candles for {report.symbols} pairs "
+        f"({report.failed} failed, {report.pages} requests) in "
+        f"{report.seconds:.1f}s: {report.rows_per_second:.0f} rows/s",
+    )
+
+
+@cron.command("import-binance-dumps")
+@click.argument(
+    "directory",
+    type=click.Path(exists=True, file_okay=False),
+)
+@with_appcontext
+def import_binance_dumps_command(directory: str):
+    """Import hourly kline archives downloaded from data.binance.vision."""
+    report = import_binance_dumps(directory)
+    click.echo(
+        f"Imported {report.rows} candles from {report.files} dumps "
+        f"({report.skipped} skipped, {report.failed} failed) in "
+        f"{report.seconds:.1f}s: {report.rows_per_second:.0f} rows/s",
+    )
+
+
 @cron.command("reddit-sentiment-ingest")
 @click.option(
     "--subreddits",
@@ -64,6 +114,61 @@ def process_crypto_sentiment_analysis_command():
     process_crypto_sentiment_analysis()
 
 
+@cron.command("rebuild-sentiment")
+@click.option(
+    "--from",
+    "since",
+    required=True,
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="UTC date of the first day to rebuild.",
+)
+@click.option(
+    "--to",
+    "until",
+    required=True,
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="UTC date to rebuild up to, not included.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of days processed in parallel, all cores by default.",
+)
+@click.option(
+    "--window-days",
+    default=REBUILD_WINDOW_DAYS,
+    help="Days of social data each rebuilt row covers.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(list(SENTIMENT_ENGINES)),
+    default=None,
+    help="Score the social data again with this engine first.",
+)
+@with_appcontext
+def rebuild_sentiment_command(
+    since: datetime,
+    until: datetime,
+    workers: int | None = None,
+    window_days: int = REBUILD_WINDOW_DAYS,
+    engine: str | None = None,
+):
+    """Rebuild daily aggregate sentiment history, replacing stored days."""
+    report = rebuild_sentiment(
+        since,
+        until,
+        workers=workers,
+        window_days=window_days,
+        engine=engine,
+    )
+    click.echo(
+        f"Rebuilt {report.rows} aggregates for {report.days} days "
+        f"({report.failed} failed, {report.scored} texts scored) in "
+        f"{report.seconds:.1f}s",
+    )
+
+
 @cron.command("sync-crypto-asset")
 @with_appcontext
 def sync_crypto_asset_with_coingecko_command():
@@ -3,6 +3,10 @@ from .user import InvestorType, SocialImpact, TimeScore
 from .survey import SurveyCategory, ScoreType
 
 TOP_CRYPTOCURRENCIES_LIMIT = 150
+# Interval market data is ingested at. Coarser intervals are rolled up from
+# it on write and must be whole multiples of it.
+MARKET_BASE_INTERVAL = "1h"
+MARKET_ROLLUP_INTERVALS = ("4h", "1d")
 
 __all__ = [
     "INVESTOR_PROMPTS",
@@ -12,4 +16,6 @@ __all__ = [
     "SurveyCategory",
     "ScoreType",
     "TOP_CRYPTOCURRENCIES_LIMIT",
+    "MARKET_BASE_INTERVAL",
+    "MARKET_ROLLUP_INTERVALS",
 ]
@@ -8,11 +8,16 @@ from .crypto import (
     CryptoSource,
     CryptoMarketData,
     CryptoTechnicalIndicator,
+    CryptoIndicatorState,
+    CryptoBackfillCheckpoint,
+    CryptoImportedDump,
     CryptoRedditData,
     CryptoCoingeckoSentimentData,
     CryptoSentimentAggregateData,
+    CryptoSentimentBucket,
     CryptoNewsData,
 )
+from .sentiment import CachedSentimentScore
 from .youtube import YoutubeComment, YoutubeCommentAnalysis
 from .watchlist import Watchlist
 
@@ -26,9 +31,14 @@ __all__ = [
     "CryptoMarketData",
     "CryptoNewsData",
     "CryptoTechnicalIndicator",
+    "CryptoIndicatorState",
+    "CryptoBackfillCheckpoint",
+    "CryptoImportedDump",
     "CryptoRedditData",
     "CryptoCoingeckoSentimentData",
     "CryptoSentimentAggregateData",
+    "CryptoSentimentBucket",
+    "CachedSentimentScore",
     "YoutubeComment",
     "YoutubeCommentAnalysis",
     "Watchlist",
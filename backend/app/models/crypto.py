@@ -6,13 +6,20 @@ from sqlalchemy import (
     Numeric,
     PrimaryKeyConstraint,
     String,
+    false,
     func,
     select,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.constants import MARKET_BASE_INTERVAL
 from app.extensions import db
 
-from app.models.mixins import IdentityMixin, TimescaleMixin
+from app.models.mixins import (
+    AuditTimestampMixin,
+    IdentityMixin,
+    SentimentScoreMixin,
+    TimescaleMixin,
+)
 from app.models.watchlist import Watchlist
 from app.models.base import BaseModel
 
@@ -89,7 +96,7 @@ class CryptoMarketData(BaseModel, TimescaleMixin):
     )
 
 
-class CryptoRedditData(BaseModel):
+class CryptoRedditData(BaseModel, SentimentScoreMixin):
     """
     Represents raw social data obtained for a cryptocurrency from reddit.
     """
@@ -170,6 +177,38 @@ class CryptoSentimentAggregateData(BaseModel, TimescaleMixin):
         return float(result) if result is not None else 0.0
 
 
+class CryptoSentimentBucket(BaseModel, TimescaleMixin):
+    """
+    Represents the confidence-weighted sentiment sums of a symbol's social
+    data in the hour starting at `timestamp`. The sums are additive, so the
+    sentiment of any window is a sum over its hourly buckets.
+    """
+
+    symbol: Mapped[str] = mapped_column(
+        ForeignKey("crypto_asset.symbol"),
+        nullable=False,
+    )
+    positive_sum: Mapped[float] = mapped_column(nullable=False)
+    neutral_sum: Mapped[float] = mapped_column(nullable=False)
+    negative_sum: Mapped[float] = mapped_column(nullable=False)
+    compound_sum: Mapped[float] = mapped_column(nullable=False)
+    total_weight: Mapped[float] = mapped_column(nullable=False)
+    # Weights of the data points with positive, negative and neutral
+    # compound scores
+    positive_count: Mapped[float] = mapped_column(nullable=False)
+    negative_count: Mapped[float] = mapped_column(nullable=False)
+    neutral_count: Mapped[float] = mapped_column(nullable=False)
+    data_points: Mapped[int] = mapped_column(nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
+
+    __table_args__ = (PrimaryKeyConstraint("symbol", "timestamp"),)
+
+
 class CryptoTechnicalIndicator(BaseModel):
     """
     Represents the EMA, MACD, and RSI values for a crypto asset
@@ -198,7 +237,10 @@ class CryptoTechnicalIndicator(BaseModel):
         """
         result = (
             db.session.query(cls)
-            .filter(cls.symbol == symbol, cls.interval == "1h")
+            .filter(
+                cls.symbol == symbol,
+                cls.interval == MARKET_BASE_INTERVAL,
+            )
             .order_by(cls.timestamp.desc())
             .first()
         )
@@ -209,7 +251,98 @@ class CryptoTechnicalIndicator(BaseModel):
         return result
 
 
-class CryptoNewsData(BaseModel):
+class CryptoIndicatorState(BaseModel):
+    """
+    Represents the running EMA, RSI and MACD state of a symbol's candle
+    series, so indicators can be advanced by new candles only.
+    """
+
+    symbol: Mapped[str] = mapped_column(
+        ForeignKey("crypto_asset.symbol"),
+        nullable=False,
+    )
+    interval: Mapped[str] = mapped_column(
+        String(8),
+        nullable=False,
+    )  # e.g. '1h', '1d'
+    timestamp: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )  # last candle folded into the state
+    candle_count: Mapped[int] = mapped_column(nullable=False)
+    last_close: Mapped[float] = mapped_column(nullable=False)
+    ema: Mapped[float] = mapped_column(nullable=False)
+    avg_gain: Mapped[float] = mapped_column(nullable=False)
+    avg_loss: Mapped[float] = mapped_column(nullable=False)
+    macd_fast: Mapped[float] = mapped_column(nullable=False)
+    macd_slow: Mapped[float] = mapped_column(nullable=False)
+    macd_signal: Mapped[float] = mapped_column(nullable=True)
+
+    __table_args__ = (PrimaryKeyConstraint("symbol", "interval"),)
+
+
+class CryptoBackfillCheckpoint(BaseModel, AuditTimestampMixin):
+    """
+    Records how far a historical backfill of a symbol's candles has got, so
+    an interrupted backfill resumes where it stopped.
+    """
+
+    symbol: Mapped[str] = mapped_column(
+        ForeignKey("crypto_asset.symbol"),
+        nullable=False,
+    )
+    interval: Mapped[str] = mapped_column(
+        String(8),
+        nullable=False,
+    )  # e.g. '1h'
+    since: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )  # start of the backfilled range
+    cursor: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )  # open time of the next candle to fetch
+    # Set while backfilled candles are stored whose rollups and indicators
+    # have not been rebuilt yet
+    needs_rebuild: Mapped[bool] = mapped_column(
+        server_default=false(),
+        nullable=False,
+    )
+
+    __table_args__ = (PrimaryKeyConstraint("symbol", "interval"),)
+
+
+class CryptoImportedDump(BaseModel):
+    """
+    Records a Binance kline archive that was imported into
+    CryptoMarketData, so it is not imported again.
+    """
+
+    filename: Mapped[str] = mapped_column(primary_key=True)
+    symbol: Mapped[str] = mapped_column(
+        ForeignKey("crypto_asset.symbol"),
+        nullable=False,
+    )
+    interval: Mapped[str] = mapped_column(
+        String(8),
+        nullable=False,
+    )  # e.g. '1h'
+    rows: Mapped[int] = mapped_column(nullable=False)  # new candles stored
+    imported_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    # Open time of the first new candle while its rollups and indicators
+    # have not been rebuilt yet
+    rebuild_since: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+class CryptoNewsData(BaseModel, SentimentScoreMixin):
     """
     Represents raw news data obtained for a cryptocurrency.
     """
@@ -224,6 +357,13 @@ class CryptoNewsData(BaseModel):
     source_url: Mapped[str] = mapped_column()
     url_image: Mapped[str] = mapped_column()
     content: Mapped[str] = mapped_column()
+    # Articles are stored up to days after they were published
+    ingested_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
     __table_args__ = (
         PrimaryKeyConstraint("symbol", "timestamp", "source_url"),
     )
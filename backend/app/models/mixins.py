@@ -50,3 +50,15 @@ class TimescaleMixin:
         nullable=False,
         index=True,
     )
+
+
+class SentimentScoreMixin:
+    """
+    Adds the VADER sentiment scores of a text, computed once when the row
+    is ingested. Rows stored before scoring existed have NULL scores.
+    """
+
+    sentiment_pos: Mapped[float] = mapped_column(nullable=True)
+    sentiment_neu: Mapped[float] = mapped_column(nullable=True)
+    sentiment_neg: Mapped[float] = mapped_column(nullable=True)
+    sentiment_compound: Mapped[float] = mapped_column(nullable=True)
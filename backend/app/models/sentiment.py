@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+from app.models.mixins import SentimentScoreMixin
+
+
+class CachedSentimentScore(BaseModel, SentimentScoreMixin):
+    """
+    Represents the VADER scores of a text, keyed by the md5 hash of the
+    normalised text, so identical texts are only ever scored once.
+    """
+
+    text_hash: Mapped[str] = mapped_column(String(32), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -1,7 +1,7 @@
 from app.extensions import db
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.crypto import CryptoAsset
-from app.models.mixins import TimescaleMixin
+from app.models.mixins import SentimentScoreMixin, TimescaleMixin
 from sqlalchemy import (
     Index,
     PrimaryKeyConstraint,
@@ -19,7 +19,7 @@ from typing import Optional
 from app.models.base import BaseModel
 
 
-class YoutubeComment(BaseModel):
+class YoutubeComment(BaseModel, SentimentScoreMixin):
     comment_id: Mapped[str] = mapped_column(String(50), primary_key=True)
     video_id: Mapped[str] = mapped_column(String(50), nullable=False)
     video_title: Mapped[str] = mapped_column(String(255), nullable=False)
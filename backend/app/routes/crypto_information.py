@@ -15,10 +15,19 @@ from app.schemas.crypto_schema import CryptoAssetSchema
 from datetime import timedelta, datetime
 from app.utils.decorators import retry_request
 from app.env import NEWS_API_KEY_FRONTEND
+from app.constants import MARKET_BASE_INTERVAL
 import requests
 
 crypto_bp = Blueprint('crypto', __name__)
 
+# Time span and candle interval charted for each price history view. Any
+# other view charts the full history from daily candles.
+PRICE_HISTORY_VIEWS = {
+    '1D': (timedelta(days=1), MARKET_BASE_INTERVAL),
+    '1M': (timedelta(days=30), "4h"),
+}
+PRICE_HISTORY_DEFAULT_VIEW = (None, "1d")
+
 
 @crypto_bp.route("/latest_indicators", methods=["GET"])
 @retry_request
@@ -31,7 +40,7 @@ def get_latest_indicators():
     stmt = (
         select(CryptoTechnicalIndicator)
         .where(CryptoTechnicalIndicator.symbol == symbol)
-        .where(CryptoTechnicalIndicator.interval == "1h")
+        .where(CryptoTechnicalIndicator.interval == MARKET_BASE_INTERVAL)
         .order_by(desc(CryptoTechnicalIndicator.timestamp))
         .limit(1)
     )
@@ -93,17 +102,21 @@ def get_top_ranking(set_rankings=10):
 
     try:
         # Create a subquery to get the latest price for each symbol
-        latest_price_subquery = select(
-            CryptoMarketData.symbol,
-            CryptoMarketData.price.label('latest_price'),
-            CryptoMarketData.ingested_at.label('latest_timestamp'),
-            func.row_number()
-            .over(
-                partition_by=CryptoMarketData.symbol,
-                order_by=CryptoMarketData.timestamp.desc(),
+        latest_price_subquery = (
+            select(
+                CryptoMarketData.symbol,
+                CryptoMarketData.price.label('latest_price'),
+                CryptoMarketData.ingested_at.label('latest_timestamp'),
+                func.row_number()
+                .over(
+                    partition_by=CryptoMarketData.symbol,
+                    order_by=CryptoMarketData.timestamp.desc(),
+                )
+                .label('rn'),
             )
-            .label('rn'),
-        ).subquery()
+            .where(CryptoMarketData.interval == MARKET_BASE_INTERVAL)
+            .subquery()
+        )
 
         # Filter to get only the latest price per symbol
         latest_prices = (
@@ -139,6 +152,7 @@ def get_top_ranking(set_rankings=10):
                 CryptoMarketData.symbol == latest_prices.c.symbol,
             )
             .where(
+                CryptoMarketData.interval == MARKET_BASE_INTERVAL,
                 CryptoMarketData.timestamp
                 >= latest_prices.c.latest_timestamp - timedelta(hours=25),
                 CryptoMarketData.timestamp
@@ -227,10 +241,16 @@ def get_price_history():
     if not symbol:
         return jsonify({"error": "Symbol parameter is required"}), 400
 
+    span, candle_interval = PRICE_HISTORY_VIEWS.get(
+        interval,
+        PRICE_HISTORY_DEFAULT_VIEW,
+    )
+
     # Get the latest timestamp for the given symbol
     latest_stmt = (
         select(CryptoMarketData.timestamp)
         .where(CryptoMarketData.symbol == symbol)
+        .where(CryptoMarketData.interval == candle_interval)
         .order_by(desc(CryptoMarketData.timestamp))
         .limit(1)
     )
@@ -242,12 +262,7 @@ def get_price_history():
 
     # Always set end_dt to latest_result
     end_dt = latest_result
-    if interval == '1D':
-        start_dt = end_dt - timedelta(days=1)
-    elif interval == '1M':
-        start_dt = end_dt - timedelta(days=30)
-    else:
-        start_dt = None
+    start_dt = end_dt - span if span else None
 
     print(f"Fetching price history for {symbol} from {start_dt} to {end_dt}")
     sentiment_join_condition = and_(
@@ -265,12 +280,14 @@ def get_price_history():
             CryptoSentimentAggregateData.normalised_up_percentage,
         )
         .where(CryptoMarketData.symbol == symbol)
+        .where(CryptoMarketData.interval == candle_interval)
         .outerjoin(
             CryptoTechnicalIndicator,
             and_(
                 CryptoMarketData.symbol == CryptoTechnicalIndicator.symbol,
                 CryptoMarketData.timestamp
                 == CryptoTechnicalIndicator.timestamp,
+                CryptoMarketData.interval == CryptoTechnicalIndicator.interval,
             ),
         )
         .outerjoin(CryptoSentimentAggregateData, sentiment_join_condition)
@@ -1,4 +1,6 @@
 from .binance import sync_binance_crypto_market_information
+from .backfill import backfill_market_data
+from .dumps import import_binance_dumps
 from .coingecko import (
     sync_top_coingecko_crypto_metadata,
     sync_crypto_asset_with_coingecko,
@@ -7,6 +9,8 @@ from .coingecko import (
 
 __all__ = [
     "sync_binance_crypto_market_information",
+    "backfill_market_data",
+    "import_binance_dumps",
     "sync_top_coingecko_crypto_metadata",
     "sync_crypto_asset_with_coingecko",
 ]
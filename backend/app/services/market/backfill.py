@@ -0,0 +1,271 @@
+import queue
+import threading
+import time
+import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Iterator
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.constants import MARKET_BASE_INTERVAL
+from app.extensions import db
+from app.models import CryptoBackfillCheckpoint
+from app.services.market.binance import (
+    fetch_binance_price_history,
+    get_binance_source,
+    get_tradable_cryptos,
+    rollup_and_calculate_indicators,
+    store_crypto_market_data,
+)
+from app.services.market.constants import (
+    BINANCE_FETCH_MAX_WORKERS,
+    BINANCE_KLINES_MAX_LIMIT,
+)
+from app.utils import convert_timestamp_to_utc
+from app.utils.decorators import transactional
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class BackfillReport:
+    symbols: int = 0
+    failed: int = 0
+    pages: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def iter_kline_pages(
+    binance_pair: str,
+    start: datetime,
+    end: datetime,
+    interval: str = MARKET_BASE_INTERVAL,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields pages of candles opening between `start` and `end`, oldest first,
+    one klines request per page. Requests wait for the Binance client's
+    weight budget, so many pairs can be paged through at once.
+    """
+    step = pd.Timedelta(interval)
+    cursor = pd.Timestamp(start)
+    while cursor <= end:
+        page = fetch_binance_price_history(
+            binance_pair,
+            interval=interval,
+            limit=BINANCE_KLINES_MAX_LIMIT,
+            start_time=cursor.to_pydatetime(),
+            end_time=end,
+        )
+        if page.empty:
+            return
+        yield page
+        if len(page) < BINANCE_KLINES_MAX_LIMIT:
+            return
+        cursor = page.index[-1] + step
+
+
+def _offer(pages: queue.Queue, item, stop: threading.Event) -> bool:
+    # Blocks while the queue is full, giving up once the backfill stops
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _fetch_pages(
+    binance_pair: str,
+    start: datetime,
+    end: datetime,
+    pages: queue.Queue,
+    stop: threading.Event,
+):
+    try:
+        for page in iter_kline_pages(binance_pair, start, end):
+            if not _offer(pages, (binance_pair, page), stop):
+                return
+        _offer(pages, (binance_pair, None), stop)
+    except Exception as e:
+        _offer(pages, (binance_pair, e), stop)
+
+
+def get_backfill_checkpoints(
+    symbols: list[str],
+    interval: str = MARKET_BASE_INTERVAL,
+) -> dict[str, CryptoBackfillCheckpoint]:
+    stmt = select(CryptoBackfillCheckpoint).where(
+        (CryptoBackfillCheckpoint.symbol.in_(symbols))
+        & (CryptoBackfillCheckpoint.interval == interval),
+    )
+    return {
+        checkpoint.symbol: checkpoint
+        for checkpoint in db.session.scalars(stmt)
+    }
+
+
+@transactional
+def store_backfill_page(
+    symbol: str,
+    source_id: int,
+    page: pd.DataFrame,
+    since: datetime,
+    interval: str = MARKET_BASE_INTERVAL,
+) -> int:
+    """
+    Stores one page of backfilled candles and moves the symbol's checkpoint
+    past it in the same transaction, flagging the symbol for a rebuild if
+    any candle was new. Returns the number of new candles.
+    """
+    cursor = (page.index[-1] + pd.Timedelta(interval)).to_pydatetime()
+    result = store_crypto_market_data(symbol, source_id, page, interval)
+    stmt = insert(CryptoBackfillCheckpoint).values(
+        symbol=symbol,
+        interval=interval,
+        since=since,
+        cursor=cursor,
+        needs_rebuild=result.inserted > 0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['symbol', 'interval'],
+        set_={
+            'since': stmt.excluded.since,
+            'cursor': stmt.excluded.cursor,
+            'needs_rebuild': (
+                CryptoBackfillCheckpoint.needs_rebuild
+                | stmt.excluded.needs_rebuild
+            ),
+            'updated_at': func.now(),
+        },
+    )
+    db.session.execute(stmt)
+    return result.inserted
+
+
+def backfill_market_data(
+    since: datetime,
+    workers: int = BINANCE_FETCH_MAX_WORKERS,
+    until: datetime | None = None,
+) -> BackfillReport:
+    """
+    Backfills hourly candles of the top cryptocurrencies from `since`.
+
+    Symbols are paged through in parallel by up to `workers` threads, at
+    most BINANCE_FETCH_MAX_WORKERS, within the Binance request weight
+    limit, while this thread bulk inserts each page
+    and checkpoints it. A symbol whose checkpoint already covers `since`
+    resumes from where it stopped. Once all pages are stored the rollups
+    and indicators of the symbols with new candles are rebuilt, including
+    those stored by an earlier run that stopped before its rebuild.
+    """
+    started = time.perf_counter()
+    report = BackfillReport()
+    # More threads than the shared client has connections would overflow
+    # its pool, and fill its hedge executor with primary requests
+    workers = min(workers, BINANCE_FETCH_MAX_WORKERS)
+    since = convert_timestamp_to_utc(since).to_pydatetime()
+    end = pd.Timestamp(until or datetime.now(timezone.utc)).to_pydatetime()
+
+    symbols = {
+        binance_pair: crypto.symbol
+        for binance_pair, crypto in get_tradable_cryptos().items()
+    }
+    source_id = get_binance_source().id
+    checkpoints = get_backfill_checkpoints(list(symbols.values()))
+    starts = {}
+    for binance_pair, symbol in symbols.items():
+        checkpoint = checkpoints.get(symbol)
+        start = since
+        if checkpoint is not None and checkpoint.since <= since:
+            start = max(since, checkpoint.cursor)
+        if start <= end:
+            starts[binance_pair] = start
+    # Rebuilds left over by an earlier run start where that run started
+    unfinished = [
+        checkpoint.since
+        for checkpoint in checkpoints.values()
+        if checkpoint.needs_rebuild
+    ]
+    rebuild_since = min([since, *unfinished])
+    # Each page is committed on its own from here on
+    db.session.commit()
+
+    logger.info(f"Backfilling {len(starts)} pairs from {since}")
+    if not starts and not unfinished:
+        return report
+
+    pages = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    pending = len(starts)
+    inserted = defaultdict(int)
+    with ThreadPoolExecutor(
+        max_workers=min(workers, pending) or 1,
+    ) as executor:
+        for binance_pair, start in starts.items():
+            executor.submit(
+                _fetch_pages,
+                binance_pair,
+                start,
+                end,
+                pages,
+                stop,
+            )
+        try:
+            while pending:
+                binance_pair, page = pages.get()
+                symbol = symbols[binance_pair]
+                if isinstance(page, Exception):
+                    logger.error(f"Error backfilling {binance_pair}: {page}")
+                    report.failed += 1
+                    pending -= 1
+                elif page is None:
+                    report.symbols += 1
+                    pending -= 1
+                else:
+                    report.pages += 1
+                    inserted[symbol] += store_backfill_page(
+                        symbol,
+                        source_id,
+                        page,
+                        since,
+                    )
+        finally:
+            stop.set()
+    report.rows = sum(inserted.values())
+
+    # The flags are cleared in the rebuild's transaction, so a run that
+    # stops before it commits leaves them for the next run
+    rebuilt = db.session.scalars(
+        update(CryptoBackfillCheckpoint)
+        .where(
+            CryptoBackfillCheckpoint.symbol.in_(list(symbols.values()))
+            & (CryptoBackfillCheckpoint.interval == MARKET_BASE_INTERVAL)
+            & CryptoBackfillCheckpoint.needs_rebuild,
+        )
+        .values(needs_rebuild=False)
+        .returning(CryptoBackfillCheckpoint.symbol),
+    ).all()
+    rollup_and_calculate_indicators(
+        rebuilt,
+        source_id,
+        backfilled_since=rebuild_since,
+    )
+    db.session.commit()
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"Backfilled {report.rows} candles for {report.symbols} pairs "
+        f"in {report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s), "
+        f"{report.failed} failed",
+    )
+    return report
@@ -1,36 +1,69 @@
-import requests
+import threading
+import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from decimal import Decimal
-from sqlalchemy import select
+from sqlalchemy import String, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 
+from app.env import CELERY_BROKER_URL
 from app.extensions import db
 from app.models import (
     CryptoAsset,
     CryptoSource,
     CryptoMarketData,
     CryptoTechnicalIndicator,
+    CryptoIndicatorState,
 )
-from app.utils import convert_timestamp_to_utc
+from app.utils.bulk import BulkInsertResult, copy_dataframe
+from app.utils.cache import ReferenceSetCache
 from logging import getLogger
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
 
-from app.services.market.constants import BINANCE_BASE_URL
-from app.constants import TOP_CRYPTOCURRENCIES_LIMIT
+from app.services.market.indicators import (
+    STATE_COLUMNS,
+    advance_indicators,
+    indicators_to_rows,
+)
+from app.services.market.binance_client import get_binance_client
+from app.services.market.constants import (
+    BINANCE_EXCHANGE_INFO_WEIGHT,
+    BINANCE_FETCH_MAX_WORKERS,
+    BINANCE_KLINES_MAX_LIMIT,
+    BINANCE_KLINES_WEIGHT,
+    BINANCE_SYMBOLS_CACHE_TTL_S,
+    BINANCE_SYMBOLS_MISS_REFRESH_S,
+    BINANCE_TICKER_PRICE_WEIGHT,
+)
+from app.constants import (
+    MARKET_BASE_INTERVAL,
+    MARKET_ROLLUP_INTERVALS,
+    TOP_CRYPTOCURRENCIES_LIMIT,
+)
 from app.utils.decorators import transactional
 
 
 logger = getLogger(__name__)
 
+# Rolled up candles are aligned to whole intervals since the Unix epoch
+ROLLUP_ORIGIN = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+_symbol_cache = None
+_unlisted_cache = None
+_symbol_cache_lock = threading.Lock()
+
 
 def fetch_binance_symbols() -> list[str]:
     """
     Fetches the list of trading pairs (symbols) available on the Binance exchange.
     """
-    url = f"{BINANCE_BASE_URL}/api/v3/exchangeInfo?"
-    response = requests.get(url)
-    data = response.json()
+    # Leave out halted pairs and per-pair permission sets, which make up
+    # most of the document
+    data = get_binance_client().get(
+        "/api/v3/exchangeInfo",
+        {"symbolStatus": "TRADING", "showPermissionSets": "false"},
+        weight=BINANCE_EXCHANGE_INFO_WEIGHT,
+    )
     symbols = []
 
     for item in data['symbols']:
@@ -38,18 +71,86 @@ def fetch_binance_symbols() -> list[str]:
     return symbols
 
 
+def _reference_set_cache(key: str) -> ReferenceSetCache:
+    redis_url = (
+        CELERY_BROKER_URL
+        if CELERY_BROKER_URL.startswith(("redis://", "rediss://"))
+        else None
+    )
+    return ReferenceSetCache(
+        key,
+        ttl=BINANCE_SYMBOLS_CACHE_TTL_S,
+        redis_url=redis_url,
+    )
+
+
+def get_binance_symbol_cache() -> ReferenceSetCache:
+    """
+    Returns the cache of tradable USDT pairs. It lives in Redis when Celery
+    uses a Redis broker, so all workers share it, and on local disk
+    otherwise.
+    """
+    global _symbol_cache
+    with _symbol_cache_lock:
+        if _symbol_cache is None:
+            _symbol_cache = _reference_set_cache("binance_usdt_pairs")
+        return _symbol_cache
+
+
+def get_binance_unlisted_cache() -> ReferenceSetCache:
+    """
+    Returns the cache of the top cryptocurrencies' USDT pairs known not to
+    be listed on Binance, kept alongside the cache of tradable pairs.
+    """
+    global _unlisted_cache
+    with _symbol_cache_lock:
+        if _unlisted_cache is None:
+            _unlisted_cache = _reference_set_cache("binance_unlisted_pairs")
+        return _unlisted_cache
+
+
+def get_binance_usdt_pairs(max_age: float | None = None) -> frozenset[str]:
+    """
+    Returns the tradable USDT pairs on Binance, from the cache while it is
+    fresh and younger than `max_age` seconds, otherwise from exchangeInfo.
+    """
+    cache = get_binance_symbol_cache()
+    cached = cache.get()
+    if cached is not None and (
+        max_age is None or time.time() - cached.fetched_at < max_age
+    ):
+        return cached.values
+
+    pairs = [
+        symbol
+        for symbol in fetch_binance_symbols()
+        if symbol.endswith("USDT")
+    ]
+    return cache.set(pairs).values
+
+
 def fetch_binance_price_history(
     symbol: str,
     interval: str = "1h",
     limit: int = 192,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
 ) -> pd.DataFrame:
     """
     Fetches price history of crypto/usdt pair on binance in hourly
-    candles for last 7 days
+    candles for last 7 days, or the candles opening between `start_time`
+    and `end_time` when given.
     """
-    url = f"{BINANCE_BASE_URL}/api/v3/klines?"
     params = {"symbol": symbol, "interval": interval, "limit": limit}
-    data = requests.get(url, params=params).json()
+    if start_time is not None:
+        params["startTime"] = int(start_time.timestamp() * 1000)
+    if end_time is not None:
+        params["endTime"] = int(end_time.timestamp() * 1000)
+    data = get_binance_client().get(
+        "/api/v3/klines",
+        params,
+        weight=BINANCE_KLINES_WEIGHT,
+    )
 
     df = pd.DataFrame(
         data,
@@ -74,139 +175,456 @@ def fetch_binance_price_history(
     return df[['close']]
 
 
+def fetch_binance_price_histories(
+    symbols: list[str],
+    kline_params: dict[str, dict] | None = None,
+    max_workers: int = BINANCE_FETCH_MAX_WORKERS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetches price history for many trading pairs concurrently.
+
+    `kline_params` maps a pair to extra keyword arguments for
+    `fetch_binance_price_history`, e.g. from `incremental_kline_params`.
+    Requests are spread over a bounded thread pool sharing the Binance
+    client's connections and weight budget. Pairs that fail to fetch are
+    logged and left out of the result.
+    """
+    histories = {}
+    if not symbols:
+        return histories
+    kline_params = kline_params or {}
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(symbols)),
+    ) as executor:
+        future_to_symbol = {
+            executor.submit(
+                fetch_binance_price_history,
+                symbol,
+                **kline_params.get(symbol, {}),
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(future_to_symbol):
+            symbol = future_to_symbol[future]
+            try:
+                histories[symbol] = future.result()
+            except Exception as e:
+                logger.error(f"Error fetching price history for {symbol}: {e}")
+
+    logger.info(f"Fetched price history for {len(histories)} pairs")
+    return histories
+
+
+def incremental_kline_params(
+    high_water_mark: datetime | None,
+    interval: str = MARKET_BASE_INTERVAL,
+    now: datetime | None = None,
+) -> dict | None:
+    """
+    Builds the klines request that continues after the last stored candle.
+
+    Returns an empty dict when nothing is stored yet (fetch the default
+    window) and None when the stored series is already up to date. Gaps
+    longer than one request are capped to the most recent
+    BINANCE_KLINES_MAX_LIMIT candles.
+    """
+    if high_water_mark is None:
+        return {}
+
+    step = pd.Timedelta(interval)
+    now = pd.Timestamp(now or datetime.now(timezone.utc)).floor(step)
+    start = pd.Timestamp(high_water_mark).tz_convert('UTC') + step
+    missing = (now - start) // step + 1
+    if missing < 1:
+        return None
+
+    if missing > BINANCE_KLINES_MAX_LIMIT:
+        logger.warning(
+            f"Gap of {missing} candles since {high_water_mark}, "
+            f"backfilling the latest {BINANCE_KLINES_MAX_LIMIT} only",
+        )
+        missing = BINANCE_KLINES_MAX_LIMIT
+        start = now - (missing - 1) * step
+
+    return {"start_time": start.to_pydatetime(), "limit": int(missing)}
+
+
 def get_binance_current_price(symbol: str) -> float:
     """
     Fetches the current price of a cryptocurrency from the Binance API.
     """
-    url = f"{BINANCE_BASE_URL}/api/v3/ticker/price"
-    params = {"symbol": symbol}
-    response = requests.get(url, params=params)
-
-    data = response.json()
+    data = get_binance_client().get(
+        "/api/v3/ticker/price",
+        {"symbol": symbol},
+        weight=BINANCE_TICKER_PRICE_WEIGHT,
+    )
     price = float(data['price'])
     return price
 
 
 @transactional
-def calculate_and_store_indicators(symbol: str, df: pd.DataFrame):
+def calculate_and_store_indicators(
+    symbols: list[str],
+    source_id: int,
+    interval: str = MARKET_BASE_INTERVAL,
+    until: datetime | None = None,
+) -> BulkInsertResult:
     """
-    Calculates ema, rsi, and macd based of hourly close candles.
+    Calculates ema, rsi, and macd based of close candles at `interval`.
+
+    Each symbol's stored indicator state is advanced by the candles stored
+    after it, so only new indicator rows are computed and written. Symbols
+    without state are folded in from their first stored candle. Candles at
+    or after `until` are left for a later run.
     """
-    # default previous 14 periods used for calculations
-    df['ema'] = EMAIndicator(close=df['close']).ema_indicator()
-    df['rsi'] = RSIIndicator(close=df['close']).rsi()
-    macd = MACD(close=df['close'])
-    df['macd'] = macd.macd()
+    if not symbols:
+        return BulkInsertResult()
+
+    states = get_indicator_states(symbols, interval)
+    fresh = [symbol for symbol in symbols if symbol not in states.index]
+    continuing = [symbol for symbol in symbols if symbol in states.index]
+    frames = []
+    if fresh:
+        frames.append(get_close_price_matrix(fresh, source_id, interval))
+    if continuing:
+        frames.append(
+            get_close_price_matrix(
+                continuing,
+                source_id,
+                interval,
+                since=states['timestamp'].min(),
+            ),
+        )
+    close = pd.concat(frames, axis=1)
+    if until is not None:
+        close = close[close.index < until]
+
+    # Drop candles already folded into each symbol's state
+    folded_until = states['timestamp'].reindex(close.columns)
+    folded = close.index.values[:, None] <= folded_until.values[None, :]
+    close = close.mask(folded).dropna(how='all')
+    if close.empty:
+        return BulkInsertResult()
+
+    new_states, indicators = advance_indicators(
+        states.drop(columns='timestamp'),
+        close,
+    )
+    new_states['timestamp'] = close.apply(pd.Series.last_valid_index)
+    store_indicator_states(new_states.dropna(subset=['timestamp']), interval)
+
+    rows = indicators_to_rows(indicators)
+    rows.insert(1, 'interval', interval)
+    result = copy_dataframe(CryptoTechnicalIndicator, rows)
+    logger.info(
+        f"Stored {result.inserted} {interval} indicators for "
+        f"{len(symbols)} symbols, skipped {result.skipped} existing",
+    )
+    return result
 
-    ta_stmt = select(CryptoTechnicalIndicator.timestamp).where(
-        (CryptoTechnicalIndicator.symbol == symbol)
-        & (CryptoTechnicalIndicator.interval == "1h"),
+
+def get_indicator_states(
+    symbols: list[str],
+    interval: str = MARKET_BASE_INTERVAL,
+) -> pd.DataFrame:
+    """
+    Loads stored indicator state for `symbols`, indexed by symbol.
+    """
+    columns = ['symbol', 'timestamp', *STATE_COLUMNS]
+    stmt = select(
+        *(getattr(CryptoIndicatorState, column) for column in columns),
+    ).where(
+        (CryptoIndicatorState.symbol.in_(symbols))
+        & (CryptoIndicatorState.interval == interval),
     )
-    existing_timestamps = set(db.session.scalars(ta_stmt).all())
-    existing_timestamps = {
-        convert_timestamp_to_utc(ts) for ts in existing_timestamps
-    }
+    states = pd.DataFrame(db.session.execute(stmt).all(), columns=columns)
+    states['timestamp'] = pd.to_datetime(states['timestamp'], utc=True)
+    return states.set_index('symbol')
 
-    logger.info(f"Found {len(existing_timestamps)} existing timestamps.")
-    for timestamp, row in df.iterrows():
-        if pd.isna(row['ema']) or pd.isna(row['rsi']) or pd.isna(row['macd']):
-            continue
 
-        norm_ts = convert_timestamp_to_utc(timestamp)
-        if norm_ts in existing_timestamps:
-            continue
+def store_indicator_states(
+    states: pd.DataFrame,
+    interval: str = MARKET_BASE_INTERVAL,
+):
+    """
+    Upserts indicator state rows indexed by symbol.
+    """
+    if states.empty:
+        return
 
-        db.session.add(
-            CryptoTechnicalIndicator(
-                symbol=symbol,
-                interval="1h",
-                timestamp=timestamp,
-                ema=Decimal(row['ema']),
-                rsi=Decimal(row['rsi']),
-                macd=Decimal(row['macd']),
-            ),
+    records = (
+        states.astype(object)
+        .where(states.notna(), None)
+        .rename_axis('symbol')
+        .reset_index()
+        .assign(interval=interval)
+        .to_dict('records')
+    )
+    stmt = insert(CryptoIndicatorState).values(records)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['symbol', 'interval'],
+        set_={
+            column: stmt.excluded[column]
+            for column in ['timestamp', *STATE_COLUMNS]
+        },
+    )
+    db.session.execute(stmt)
+
+
+def get_market_high_water_marks(
+    source_id: int,
+    interval: str = MARKET_BASE_INTERVAL,
+) -> dict[str, datetime]:
+    """
+    Returns the timestamp of the latest stored candle for each symbol.
+    """
+    stmt = (
+        select(CryptoMarketData.symbol, func.max(CryptoMarketData.timestamp))
+        .where(
+            (CryptoMarketData.source_id == source_id)
+            & (CryptoMarketData.interval == interval),
         )
-    logger.info(f"Finished storing hourly indicators for {symbol}")
+        .group_by(CryptoMarketData.symbol)
+    )
+    return dict(db.session.execute(stmt).all())
 
 
-def get_existing_market_timestamps(symbol: str, source_id: int) -> set:
-    ts_stmt = select(CryptoMarketData.timestamp).where(
-        (CryptoMarketData.symbol == symbol)
+def get_close_price_matrix(
+    symbols: list[str],
+    source_id: int,
+    interval: str = MARKET_BASE_INTERVAL,
+    since: datetime | None = None,
+) -> pd.DataFrame:
+    """
+    Loads stored closes at `interval`, from `since` onwards when given, as a
+    wide frame with one row per candle and one column per symbol.
+    """
+    stmt = select(
+        CryptoMarketData.timestamp,
+        CryptoMarketData.symbol,
+        CryptoMarketData.price,
+    ).where(
+        (CryptoMarketData.symbol.in_(symbols))
         & (CryptoMarketData.source_id == source_id)
-        & (CryptoMarketData.interval == "1h"),
+        & (CryptoMarketData.interval == interval),
+    )
+    if since is not None:
+        stmt = stmt.where(CryptoMarketData.timestamp >= since)
+    rows = pd.DataFrame(
+        db.session.execute(stmt).all(),
+        columns=['timestamp', 'symbol', 'close'],
     )
-    existing_timestamps = set(db.session.scalars(ts_stmt).all())
-    return {convert_timestamp_to_utc(ts) for ts in existing_timestamps}
+    rows['timestamp'] = pd.to_datetime(rows['timestamp'], utc=True)
+    rows['close'] = rows['close'].astype(float)
+    return rows.pivot(
+        index='timestamp',
+        columns='symbol',
+        values='close',
+    ).sort_index()
 
 
 def store_crypto_market_data(
     symbol: str,
     source_id: int,
     df: pd.DataFrame,
-    existing_timestamps: set,
+    interval: str = MARKET_BASE_INTERVAL,
+) -> BulkInsertResult:
+    """
+    Bulk inserts close candles, skipping ones already stored.
+    """
+    rows = pd.DataFrame(
+        {
+            'symbol': symbol,
+            'source_id': source_id,
+            'timestamp': df.index,
+            'interval': interval,
+            'price': df['close'].to_numpy(),
+            'ingested_at': datetime.now(timezone.utc),
+        },
+    )
+    return copy_dataframe(CryptoMarketData, rows)
+
+
+def rollup_market_data(
+    symbols: list[str],
+    source_id: int,
+    interval: str,
+    since: datetime | None = None,
 ) -> int:
-    new_data = []
-    for timestamp, row in df.iterrows():
-        norm_ts = convert_timestamp_to_utc(timestamp)
-        if norm_ts in existing_timestamps:
-            continue
+    """
+    Rolls base interval candles up into `interval` candles, in SQL.
 
-        price = Decimal(row['close'])
-
-        market_data = CryptoMarketData(
-            symbol=symbol,
-            source_id=source_id,
-            timestamp=timestamp,
-            interval="1h",
-            price=price,
-            volume=None,
-            market_cap=None,
-            ingested_at=datetime.now(timezone.utc),
+    Each rolled up candle closes at the last base candle in its bucket.
+    Buckets from `since` onwards are upserted, so the bucket still in
+    progress is refreshed on every run. Returns the number of rows written.
+    """
+    step = pd.Timedelta(interval)
+    bucket = func.date_bin(
+        step.to_pytimedelta(),
+        CryptoMarketData.timestamp,
+        ROLLUP_ORIGIN,
+    )
+    candles = (
+        select(
+            CryptoMarketData.symbol,
+            CryptoMarketData.source_id,
+            bucket,
+            literal(interval, String),
+            CryptoMarketData.price,
+        )
+        .distinct(CryptoMarketData.symbol, bucket)
+        .where(
+            (CryptoMarketData.symbol.in_(symbols))
+            & (CryptoMarketData.source_id == source_id)
+            & (CryptoMarketData.interval == MARKET_BASE_INTERVAL),
+        )
+        .order_by(
+            CryptoMarketData.symbol,
+            bucket,
+            CryptoMarketData.timestamp.desc(),
+        )
+    )
+    if since is not None:
+        since = pd.Timestamp(since).floor(step).to_pydatetime()
+        candles = candles.where(CryptoMarketData.timestamp >= since)
+
+    stmt = insert(CryptoMarketData).from_select(
+        ['symbol', 'source_id', 'timestamp', 'interval', 'price'],
+        candles,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['symbol', 'source_id', 'timestamp', 'interval'],
+        set_={'price': stmt.excluded.price, 'ingested_at': func.now()},
+    )
+    return db.session.execute(stmt).rowcount
+
+
+def reset_indicators(symbols: list[str]):
+    """
+    Deletes the stored indicators and indicator state of `symbols` at every
+    interval, so they are recomputed from the full history on the next run.
+    """
+    for model in (CryptoTechnicalIndicator, CryptoIndicatorState):
+        db.session.execute(delete(model).where(model.symbol.in_(symbols)))
+
+
+@transactional
+def rollup_and_calculate_indicators(
+    symbols: list[str],
+    source_id: int,
+    backfilled_since: datetime | None = None,
+):
+    """
+    Rolls up newly stored base candles into every rollup interval and
+    advances the indicators of each interval.
+
+    Rolled up intervals only fold buckets that have closed into their
+    indicators, since the bucket in progress is still being updated. When
+    candles older than the stored series were backfilled, pass the start
+    of the backfill as `backfilled_since`: rollups are rewritten from there
+    and indicators are recomputed from scratch.
+    """
+    if backfilled_since is not None and symbols:
+        reset_indicators(symbols)
+    calculate_and_store_indicators(symbols, source_id)
+    if not symbols:
+        return
+
+    now = pd.Timestamp.now(tz=timezone.utc)
+    for interval in MARKET_ROLLUP_INTERVALS:
+        high_water_marks = get_market_high_water_marks(source_id, interval)
+        if backfilled_since is not None:
+            since = backfilled_since
+        elif all(symbol in high_water_marks for symbol in symbols):
+            since = min(high_water_marks[symbol] for symbol in symbols)
+        else:
+            since = None
+        written = rollup_market_data(symbols, source_id, interval, since)
+        logger.info(f"Rolled up {written} {interval} candles")
+        calculate_and_store_indicators(
+            symbols,
+            source_id,
+            interval,
+            until=now.floor(pd.Timedelta(interval)),
         )
-        new_data.append(market_data)
-    if new_data:
-        db.session.add_all(new_data)
-    return len(new_data)
 
 
 @transactional
 def process_and_store_crypto(
     coin: CryptoAsset,
-    binance_symbols: set,
+    df: pd.DataFrame,
     source: CryptoSource,
-):
+    high_water_mark: datetime | None = None,
+) -> int:
     """
-    Process and store cryptocurrency data to CryptoMarketData and
-    CryptoTechnicalIndicator.
+    Store a fetched price history to CryptoMarketData.
+
+    Candles at or before `high_water_mark` are already stored and dropped.
+    Returns the number of newly stored candles.
     """
     symbol = coin.symbol.upper()
-    name = coin.name
-    logger.info(f"Processing coin: {symbol} ({name})")
+    logger.info(f"Processing coin: {symbol} ({coin.name})")
+
+    if high_water_mark is not None:
+        df = df[df.index > high_water_mark]
+    if df.empty:
+        logger.info(f"No new candles for {symbol}")
+        return 0
+
+    result = store_crypto_market_data(symbol, source.id, df)
+    logger.info(
+        f"Inserted {result.inserted} new market data rows for {symbol}, "
+        f"skipped {result.skipped} existing",
+    )
+    return result.inserted
 
-    binance_pair = symbol + "USDT"
-    if binance_pair not in binance_symbols:
-        logger.warning(f"Skipping {symbol} {name}")
-        return
 
-    df = fetch_binance_price_history(binance_pair)
-    logger.info(f"Querying existing timestamps for {symbol}...")
+def get_tradable_cryptos() -> dict[str, CryptoAsset]:
+    """
+    Maps the Binance USDT pair of every top cryptocurrency listed on Binance
+    to its asset. Unlisted cryptocurrencies are logged and left out.
+    """
+    top_cryptos = CryptoAsset.query.filter(
+        CryptoAsset.ranking <= (TOP_CRYPTOCURRENCIES_LIMIT * 2),
+    ).all()
+    binance_symbols = get_binance_usdt_pairs()
+    wanted = {crypto.symbol.upper() + "USDT" for crypto in top_cryptos}
+    # A pair missing from the cache may have been listed since it was
+    # filled, unless it was already missing from a recent refresh. Most of
+    # the top cryptocurrencies are never listed, so only new misses count.
+    unlisted_cache = get_binance_unlisted_cache()
+    unlisted = unlisted_cache.get()
+    if wanted - binance_symbols - (unlisted.values if unlisted else set()):
+        binance_symbols = get_binance_usdt_pairs(
+            max_age=BINANCE_SYMBOLS_MISS_REFRESH_S,
+        )
+        unlisted_cache.set(wanted - binance_symbols)
+
+    tradable = {}
+    for crypto in top_cryptos:
+        binance_pair = crypto.symbol.upper() + "USDT"
+        if binance_pair not in binance_symbols:
+            logger.warning(f"Skipping {crypto.symbol} {crypto.name}")
+            continue
+        tradable[binance_pair] = crypto
+    return tradable
 
-    existing_timestamps = get_existing_market_timestamps(symbol, source.id)
-    logger.info(f"Found {len(existing_timestamps)} existing timestamps.")
 
-    inserted = store_crypto_market_data(
-        symbol,
-        source.id,
-        df,
-        existing_timestamps,
+def get_binance_source() -> CryptoSource:
+    """
+    Gets or creates the Binance data source, flushed so its id is set.
+    """
+    source = CryptoSource.get_or_create(
+        name="Binance",
+        defaults={"type": "exchange"},
     )
-    logger.info(f"Inserted {inserted} new market data rows for {symbol}")
-    logger.info(f"Daily indicators saved for {symbol}")
-    calculate_and_store_indicators(symbol, df)
+    db.session.flush()
+    return source
 
 
 @transactional
-def sync_binance_crypto_market_information():
+def sync_binance_crypto_market_information(incremental: bool = True):
     """
     Executes the synchronization task for Binance crypto market information.
 
@@ -214,17 +632,49 @@ def sync_binance_crypto_market_information():
     1. Get the top cryptocurrencies from the database.
     2. Fetch the current Binance trading pairs.
     3. Get or create the Binance data source.
-    4. Process each coin in the top list - store market data and calculate indicators.
+    4. Fetch price history for every tradable coin concurrently. In
+       incremental mode only candles after the last stored one are requested.
+    5. Process each coin in the top list - store market data.
+    6. Roll up the new candles into the coarser intervals and calculate
+       indicators per interval for all updated coins at once.
     """
 
-    top_cryptos = CryptoAsset.query.filter(
-        CryptoAsset.ranking <= (TOP_CRYPTOCURRENCIES_LIMIT * 2),
-    ).all()
-    binance_symbols = fetch_binance_symbols()
-    source = CryptoSource.get_or_create(
-        name="Binance",
-        defaults={"type": "exchange"},
+    cryptos = get_tradable_cryptos()
+    source = get_binance_source()
+    high_water_marks = (
+        get_market_high_water_marks(source.id) if incremental else {}
     )
 
-    for crypto in top_cryptos:
-        process_and_store_crypto(crypto, binance_symbols, source)
+    tradable = {}
+    kline_params = {}
+    for binance_pair, crypto in cryptos.items():
+        params = incremental_kline_params(high_water_marks.get(crypto.symbol))
+        if params is None:
+            logger.info(f"{crypto.symbol} is up to date")
+            continue
+        tradable[binance_pair] = crypto
+        kline_params[binance_pair] = {
+            "interval": MARKET_BASE_INTERVAL,
+            **params,
+        }
+
+    price_histories = fetch_binance_price_histories(
+        list(tradable),
+        kline_params,
+    )
+
+    updated_symbols = []
+    for binance_pair, crypto in tradable.items():
+        df = price_histories.get(binance_pair)
+        if df is None:
+            continue
+        inserted = process_and_store_crypto(
+            crypto,
+            df,
+            source,
+            high_water_marks.get(crypto.symbol),
+        )
+        if inserted:
+            updated_symbols.append(crypto.symbol)
+
+    rollup_and_calculate_indicators(updated_symbols, source.id)
@@ -0,0 +1,246 @@
+import itertools
+import threading
+import time
+import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging import getLogger
+from requests.adapters import HTTPAdapter
+
+from app.services.market.constants import (
+    BINANCE_BASE_URL,
+    BINANCE_FETCH_MAX_WORKERS,
+    BINANCE_HEDGE_DEFAULT_DELAY_S,
+    BINANCE_HEDGE_MIN_SAMPLES,
+    BINANCE_HEDGE_PERCENTILE,
+    BINANCE_MAX_RETRIES,
+    BINANCE_MIRROR_URLS,
+    BINANCE_REQUEST_TIMEOUT_S,
+    BINANCE_REQUEST_WEIGHT_PER_MINUTE,
+    BINANCE_REQUEST_WEIGHT_SHARE,
+)
+from app.utils.latency import LatencyHistogram
+from app.utils.ratelimit import TokenBucket
+
+logger = getLogger(__name__)
+
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1m"
+# 429 asks clients to back off; 418 means the IP has been banned for
+# ignoring earlier 429s.
+RATE_LIMITED = 429
+IP_BANNED = 418
+
+
+class BinanceRateLimitError(Exception):
+    """
+    Raised when Binance keeps rejecting requests for exceeding its limits.
+    """
+
+    def __init__(self, status_code: int, retry_after: float):
+        super().__init__(status_code, retry_after)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return (
+            f"Binance returned {self.status_code}, "
+            f"retry after {self.retry_after}s"
+        )
+
+
+class BinanceClient:
+    """
+    Binance REST client that stays within the per-IP request weight limit.
+
+    Requests share one keep-alive session and one token bucket of request
+    weight, so any number of threads can use a client at once. The bucket
+    refills at the allowed weight per minute and is lowered to what Binance
+    reports is left in the current minute after every response. On 429 and
+    418 all requests are held back for the Retry-After period.
+
+    With `mirror_urls`, a request the primary host has not answered within
+    its `hedge_percentile` latency is sent again to the next mirror, and
+    whichever response arrives first is used. Only GETs are sent, so the
+    duplicate is harmless, and it is skipped when no weight is to spare.
+
+    `pool_size` is the most threads expected to call the client at once.
+    The connection pool holds that many connections per host, and the
+    hedge executor has room for a primary and a hedge per caller.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BINANCE_BASE_URL,
+        weight_per_minute: int = BINANCE_REQUEST_WEIGHT_PER_MINUTE,
+        pool_size: int = BINANCE_FETCH_MAX_WORKERS,
+        timeout=BINANCE_REQUEST_TIMEOUT_S,
+        max_retries: int = BINANCE_MAX_RETRIES,
+        session: requests.Session | None = None,
+        clock=time.time,
+        mirror_urls: tuple[str, ...] = (),
+        hedge_percentile: float = BINANCE_HEDGE_PERCENTILE,
+        hedge_min_samples: int = BINANCE_HEDGE_MIN_SAMPLES,
+        hedge_default_delay: float = BINANCE_HEDGE_DEFAULT_DELAY_S,
+    ):
+        self.base_url = base_url
+        self.mirror_urls = tuple(mirror_urls)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay = hedge_default_delay
+        self.latencies = {
+            url: LatencyHistogram() for url in (base_url, *self.mirror_urls)
+        }
+        self._mirrors = itertools.cycle(self.mirror_urls)
+        self._mirrors_lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(
+                max_workers=pool_size * 2,
+                thread_name_prefix="binance-hedge",
+            )
+            if self.mirror_urls
+            else None
+        )
+        self.weight_limit = weight_per_minute * BINANCE_REQUEST_WEIGHT_SHARE
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._clock = clock
+        # Bursts are limited to a tenth of a minute's weight, so the bucket
+        # alone keeps every minute window under the limit.
+        self.limiter = TokenBucket(
+            capacity=self.weight_limit / 10,
+            rate=self.weight_limit / 60,
+        )
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=len(self.latencies),
+                pool_maxsize=pool_size,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def _seconds_to_next_minute(self) -> float:
+        return 60 - self._clock() % 60
+
+    def _track_used_weight(self, response: requests.Response):
+        # Each host counts used weight on its own, e.g. api.binance.com and
+        # api-gcp.binance.com, so this only sees the count of the host that
+        # answered. Hedges are rare and only sent with weight to spare.
+        used = response.headers.get(USED_WEIGHT_HEADER)
+        if used is None:
+            return
+        remaining = self.weight_limit - int(used)
+        if remaining > 0:
+            self.limiter.cap(remaining)
+        else:
+            # The budget of this minute is spent, wait for the next one
+            self.limiter.pause(self._seconds_to_next_minute())
+
+    def hedge_delay(self, base_url: str) -> float:
+        """
+        Returns how long to wait for `base_url` before hedging a request:
+        its `hedge_percentile` latency once enough requests were timed.
+        """
+        latencies = self.latencies[base_url]
+        if latencies.count < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return latencies.percentile(self.hedge_percentile)
+
+    def _send(
+        self,
+        base_url: str,
+        path: str,
+        params: dict | None,
+    ) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                f"{base_url}{path}",
+                params=params,
+                timeout=self.timeout,
+            )
+        finally:
+            # Timeouts count too, so a host that stops answering is hedged
+            # sooner
+            self.latencies[base_url].record(time.perf_counter() - started)
+        self._track_used_weight(response)
+        return response
+
+    def _send_hedged(
+        self,
+        path: str,
+        params: dict | None,
+        weight: int,
+    ) -> requests.Response:
+        primary = self._executor.submit(
+            self._send,
+            self.base_url,
+            path,
+            params,
+        )
+        done, _ = wait([primary], timeout=self.hedge_delay(self.base_url))
+        if done or not self.limiter.try_acquire(weight):
+            return primary.result()
+
+        with self._mirrors_lock:
+            mirror = next(self._mirrors)
+        logger.debug(f"Hedging {path} to {mirror}")
+        hedge = self._executor.submit(self._send, mirror, path, params)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # A failed or rejected request falls back to the other one, if
+            # it succeeds
+            for future in done:
+                if future.exception() is None and future.result().ok:
+                    return future.result()
+        return primary.result()
+
+    def get(self, path: str, params: dict | None = None, weight: int = 1):
+        """
+        Sends a GET request to `path` once `weight` is available and returns
+        the decoded JSON body. Retries rate limited requests after the
+        Retry-After period, up to `max_retries` times.
+        """
+        for _ in range(self.max_retries + 1):
+            self.limiter.acquire(weight)
+            if self._executor is not None:
+                response = self._send_hedged(path, params, weight)
+            else:
+                response = self._send(self.base_url, path, params)
+
+            if response.status_code not in (RATE_LIMITED, IP_BANNED):
+                response.raise_for_status()
+                return response.json()
+
+            retry_after = float(
+                response.headers.get(
+                    "Retry-After",
+                    self._seconds_to_next_minute(),
+                ),
+            )
+            self.limiter.pause(retry_after)
+            logger.warning(
+                f"Binance returned {response.status_code} for {path}, "
+                f"backing off for {retry_after}s",
+            )
+            if response.status_code == IP_BANNED:
+                break
+
+        raise BinanceRateLimitError(response.status_code, retry_after)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_binance_client() -> BinanceClient:
+    """
+    Returns the process-wide Binance client, so all requests share one
+    connection pool and one weight budget.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BinanceClient(mirror_urls=BINANCE_MIRROR_URLS)
+        return _client
@@ -1,52 +1,266 @@
+import hashlib
 import logging
+import numpy as np
+import pandas as pd
 import requests
 import app.env
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.models.crypto import (
     CryptoAsset,
     CryptoCoingeckoSentimentData,
     CryptoMarketData,
 )
-from time import sleep
 from app.extensions import db
 from app.services.market.constants import (
     COINGECKO_BASE_URL,
+    COINGECKO_MARKETS_MAX_WORKERS,
+    COINGECKO_MARKETS_PAGE_SIZE,
+    COINGECKO_MAX_RETRIES,
+    COINGECKO_METADATA_BATCH_SIZE,
+    COINGECKO_METADATA_MAX_WORKERS,
+    COINGECKO_REQUEST_TIMEOUT_S,
+    COINGECKO_REQUESTS_PER_MINUTE,
+    COINGECKO_RETRY_BACKOFF_S,
     STABLECOIN_SYMBOLS,
 )
 from app.constants import TOP_CRYPTOCURRENCIES_LIMIT
 from app.utils.decorators import transactional
-from sqlalchemy import select
+from app.utils.ratelimit import TokenBucket
+from sqlalchemy import func, insert, inspect, select, update
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+RATE_LIMITED = 429
 
-FETCH_METADATA_INTERVAL_S = 4
+# Asset columns compared by md5 digest rather than by value, so stored
+# descriptions are never read back just to find out nothing changed
+ASSET_HASHED_FIELDS = (
+    "name",
+    "coingecko_id",
+    "image",
+    "description",
+    "categories",
+    "homepage_url",
+    "subreddit_url",
+    "purchase_platforms",
+)
+ASSET_COMPARED_FIELDS = ("ranking", "marketcap", "volume")
+ASSET_FIELDS = ASSET_COMPARED_FIELDS + ASSET_HASHED_FIELDS
+
+# One bucket for every CoinGecko call made by this process. Requests are
+# spread evenly over the minute instead of bursting, since the API plan
+# limit is counted per minute.
+coingecko_limiter = TokenBucket(
+    capacity=1,
+    rate=COINGECKO_REQUESTS_PER_MINUTE / 60,
+)
+
+
+def coingecko_get(path: str, params: dict | None = None):
+    """
+    Sends a GET request to the CoinGecko API once the rate limiter allows
+    it and returns the decoded JSON body. Rate limited requests are retried
+    after the Retry-After period, or an exponential backoff without one.
+    """
+    headers = {
+        "x-cg-demo-api-key": app.env.COINGECKO_API_KEY,
+        "accept": "application/json",
+    }
+    for attempt in range(COINGECKO_MAX_RETRIES + 1):
+        coingecko_limiter.acquire()
+        response = requests.get(
+            f"{COINGECKO_BASE_URL}{path}",
+            headers=headers,
+            params=params,
+            timeout=COINGECKO_REQUEST_TIMEOUT_S,
+        )
+        if response.status_code != RATE_LIMITED:
+            break
+
+        retry_after = float(
+            response.headers.get(
+                "Retry-After",
+                COINGECKO_RETRY_BACKOFF_S * 2**attempt,
+            ),
+        )
+        # Every worker waits, not just the one that was rejected
+        coingecko_limiter.pause(retry_after)
+        logger.warning(
+            f"Coingecko returned 429 for {path}, "
+            f"backing off for {retry_after}s",
+        )
+
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_coingecko_market_page(
+    page: int,
+    per_page: int,
+    vs_currency: str = "usd",
+) -> list[dict]:
+    params = {
+        "order": "market_cap_desc",
+        "vs_currency": vs_currency,
+        "per_page": per_page,
+        "page": page,
+    }
+    return coingecko_get("/coins/markets", params)
 
 
 def fetch_coingecko_market_data(
     vs_currency="usd",
-    per_page=TOP_CRYPTOCURRENCIES_LIMIT,
+    limit=TOP_CRYPTOCURRENCIES_LIMIT,
+    workers: int = COINGECKO_MARKETS_MAX_WORKERS,
 ):
     """
-    Fetch market data from Coingecko for the top N coins.
+    Fetch market data from Coingecko for the top `limit` coins.
+
+    The listing is paged, so pages are requested concurrently under the
+    rate limiter and joined in rank order. When a page fails, only the
+    pages ranked above it are returned, so rankings never have gaps.
     Returns a list of currency data dictionaries or an empty list on failure.
     """
-    try:
-        url = f"{COINGECKO_BASE_URL}/coins/markets"
-        params = {
-            "order": "market_cap_desc",
-            "vs_currency": vs_currency,
-            "per_page": per_page,
-        }
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(
-            f"Coingecko API error: failed to fetch market data. Error: {e}",
-        )
-        return []
+    per_page = min(limit, COINGECKO_MARKETS_PAGE_SIZE)
+    pages = -(-limit // per_page)
+    currency_data = []
+    with ThreadPoolExecutor(
+        max_workers=min(workers, pages),
+        thread_name_prefix="coingecko-markets",
+    ) as executor:
+        futures = [
+            executor.submit(
+                fetch_coingecko_market_page,
+                page,
+                per_page,
+                vs_currency,
+            )
+            for page in range(1, pages + 1)
+        ]
+        for page, future in enumerate(futures, start=1):
+            try:
+                currency_data.extend(future.result())
+            except Exception as e:
+                logger.error(
+                    f"Coingecko API error: failed to fetch market data "
+                    f"page {page}. Error: {e}",
+                )
+                for pending in futures[page:]:
+                    pending.cancel()
+                break
+    return currency_data[:limit]
+
+
+def rank_coingecko_assets(currency_data: list[dict]) -> list[dict]:
+    """
+    Turns a Coingecko market listing into asset rows, dropping stablecoins
+    and moving every coin up one rank for each stablecoin ranked above it.
+    """
+    frame = pd.DataFrame(
+        currency_data,
+        columns=[
+            "id",
+            "symbol",
+            "name",
+            "image",
+            "market_cap_rank",
+            "market_cap",
+            "total_volume",
+        ],
+    )
+    is_stable = frame["symbol"].isin(STABLECOIN_SYMBOLS)
+    # Coins without a rank keep their place in the listing
+    listed_rank = pd.Series(np.arange(1, len(frame) + 1), index=frame.index)
+    ranking = frame["market_cap_rank"].fillna(listed_rank)
+    frame["ranking"] = (ranking - is_stable.cumsum()).astype(int)
+
+    if is_stable.any():
+        logger.info(f"Skipped coins {', '.join(frame['symbol'][is_stable])}")
+    assets = pd.DataFrame(
+        {
+            "symbol": frame["symbol"].fillna("").str.upper(),
+            "name": frame["name"].fillna(""),
+            "ranking": frame["ranking"],
+            "image": frame["image"].fillna(""),
+            "coingecko_id": frame["id"],
+            "marketcap": frame["market_cap"],
+            "volume": frame["total_volume"],
+        },
+    )[~is_stable]
+    # Object dtype turns NumPy scalars into Python ones and NaN into None
+    assets = assets.astype(object)
+    return assets.where(assets.notna(), None).to_dict("records")
+
+
+def _digest(value: str | None) -> str | None:
+    if value is None:
+        return None
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def get_asset_index() -> dict[str, dict]:
+    """
+    Returns the stored state of every asset keyed by symbol, with the large
+    text fields as md5 digests computed by Postgres.
+    """
+    columns = [
+        CryptoAsset.symbol,
+        *(getattr(CryptoAsset, field) for field in ASSET_COMPARED_FIELDS),
+        *(
+            func.md5(getattr(CryptoAsset, field)).label(field)
+            for field in ASSET_HASHED_FIELDS
+        ),
+    ]
+    rows = db.session.execute(select(*columns)).mappings()
+    return {row["symbol"]: dict(row) for row in rows}
+
+
+def changed_asset_fields(stored: dict, values: dict) -> dict:
+    """
+    Returns the fields of `values` that differ from the `stored` index entry.
+    """
+    changed = {}
+    for field, value in values.items():
+        if field == "symbol":
+            continue
+        compared = _digest(value) if field in ASSET_HASHED_FIELDS else value
+        if compared != stored[field]:
+            changed[field] = value
+    return changed
+
+
+def store_asset_changes(index: dict[str, dict], assets: list[dict]):
+    """
+    Inserts new assets and updates only the changed fields of known ones,
+    keeping `index` in step with what was written.
+    """
+    new_assets = []
+    updates = []
+    for values in assets:
+        stored = index.get(values["symbol"])
+        if stored is None:
+            new_assets.append(values)
+            stored = index[values["symbol"]] = dict.fromkeys(ASSET_FIELDS)
+            changed = {k: v for k, v in values.items() if k != "symbol"}
+        else:
+            changed = changed_asset_fields(stored, values)
+            if changed:
+                updates.append({"symbol": values["symbol"], **changed})
+        for field, value in changed.items():
+            stored[field] = (
+                _digest(value) if field in ASSET_HASHED_FIELDS else value
+            )
+
+    if new_assets:
+        db.session.execute(insert(CryptoAsset), new_assets)
+    if updates:
+        # Bulk UPDATE by primary key, one statement per set of fields
+        db.session.execute(update(CryptoAsset), updates)
+    logger.info(
+        f"Assets: {len(new_assets)} new, {len(updates)} changed, "
+        f"{len(assets) - len(new_assets) - len(updates)} unchanged",
+    )
 
 
 @transactional
@@ -58,31 +272,44 @@ def sync_crypto_asset_with_coingecko():
 
     logger.info("Coingecko rankings script: Writing data to SQLAlchemy")
 
-    rank_deducter = 0
-    for curr in currency_data:
-        if curr["symbol"] in STABLECOIN_SYMBOLS:
-            logger.info(f"Skipped coin {curr['symbol']}")
-            rank_deducter += 1
-            continue
-
-        asset = CryptoAsset(
-            symbol=curr.get('symbol', '').upper(),
-            name=curr.get('name', ''),
-            ranking=curr.get('market_cap_rank', 1) - rank_deducter,
-            image=curr.get('image', ''),
-            coingecko_id=curr.get('id'),
-            marketcap=curr.get('market_cap'),
-            volume=curr.get('total_volume'),
-        )
-        db.session.merge(asset)
+    assets = rank_coingecko_assets(currency_data)
+    store_asset_changes(get_asset_index(), assets)
 
     logger.info("Coingecko rankings script: Done writing.")
 
 
 @transactional
-def sync_top_coingecko_crypto_metadata():
+def store_coingecko_metadata(index: dict[str, dict], records: list):
+    """
+    Writes one batch of fetched metadata records. Sentiment snapshots are
+    always added, assets only where a field changed.
+    """
+    assets = []
+    for rec in records:
+        if isinstance(rec, CryptoAsset):
+            set_fields = inspect(rec).dict
+            assets.append(
+                {
+                    field: set_fields[field]
+                    for field in ("symbol",) + ASSET_FIELDS
+                    if field in set_fields
+                },
+            )
+        else:
+            db.session.add(rec)
+    store_asset_changes(index, assets)
+
+
+def sync_top_coingecko_crypto_metadata(
+    workers: int = COINGECKO_METADATA_MAX_WORKERS,
+    batch_size: int = COINGECKO_METADATA_BATCH_SIZE,
+):
     """
     Updates metadata for top-ranked cryptocurrencies.
+
+    Coins are fetched by `workers` threads sharing the CoinGecko rate
+    limiter, and written `batch_size` coins per transaction as they arrive,
+    so no transaction is held open while waiting on the API.
     """
     query = (
         select(CryptoAsset)
@@ -92,13 +319,30 @@ def sync_top_coingecko_crypto_metadata():
         .limit(TOP_CRYPTOCURRENCIES_LIMIT)
     )
     cryptocurrencies = db.session.execute(query).scalars().all()
+    index = get_asset_index()
+    # Detach the loaded coins so the worker threads can read them, and end
+    # the read transaction before the first request is sent
+    for crypto in cryptocurrencies:
+        db.session.expunge(crypto)
+    db.session.commit()
     logger.info(f"Metadata: Updating {len(cryptocurrencies)} coins")
 
-    for crypto in cryptocurrencies:
-        records = fetch_coingecko_metadata(crypto)
-        for rec in records:
-            db.session.merge(rec)
-        sleep(FETCH_METADATA_INTERVAL_S)
+    batch = []
+    with ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="coingecko-metadata",
+    ) as executor:
+        futures = [
+            executor.submit(fetch_coingecko_metadata, crypto)
+            for crypto in cryptocurrencies
+        ]
+        for count, future in enumerate(as_completed(futures), start=1):
+            batch.extend(future.result())
+            if count % batch_size == 0:
+                store_coingecko_metadata(index, batch)
+                batch = []
+    store_coingecko_metadata(index, batch)
+    db.session.commit()
     logger.info("Metadata: Done writing to DB.")
 
 
@@ -113,15 +357,11 @@ def fetch_coingecko_metadata(crypto: CryptoAsset) -> list:
 
     logger.info(f"Metadata: Fetching for {crypto.name}")
 
-    headers = {
-        "x-cg-demo-api-key": app.env.COINGECKO_API_KEY,
-        "accept": "application/json",
-    }
-
     try:
-        url = f"{COINGECKO_BASE_URL}/coins/{crypto.coingecko_id}?market_data=false"
-        response = requests.get(url, headers=headers)
-        data = response.json()
+        data = coingecko_get(
+            f"/coins/{crypto.coingecko_id}",
+            {"market_data": "false"},
+        )
 
         # Parse categories
         categories = ", ".join(data.get("categories", []))
@@ -133,7 +373,9 @@ def fetch_coingecko_metadata(crypto: CryptoAsset) -> list:
             if ticker.get("trust_score") == "green"
             and ticker.get("market", {}).get("name")
         }
-        purchase_platforms = ", ".join(platforms)
+        # Sorted, as sets of strings iterate in a different order in each
+        # process, which would change the stored digest on every run
+        purchase_platforms = ", ".join(sorted(platforms))
 
         return [
             CryptoAsset(
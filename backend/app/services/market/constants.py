@@ -54,4 +54,48 @@ STABLECOIN_SYMBOLS = [
 
 
 BINANCE_BASE_URL = "https://data-api.binance.vision"
+# Mirrors serving the same market data endpoints. A request the primary
+# host is slow to answer is hedged to one of them.
+BINANCE_MIRROR_URLS = (
+    "https://api.binance.com",
+    "https://api-gcp.binance.com",
+)
+# Latency percentile of a host after which a request to it is hedged, the
+# samples needed before it is trusted, and the delay used until then
+BINANCE_HEDGE_PERCENTILE = 0.95
+BINANCE_HEDGE_MIN_SAMPLES = 20
+BINANCE_HEDGE_DEFAULT_DELAY_S = 1.0
+# Upper bound on concurrent kline requests during the hourly market sync.
+# Also used as the keep-alive pool size of the shared Binance HTTP session.
+BINANCE_FETCH_MAX_WORKERS = 16
+# Binance caps a single klines request at 1000 candles. Incremental syncs
+# never backfill more than this; longer gaps are left to a full backfill.
+BINANCE_KLINES_MAX_LIMIT = 1000
+# Request weight Binance allows per IP per minute, and the share of it the
+# client spends, leaving room for other processes on the same IP.
+BINANCE_REQUEST_WEIGHT_PER_MINUTE = 6000
+BINANCE_REQUEST_WEIGHT_SHARE = 0.8
+# Weights of the endpoints used, as listed in the Binance API docs
+BINANCE_KLINES_WEIGHT = 2
+BINANCE_EXCHANGE_INFO_WEIGHT = 20
+BINANCE_TICKER_PRICE_WEIGHT = 2
+# Connect and read timeouts of Binance requests, in seconds
+BINANCE_REQUEST_TIMEOUT_S = (3.05, 10)
+BINANCE_MAX_RETRIES = 3
+# How long the tradable USDT pair set is cached for, and how often a pair
+# newly missing from it may trigger an early refresh, in seconds
+BINANCE_SYMBOLS_CACHE_TTL_S = 6 * 60 * 60
+BINANCE_SYMBOLS_MISS_REFRESH_S = 15 * 60
 COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+# Calls per minute allowed by the CoinGecko API plan in use (Demo plan)
+COINGECKO_REQUESTS_PER_MINUTE = 30
+COINGECKO_REQUEST_TIMEOUT_S = (3.05, 20)
+COINGECKO_MAX_RETRIES = 3
+# Backoff after a 429 without Retry-After, doubled on every retry
+COINGECKO_RETRY_BACKOFF_S = 15
+# /coins/markets returns at most 250 coins per page
+COINGECKO_MARKETS_PAGE_SIZE = 250
+COINGECKO_MARKETS_MAX_WORKERS = 4
+# Concurrent metadata requests, and coins written per transaction
+COINGECKO_METADATA_MAX_WORKERS = 4
+COINGECKO_METADATA_BATCH_SIZE = 25
@@ -0,0 +1,279 @@
+import queue
+import re
+import threading
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from sqlalchemy import select, update
+from sqlalchemy.orm import aliased
+
+from app.constants import MARKET_BASE_INTERVAL
+from app.extensions import db
+from app.models import CryptoAsset, CryptoImportedDump
+from app.services.market.binance import (
+    get_binance_source,
+    rollup_and_calculate_indicators,
+    store_crypto_market_data,
+)
+
+logger = getLogger(__name__)
+
+# Monthly or daily kline archives as published on data.binance.vision,
+# e.g. BTCUSDT-1h-2024-01.zip
+DUMP_NAME_PATTERN = re.compile(
+    r"^(?P<symbol>[A-Z0-9]+)USDT-(?P<interval>\w+)-"
+    r"\d{4}-\d{2}(-\d{2})?\.zip$",
+)
+DUMP_CHUNK_ROWS = 100_000
+# Decompressed chunks waiting to be copied in, bounding memory use
+DUMP_QUEUE_CHUNKS = 4
+# Seconds the reader waits on a full queue before checking for a stop
+DUMP_QUEUE_TIMEOUT = 1.0
+# Open times at or above this are in microseconds rather than milliseconds;
+# Binance switched spot archives to microseconds from 2025.
+MICROSECOND_TIMESTAMPS_FROM = 10**15
+
+
+@dataclass
+class DumpImportReport:
+    files: int = 0
+    skipped: int = 0
+    failed: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_kline_csv(
+    file,
+    chunk_rows: int = DUMP_CHUNK_ROWS,
+):
+    """
+    Reads a kline CSV in chunks of open time and close price, yielding
+    frames with a 'close' column indexed by UTC open time. Handles archives
+    with and without a header row and with millisecond or microsecond open
+    times.
+    """
+    first_line = file.readline()
+    has_header = not first_line.split(b",", 1)[0].strip().isdigit()
+    file.seek(0)
+
+    chunks = pd.read_csv(
+        file,
+        header=None,
+        usecols=[0, 4],
+        names=["open_time", "close"],
+        skiprows=1 if has_header else 0,
+        dtype={"open_time": np.int64, "close": np.float64},
+        chunksize=chunk_rows,
+    )
+    for chunk in chunks:
+        open_time = chunk["open_time"].to_numpy()
+        open_time = np.where(
+            open_time >= MICROSECOND_TIMESTAMPS_FROM,
+            open_time // 1000,
+            open_time,
+        )
+        index = pd.to_datetime(open_time, unit="ms", utc=True)
+        yield pd.DataFrame({"close": chunk["close"].to_numpy()}, index=index)
+
+
+def _put(chunks: queue.Queue, stop: threading.Event, item) -> bool:
+    # Waits for room in the queue, giving up once `stop` is set
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=DUMP_QUEUE_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decompress(
+    dumps: list[Path],
+    chunks: queue.Queue,
+    stop: threading.Event,
+    chunk_rows: int,
+):
+    # Producer thread: unzips each archive and queues its CSV chunks,
+    # followed by None once the archive has been read in full. Returns as
+    # soon as `stop` is set, even while the queue is full.
+    for path in dumps:
+        try:
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.namelist():
+                    if not member.endswith(".csv"):
+                        continue
+                    with archive.open(member) as file:
+                        for chunk in read_kline_csv(file, chunk_rows):
+                            if not _put(chunks, stop, (path, chunk)):
+                                return
+            if not _put(chunks, stop, (path, None)):
+                return
+        except Exception as e:
+            if not _put(chunks, stop, (path, e)):
+                return
+
+
+def rebuild_imported_dumps(source_id: int) -> list[str]:
+    """
+    Rebuilds the rollups and indicators of the symbols of every archive
+    imported without a rebuild yet, from the earliest new candle on, and
+    returns those symbols.
+    """
+    # Clears the markers in the rebuild's transaction, so a run that stops
+    # before it commits leaves them for the next run. The self join reads
+    # the values from before the update.
+    flagged = aliased(CryptoImportedDump)
+    rebuilt = db.session.execute(
+        update(CryptoImportedDump)
+        .where(
+            (CryptoImportedDump.filename == flagged.filename)
+            & flagged.rebuild_since.is_not(None),
+        )
+        .values(rebuild_since=None)
+        .returning(CryptoImportedDump.symbol, flagged.rebuild_since),
+    ).all()
+    symbols = sorted({symbol for symbol, _ in rebuilt})
+    if symbols:
+        rollup_and_calculate_indicators(
+            symbols,
+            source_id,
+            backfilled_since=min(since for _, since in rebuilt),
+        )
+    db.session.commit()
+    return symbols
+
+
+def find_binance_dumps(
+    directory: str | Path,
+    interval: str = MARKET_BASE_INTERVAL,
+) -> dict[Path, str]:
+    """
+    Finds kline archives of USDT pairs at `interval` in `directory` and maps
+    each to its asset symbol, oldest archive first per pair.
+    """
+    dumps = {}
+    for path in sorted(Path(directory).rglob("*.zip")):
+        match = DUMP_NAME_PATTERN.match(path.name)
+        if match is None or match["interval"] != interval:
+            logger.warning(f"Skipping {path.name}, not a {interval} dump")
+            continue
+        dumps[path] = match["symbol"]
+    return dumps
+
+
+def import_binance_dumps(
+    directory: str | Path,
+    chunk_rows: int = DUMP_CHUNK_ROWS,
+) -> DumpImportReport:
+    """
+    Imports data.binance.vision kline archives from a local directory.
+
+    Archives are decompressed and parsed in a background thread into a
+    small queue of chunks, which this thread COPYs into CryptoMarketData.
+    Each archive is committed with its CryptoImportedDump record, so
+    archives imported before are skipped. Rollups and indicators of the
+    imported symbols are rebuilt at the end, along with those of archives
+    imported by an earlier run that stopped before its rebuild.
+    """
+    started = time.perf_counter()
+    report = DumpImportReport()
+
+    dumps = find_binance_dumps(directory)
+    known = set(
+        db.session.scalars(
+            select(CryptoAsset.symbol).where(
+                CryptoAsset.symbol.in_(set(dumps.values())),
+            ),
+        ),
+    )
+    imported = set(
+        db.session.scalars(
+            select(CryptoImportedDump.filename).where(
+                CryptoImportedDump.filename.in_(
+                    [path.name for path in dumps],
+                ),
+            ),
+        ),
+    )
+    pending = []
+    for path, symbol in dumps.items():
+        if symbol not in known or path.name in imported:
+            report.skipped += 1
+            continue
+        pending.append(path)
+    source_id = get_binance_source().id
+    db.session.commit()
+
+    logger.info(f"Importing {len(pending)} Binance dumps from {directory}")
+    if not pending:
+        rebuild_imported_dumps(source_id)
+        return report
+
+    chunks = queue.Queue(maxsize=DUMP_QUEUE_CHUNKS)
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=_decompress,
+        args=(pending, chunks, stop, chunk_rows),
+        daemon=True,
+    )
+    reader.start()
+
+    since = None
+    rows = 0
+    remaining = len(pending)
+    try:
+        while remaining:
+            path, chunk = chunks.get()
+            symbol = dumps[path]
+            if isinstance(chunk, Exception):
+                db.session.rollback()
+                logger.error(f"Error importing {path.name}: {chunk}")
+                report.failed += 1
+                since = None
+                rows = 0
+                remaining -= 1
+            elif chunk is None:
+                # The rebuild marker is committed with the archive's candles
+                db.session.add(
+                    CryptoImportedDump(
+                        filename=path.name,
+                        symbol=symbol,
+                        interval=MARKET_BASE_INTERVAL,
+                        rows=rows,
+                        rebuild_since=since,
+                    ),
+                )
+                db.session.commit()
+                report.files += 1
+                report.rows += rows
+                since = None
+                rows = 0
+                remaining -= 1
+            elif not chunk.empty:
+                result = store_crypto_market_data(symbol, source_id, chunk)
+                rows += result.inserted
+                if result.inserted:
+                    start = chunk.index[0].to_pydatetime()
+                    since = start if since is None else min(since, start)
+    finally:
+        stop.set()
+        reader.join()
+
+    rebuild_imported_dumps(source_id)
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"Imported {report.rows} candles from {report.files} dumps "
+        f"in {report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s), "
+        f"{report.skipped} skipped, {report.failed} failed",
+    )
+    return report
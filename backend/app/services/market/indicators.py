@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+EMA_WINDOW = 14
+RSI_WINDOW = 14
+MACD_FAST_WINDOW = 12
+MACD_SLOW_WINDOW = 26
+MACD_SIGNAL_WINDOW = 9
+
+
+def _ema(values: pd.DataFrame, span: int) -> pd.DataFrame:
+    # Same smoothing as the `ta` library. Missing candles are skipped so each
+    # column behaves as if its own series had been passed in on its own.
+    return values.ewm(
+        span=span,
+        min_periods=span,
+        adjust=False,
+        ignore_na=True,
+    ).mean()
+
+
+def compute_indicators(close: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Computes EMA, RSI and MACD for many symbols in one pass.
+
+    `close` is a wide frame of close prices with one row per candle and one
+    column per symbol; NaN marks candles a symbol does not have. Returns
+    frames of the same shape keyed by 'ema', 'rsi' and 'macd', matching
+    `ta`'s EMAIndicator, RSIIndicator and MACD run on each column alone.
+    """
+    close = close.astype(float)
+    present = close.notna()
+
+    ema = _ema(close, EMA_WINDOW)
+
+    # Differences against the previous candle the symbol actually has
+    diff = close - close.ffill().shift(1)
+    up = diff.where(diff > 0, 0.0).where(present)
+    down = (-diff).where(diff < 0, 0.0).where(present)
+    rsi_smoothing = dict(
+        alpha=1 / RSI_WINDOW,
+        min_periods=RSI_WINDOW,
+        adjust=False,
+        ignore_na=True,
+    )
+    avg_gain = up.ewm(**rsi_smoothing).mean()
+    avg_loss = down.ewm(**rsi_smoothing).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = pd.DataFrame(
+            np.where(
+                avg_loss == 0,
+                100.0,
+                100 - 100 / (1 + avg_gain / avg_loss),
+            ),
+            index=close.index,
+            columns=close.columns,
+        )
+
+    macd = _ema(close, MACD_FAST_WINDOW) - _ema(close, MACD_SLOW_WINDOW)
+
+    return {
+        'ema': ema.where(present),
+        'rsi': rsi.where(present),
+        'macd': macd.where(present),
+    }
+
+
+def indicators_to_rows(indicators: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Flattens wide indicator frames into one row per (timestamp, symbol) with
+    'ema', 'rsi' and 'macd' columns. Rows missing any indicator are dropped.
+    """
+    rows = pd.concat(
+        {name: frame.stack() for name, frame in indicators.items()},
+        axis=1,
+    )
+    rows.index.names = ['timestamp', 'symbol']
+    return rows.dropna().reset_index()
+
+
+STATE_COLUMNS = [
+    'candle_count',
+    'last_close',
+    'ema',
+    'avg_gain',
+    'avg_loss',
+    'macd_fast',
+    'macd_slow',
+    'macd_signal',
+]
+
+
+def _smoothing(span: int) -> float:
+    return 2 / (span + 1)
+
+
+def advance_indicators(
+    state: pd.DataFrame,
+    close: pd.DataFrame,
+) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+    """
+    Folds new candles into running indicator state, one candle at a time.
+
+    `state` is indexed by symbol with STATE_COLUMNS; symbols missing from it
+    start from scratch. `close` is a wide frame of candles newer than each
+    symbol's state, NaN where a symbol has no candle. Returns the updated
+    state and 'ema', 'rsi' and 'macd' frames shaped like `close`, NaN while
+    warming up. Folding a whole series gives the same values as
+    `compute_indicators`, so results are exact however many runs it took.
+    """
+    symbols = close.columns
+    state = state.reindex(index=symbols, columns=STATE_COLUMNS).astype(float)
+    count = state['candle_count'].fillna(0).to_numpy()
+    last_close = state['last_close'].to_numpy()
+    ema = state['ema'].to_numpy()
+    avg_gain = state['avg_gain'].to_numpy()
+    avg_loss = state['avg_loss'].to_numpy()
+    fast = state['macd_fast'].to_numpy()
+    slow = state['macd_slow'].to_numpy()
+    signal = state['macd_signal'].to_numpy()
+
+    a_ema = _smoothing(EMA_WINDOW)
+    a_fast = _smoothing(MACD_FAST_WINDOW)
+    a_slow = _smoothing(MACD_SLOW_WINDOW)
+    a_signal = _smoothing(MACD_SIGNAL_WINDOW)
+    a_rsi = 1 / RSI_WINDOW
+
+    values = close.to_numpy(dtype=float)
+    out = {
+        name: np.full_like(values, np.nan) for name in ('ema', 'rsi', 'macd')
+    }
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i, row in enumerate(values):
+            present = ~np.isnan(row)
+            seed = present & (count == 0)
+            step = present & (count > 0)
+
+            diff = row - last_close
+            gain = np.where(diff > 0, diff, 0.0)
+            loss = np.where(diff < 0, -diff, 0.0)
+
+            ema = np.where(seed, row, ema)
+            fast = np.where(seed, row, fast)
+            slow = np.where(seed, row, slow)
+            avg_gain = np.where(seed, 0.0, avg_gain)
+            avg_loss = np.where(seed, 0.0, avg_loss)
+
+            ema = np.where(step, (1 - a_ema) * ema + a_ema * row, ema)
+            fast = np.where(step, (1 - a_fast) * fast + a_fast * row, fast)
+            slow = np.where(step, (1 - a_slow) * slow + a_slow * row, slow)
+            avg_gain = np.where(
+                step,
+                (1 - a_rsi) * avg_gain + a_rsi * gain,
+                avg_gain,
+            )
+            avg_loss = np.where(
+                step,
+                (1 - a_rsi) * avg_loss + a_rsi * loss,
+                avg_loss,
+            )
+
+            count = count + present
+            last_close = np.where(present, row, last_close)
+
+            # The signal line starts once the MACD line has its first value
+            macd = fast - slow
+            macd_ready = present & (count >= MACD_SLOW_WINDOW)
+            signal = np.where(
+                present & (count == MACD_SLOW_WINDOW),
+                macd,
+                np.where(
+                    present & (count > MACD_SLOW_WINDOW),
+                    (1 - a_signal) * signal + a_signal * macd,
+                    signal,
+                ),
+            )
+
+            rsi = np.where(
+                avg_loss == 0,
+                100.0,
+                100 - 100 / (1 + avg_gain / avg_loss),
+            )
+            ema_ready = present & (count >= EMA_WINDOW)
+            rsi_ready = present & (count >= RSI_WINDOW)
+            out['ema'][i] = np.where(ema_ready, ema, np.nan)
+            out['rsi'][i] = np.where(rsi_ready, rsi, np.nan)
+            out['macd'][i] = np.where(macd_ready, macd, np.nan)
+
+    new_state = pd.DataFrame(
+        {
+            'candle_count': count.astype(int),
+            'last_close': last_close,
+            'ema': ema,
+            'avg_gain': avg_gain,
+            'avg_loss': avg_loss,
+            'macd_fast': fast,
+            'macd_slow': slow,
+            'macd_signal': signal,
+        },
+        index=symbols,
+    )
+    indicators = {
+        name: pd.DataFrame(frame, index=close.index, columns=symbols)
+        for name, frame in out.items()
+    }
+    return new_state, indicators
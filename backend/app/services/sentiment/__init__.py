@@ -1,6 +1,7 @@
 from .newsapi import collect_crypto_news
 from .reddit import collect_reddit_crypto_discussions
 from .youtube import collect_youtube_crypto_comments
+from .rebuild import rebuild_sentiment
 from .sentiment_analysis import process_crypto_sentiment_analysis
 
 
@@ -9,4 +10,5 @@ __all__ = [
     "collect_reddit_crypto_discussions",
     "collect_youtube_crypto_comments",
     "process_crypto_sentiment_analysis",
+    "rebuild_sentiment",
 ]
@@ -0,0 +1,389 @@
+import string
+from abc import ABC, abstractmethod
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from app.services.sentiment.scoring import (
+    SENTIMENT_SCORE_COLUMNS,
+    get_sentiment_analyser,
+    score_texts,
+)
+
+# VADER's empirically derived adjustments
+CAPS_INCREMENT = 0.733
+NEGATION_SCALAR = -0.74
+EXCLAMATION_INCREMENT = 0.292
+QUESTION_INCREMENT = 0.18
+MAX_QUESTION_EMPHASIS = 0.96
+NORMALISATION_ALPHA = 15
+# Words VADER's rules look for
+RULE_WORDS = (
+    "no",
+    "or",
+    "nor",
+    "so",
+    "this",
+    "never",
+    "without",
+    "doubt",
+    "least",
+    "at",
+    "very",
+    "kind",
+    "of",
+    "but",
+)
+# Booster words further from the word they modify count for less
+BOOSTER_DAMPING = (1.0, 0.95, 0.9)
+
+
+class SentimentEngine(ABC):
+    """
+    Scores texts, returning one row of pos, neu, neg and compound scores
+    per text, in the order of `SENTIMENT_SCORE_COLUMNS`.
+    """
+
+    name: str
+
+    @abstractmethod
+    def score(self, texts, workers: int | None = None) -> np.ndarray:
+        pass
+
+
+class VaderEngine(SentimentEngine):
+    """Scores texts one at a time with VADER itself."""
+
+    name = "vader"
+
+    def score(self, texts, workers: int | None = None) -> np.ndarray:
+        return score_texts(texts, workers)
+
+
+class LexiconEngine(SentimentEngine):
+    """
+    Vectorised port of VADER's lexicon and rules, scoring a whole batch of
+    texts with array operations.
+
+    The batch is tokenised once and each distinct token looked up once, so
+    the per-token work is a few array lookups. It implements VADER's
+    valences, ALL CAPS emphasis, booster words, negations, "least", the
+    "but" rule and punctuation emphasis. It leaves out VADER's handful of
+    special case idioms, and applies the "but" rule to every word, where
+    VADER skips some words that share a score. Scoring runs in this
+    process, `workers` is ignored.
+
+    `python -m benchmarks.sentiment_engines` compares its speed and scores
+    with VADER's.
+    """
+
+    name = "lexicon"
+
+    def __init__(self):
+        from vaderSentiment.vaderSentiment import BOOSTER_DICT, NEGATE
+
+        analyser = get_sentiment_analyser()
+        self.lexicon = analyser.lexicon
+        self.boosters = BOOSTER_DICT
+        self.negations = frozenset(NEGATE)
+        # VADER replaces emojis with their description, preceded by a space
+        self.emojis = str.maketrans(
+            {
+                emoji: f" {description}"
+                for emoji, description in analyser.emojis.items()
+                if len(emoji) == 1
+            },
+        )
+
+    @staticmethod
+    def _strip_punctuation(token: str) -> str:
+        # Punctuation is kept on short tokens, which are likely emoticons
+        stripped = token.strip(string.punctuation)
+        return token if len(stripped) <= 2 else stripped
+
+    def _tokenise(self, texts: list[str]):
+        """
+        Splits `texts` into tokens the way VADER does, returning the text
+        each token is in, the distinct tokens, and each token's index in
+        them.
+        """
+        split = [text.split() for text in texts]
+        doc = np.repeat(
+            np.arange(len(texts)),
+            np.fromiter(map(len, split), dtype=int, count=len(split)),
+        )
+        codes, tokens = pd.factorize(
+            np.array(list(chain.from_iterable(split)), dtype=object),
+        )
+
+        # Emojis become their description, so a distinct token can turn
+        # into several, each of which loses any surrounding punctuation
+        expanded = [
+            (
+                token.translate(self.emojis).split()
+                if not token.isascii()
+                else [token]
+            )
+            for token in tokens
+        ]
+        sizes = np.fromiter(map(len, expanded), dtype=int, count=len(tokens))
+        starts = np.cumsum(sizes) - sizes
+        words, vocabulary = pd.factorize(
+            np.array(
+                [
+                    self._strip_punctuation(word)
+                    for word in chain.from_iterable(expanded)
+                ],
+                dtype=object,
+            ),
+        )
+        counts = sizes[codes]
+        offsets = np.cumsum(counts) - counts
+        index = np.repeat(starts[codes] - offsets, counts)
+        index += np.arange(len(index))
+        return np.repeat(doc, counts), vocabulary, words[index]
+
+    def _features(self, vocabulary) -> dict[str, np.ndarray]:
+        """Looks up what VADER's rules need of each distinct token."""
+        lower = [word.lower() for word in vocabulary]
+        rule_words = {word: index for index, word in enumerate(RULE_WORDS)}
+        return {
+            "word": np.array(
+                [rule_words.get(word, -1) for word in lower],
+                dtype=int,
+            ),
+            "upper": np.array(
+                [word.isupper() for word in vocabulary],
+                dtype=bool,
+            ),
+            "in_lexicon": np.array(
+                [word in self.lexicon for word in lower],
+                dtype=bool,
+            ),
+            "valence": np.array(
+                [self.lexicon.get(word, 0.0) for word in lower],
+                dtype=float,
+            ),
+            "is_booster": np.array(
+                [word in self.boosters for word in lower],
+                dtype=bool,
+            ),
+            "booster": np.array(
+                [self.boosters.get(word, 0.0) for word in lower],
+                dtype=float,
+            ),
+            "negated": np.array(
+                [word in self.negations or "n't" in word for word in lower],
+                dtype=bool,
+            ),
+        }
+
+    def score(self, texts, workers: int | None = None) -> np.ndarray:
+        texts = list(texts)
+        doc, vocabulary, codes = self._tokenise(texts)
+        # Each distinct token is looked up once, then every feature of
+        # every token is an array lookup
+        feature = {
+            name: values[codes]
+            for name, values in self._features(vocabulary).items()
+        }
+        word = feature["word"]
+        upper = feature["upper"]
+        in_lexicon = feature["in_lexicon"]
+
+        lengths = np.bincount(doc, minlength=len(texts))
+        starts = np.cumsum(lengths) - lengths
+        position = np.arange(len(doc)) - starts[doc]
+        last = position == lengths[doc] - 1
+
+        # Some, but not all, tokens of the text are ALL CAPS
+        caps = np.bincount(doc, weights=upper, minlength=len(texts))
+        cap_diff = ((caps > 0) & (caps < lengths))[doc]
+
+        def before(values, distance, fill):
+            # `values` of the token `distance` places earlier in the same
+            # text, or `fill` when there is none
+            shifted = np.full(len(values), fill, dtype=values.dtype)
+            shifted[distance:] = values[: len(values) - distance]
+            return np.where(position >= distance, shifted, fill)
+
+        def after(values, fill):
+            shifted = np.full(len(values), fill, dtype=values.dtype)
+            shifted[:-1] = values[1:]
+            return np.where(last, fill, shifted)
+
+        def is_word(words, *names):
+            return np.isin(words, [RULE_WORDS.index(name) for name in names])
+
+        word_1, word_2, word_3 = (before(word, k, -1) for k in (1, 2, 3))
+
+        valence = feature["valence"].copy()
+        valence[is_word(word, "no") & after(in_lexicon, False)] = 0.0
+        after_no = (
+            is_word(word_1, "no")
+            | is_word(word_2, "no")
+            | (is_word(word_3, "no") & is_word(word_1, "or", "nor"))
+        )
+        valence = np.where(
+            after_no,
+            feature["valence"] * NEGATION_SCALAR,
+            valence,
+        )
+        valence += np.where(
+            upper & cap_diff,
+            np.where(valence > 0, CAPS_INCREMENT, -CAPS_INCREMENT),
+            0.0,
+        )
+
+        for start, damping in enumerate(BOOSTER_DAMPING):
+            distance = start + 1
+            applies = before(~in_lexicon, distance, False)
+            booster = before(feature["booster"], distance, 0.0)
+            booster = np.where(valence < 0, -booster, booster)
+            booster += np.where(
+                before(feature["is_booster"] & upper, distance, False)
+                & cap_diff,
+                np.where(valence > 0, CAPS_INCREMENT, -CAPS_INCREMENT),
+                0.0,
+            )
+            valence = np.where(applies, valence + booster * damping, valence)
+
+            negated = before(feature["negated"], distance, False)
+            if start == 0:
+                factor = np.where(negated, NEGATION_SCALAR, 1.0)
+            elif start == 1:
+                factor = np.select(
+                    [
+                        is_word(word_2, "never")
+                        & is_word(word_1, "so", "this"),
+                        is_word(word_2, "without") & is_word(word_1, "doubt"),
+                        negated,
+                    ],
+                    [1.25, 1.0, NEGATION_SCALAR],
+                    1.0,
+                )
+            else:
+                # As in VADER, "so" or "this" right before the word boosts
+                # it whether or not "never" comes first
+                factor = np.select(
+                    [
+                        is_word(word_3, "never")
+                        & is_word(word_2, "so", "this")
+                        | is_word(word_1, "so", "this"),
+                        is_word(word_3, "without")
+                        & (
+                            is_word(word_2, "doubt") | is_word(word_1, "doubt")
+                        ),
+                        negated,
+                    ],
+                    [1.25, 1.0, NEGATION_SCALAR],
+                    1.0,
+                )
+            valence = np.where(applies, valence * factor, valence)
+
+        # "least" negates, except in "at least" and "very least"
+        least = is_word(word_1, "least") & ~before(in_lexicon, 1, True)
+        least &= (position < 2) | ~is_word(word_2, "at", "very")
+        valence = np.where(least, valence * NEGATION_SCALAR, valence)
+
+        # Only lexicon words that are not boosters carry sentiment, and
+        # "kind" only when not followed by "of"
+        valence = np.where(
+            in_lexicon
+            & ~feature["is_booster"]
+            & ~(is_word(word, "kind") & is_word(after(word, -1), "of")),
+            valence,
+            0.0,
+        )
+
+        # Words before the first "but" count half, words after it half again
+        no_but = np.iinfo(int).max
+        first_but = np.full(len(texts), no_but)
+        is_but = is_word(word, "but")
+        np.minimum.at(first_but, doc[is_but], position[is_but])
+        first_but = first_but[doc]
+        valence *= np.select(
+            [
+                (first_but != no_but) & (position < first_but),
+                position > first_but,
+            ],
+            [0.5, 1.5],
+            1.0,
+        )
+
+        return self._polarity_scores(texts, lengths, doc, valence)
+
+    @staticmethod
+    def _polarity_scores(texts, lengths, doc, valence) -> np.ndarray:
+        count = len(texts)
+
+        def per_text(weights):
+            return np.bincount(doc, weights=weights, minlength=count).astype(
+                float,
+            )
+
+        total = per_text(valence)
+        pos_sum = per_text(np.where(valence > 0, valence + 1, 0.0))
+        neg_sum = per_text(np.where(valence < 0, valence - 1, 0.0))
+        neu_count = per_text(valence == 0)
+
+        exclamations = np.minimum(
+            np.fromiter((text.count("!") for text in texts), int, count),
+            4,
+        )
+        questions = np.fromiter(
+            (text.count("?") for text in texts),
+            int,
+            count,
+        )
+        emphasis = exclamations * EXCLAMATION_INCREMENT + np.select(
+            [questions > 3, questions > 1],
+            [MAX_QUESTION_EMPHASIS, questions * QUESTION_INCREMENT],
+            0.0,
+        )
+
+        total += np.sign(total) * emphasis
+        compound = total / np.sqrt(total * total + NORMALISATION_ALPHA)
+        # Emphasis goes to whichever side dominates
+        pos_emphasis = np.where(pos_sum > -neg_sum, emphasis, 0.0)
+        neg_emphasis = np.where(pos_sum < -neg_sum, emphasis, 0.0)
+        pos_sum += pos_emphasis
+        neg_sum -= neg_emphasis
+
+        scored = lengths > 0
+        denominator = np.where(scored, pos_sum - neg_sum + neu_count, 1.0)
+        scores = {
+            "pos": np.round(np.abs(pos_sum / denominator), 3),
+            "neu": np.round(np.abs(neu_count / denominator), 3),
+            "neg": np.round(np.abs(neg_sum / denominator), 3),
+            "compound": np.round(np.clip(compound, -1.0, 1.0), 4),
+        }
+        return np.where(
+            scored[:, None],
+            np.column_stack(
+                [scores[key] for key in SENTIMENT_SCORE_COLUMNS],
+            ),
+            0.0,
+        ).reshape(count, len(SENTIMENT_SCORE_COLUMNS))
+
+
+SENTIMENT_ENGINES = {
+    engine.name: engine for engine in (VaderEngine, LexiconEngine)
+}
+_engines = {}
+
+
+def get_sentiment_engine(name: str = VaderEngine.name) -> SentimentEngine:
+    """
+    Returns the process-wide sentiment engine called `name`, one of
+    `SENTIMENT_ENGINES`.
+    """
+    if name not in SENTIMENT_ENGINES:
+        raise ValueError(
+            f"Unknown sentiment engine {name!r}, expected one of "
+            f"{', '.join(SENTIMENT_ENGINES)}",
+        )
+    if name not in _engines:
+        _engines[name] = SENTIMENT_ENGINES[name]()
+    return _engines[name]
@@ -9,6 +9,10 @@ from app.extensions import db
 from app.env import NEWS_API_KEY
 from app.constants import TOP_CRYPTOCURRENCIES_LIMIT
 from app.utils.decorators import transactional
+from app.services.sentiment.scoring import (
+    news_sentiment_text,
+    score_sentiments,
+)
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 
@@ -86,6 +90,12 @@ def store_news_data(symbol: str, articles: List[dict]):
                 or 'No content available',
             },
         )
+    scores = score_sentiments(
+        news_sentiment_text(value['title'], value['description'])
+        for value in values
+    )
+    for value, score in zip(values, scores):
+        value.update(score)
     stmt = insert(CryptoNewsData).values(values)
     stmt = stmt.on_conflict_do_nothing(
         index_elements=['symbol', 'timestamp', 'source_url'],
@@ -0,0 +1,221 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import getLogger
+from sqlalchemy.dialects.postgresql import insert
+
+from app.extensions import db
+from app.models import CryptoSentimentAggregateData
+from app.services.sentiment.engines import get_sentiment_engine
+from app.services.sentiment.scoring import (
+    SentimentScoreCache,
+    rescore_sentiment,
+)
+from app.services.sentiment.sentiment_analysis import (
+    analyse_sentiment_data,
+    fetch_coingecko_sentiment,
+    refresh_sentiment_buckets,
+    sum_sentiment_buckets,
+)
+from app.utils import convert_timestamp_to_utc
+from app.utils.decorators import transactional
+
+logger = getLogger(__name__)
+
+# Days of social data each rebuilt row covers, as in the live task
+REBUILD_WINDOW_DAYS = 2
+PARTITION = timedelta(days=1)
+AGGREGATE_COLUMNS = [
+    "normalised_up_percentage",
+    "normalised_down_percentage",
+    "avg_positive_sentiment",
+    "avg_neutral_sentiment",
+    "avg_negative_sentiment",
+    "avg_compound_sentiment",
+    "earliest_post",
+]
+
+
+@dataclass
+class SentimentRebuildReport:
+    days: int = 0
+    failed: int = 0
+    scored: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def days_per_second(self) -> float:
+        return self.days / self.seconds if self.seconds else 0.0
+
+
+def day_partitions(since: datetime, until: datetime) -> list[datetime]:
+    """
+    Returns the start of each UTC day from the day of `since` up to
+    `until`.
+    """
+    day = convert_timestamp_to_utc(since).floor("D").to_pydatetime()
+    until = convert_timestamp_to_utc(until).to_pydatetime()
+    days = []
+    while day < until:
+        days.append(day)
+        day += PARTITION
+    return days
+
+
+_worker_app = None
+
+
+def _init_worker():
+    # Each worker process gets its own app, and so its own connections
+    global _worker_app
+    from app import create_app
+
+    _worker_app = create_app()
+    _worker_app.app_context().push()
+
+
+@transactional
+def _score_day(day: datetime, engine: str | None) -> int:
+    # Days already run in parallel, so each scores its texts in-process.
+    # Worker processes are not daemons, and would each start a pool.
+    if engine is None:
+        scored = rescore_sentiment(
+            day,
+            day + PARTITION,
+            unscored_only=True,
+            workers=1,
+        )
+    else:
+        cache = SentimentScoreCache(engine=get_sentiment_engine(engine))
+        scored = rescore_sentiment(day, day + PARTITION, cache, workers=1)
+    refresh_sentiment_buckets(day, day + PARTITION)
+    return scored
+
+
+@transactional
+def _aggregate_day(day: datetime, window_days: int) -> list[dict]:
+    until = day + PARTITION
+    earliest = until - timedelta(days=window_days)
+    records = analyse_sentiment_data(
+        fetch_coingecko_sentiment(until),
+        sum_sentiment_buckets(earliest, until),
+        earliest,
+    )
+    # Only plain values go back to the parent process
+    return [
+        {
+            "symbol": record.symbol,
+            "timestamp": until,
+            **{
+                column: getattr(record, column) for column in AGGREGATE_COLUMNS
+            },
+        }
+        for record in records
+    ]
+
+
+def _run_partitions(fn, days: list[datetime], workers: int, *args):
+    """
+    Yields each of `days` with the result of `fn(day, *args)`, or the
+    exception it raised, running up to `workers` days at once in worker
+    processes. A single worker runs them in this process.
+    """
+    if workers <= 1:
+        for day in days:
+            try:
+                yield day, fn(day, *args)
+            except Exception as e:
+                yield day, e
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+    ) as executor:
+        futures = {executor.submit(fn, day, *args): day for day in days}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                yield day, future.result()
+            except Exception as e:
+                yield day, e
+
+
+@transactional
+def store_sentiment_aggregates(rows: list[dict]):
+    """
+    Upserts aggregate sentiment rows, replacing rows stored for the same
+    symbol and time.
+    """
+    if not rows:
+        return
+    stmt = insert(CryptoSentimentAggregateData).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol", "timestamp"],
+        set_={column: stmt.excluded[column] for column in AGGREGATE_COLUMNS},
+    )
+    db.session.execute(stmt)
+
+
+def rebuild_sentiment(
+    since: datetime,
+    until: datetime,
+    workers: int | None = None,
+    window_days: int = REBUILD_WINDOW_DAYS,
+    engine: str | None = None,
+) -> SentimentRebuildReport:
+    """
+    Rebuilds the aggregate sentiment history from `since` until `until`,
+    one row per symbol for each day, timestamped at the end of the day and
+    covering the `window_days` before it. Days that fail are logged,
+    counted and skipped.
+
+    The social data in those windows that has no scores is scored first,
+    or with `engine`, all of it is scored again with that sentiment
+    engine, and the hourly sentiment buckets of those days are recomputed.
+    Days are scored, then aggregated from the buckets, by up to `workers`
+    processes (all cores by default), each working on its own days, while
+    this process upserts the aggregates of each finished day.
+    """
+    started = time.perf_counter()
+    report = SentimentRebuildReport()
+    days = day_partitions(since, until)
+    if not days:
+        return report
+    workers = min(workers or os.cpu_count() or 1, len(days))
+    # Workers only see committed data
+    db.session.commit()
+    logger.info(f"Rebuilding sentiment for {len(days)} days")
+
+    window = timedelta(days=window_days)
+    for day, result in _run_partitions(
+        _score_day,
+        day_partitions(days[0] - window, days[-1] + PARTITION),
+        workers,
+        engine,
+    ):
+        if isinstance(result, Exception):
+            logger.error(f"Error scoring sentiment of {day}: {result}")
+            report.failed += 1
+        else:
+            report.scored += result
+
+    for day, result in _run_partitions(
+        _aggregate_day,
+        days,
+        workers,
+        window_days,
+    ):
+        if isinstance(result, Exception):
+            logger.error(f"Error aggregating sentiment of {day}: {result}")
+            report.failed += 1
+            continue
+        store_sentiment_aggregates(result)
+        report.days += 1
+        report.rows += len(result)
+
+    report.seconds = time.perf_counter() - started
+    return report
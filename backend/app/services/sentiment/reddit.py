@@ -1,7 +1,5 @@
 import logging
 import time
-import praw
-from app.config import Config
 import re
 import threading
 from datetime import datetime, timezone
@@ -14,12 +12,13 @@ from app.models.crypto import (
 from app.extensions import db
 from typing import List
 from sqlalchemy.dialects.postgresql import insert
-from app.env import REDDIT_CLIENT_ID, REDDIT_USER_AGENT, REDDIT_CLIENT_SECRET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import scoped_session, sessionmaker
 from app.utils import model_to_dict
+from app.services.sentiment.reddit_client import get_reddit_client_pool
+from app.services.sentiment.scoring import score_sentiments
 
 from app.constants import TOP_CRYPTOCURRENCIES_LIMIT
 
@@ -41,9 +40,6 @@ def get_thread_session():
 SAFE_TEXT_LENGTH_BUFFER = 103
 # Max length for text to fit in PostgreSQL B-tree index
 SAFE_TEXT_LENGTH = 2000 - SAFE_TEXT_LENGTH_BUFFER
-SLEEP_PER_REDDIT_REQUEST = (
-    0.5  # Sleep time between chunks to avoid rate limits
-)
 
 
 def preprocess_text(text: str) -> str:
@@ -67,20 +63,6 @@ def preprocess_text(text: str) -> str:
     return cleaned_text
 
 
-def create_reddit_client() -> praw.Reddit:
-    """Create and return a Reddit API client."""
-    client = praw.Reddit(
-        client_id=REDDIT_CLIENT_ID,
-        client_secret=REDDIT_CLIENT_SECRET,
-        redirect_uri=Config.SQLALCHEMY_DATABASE_URI,
-        user_agent=REDDIT_USER_AGENT,
-    )
-    time.sleep(
-        SLEEP_PER_REDDIT_REQUEST,
-    )  # Sleep to avoid hitting API rate limits immediately
-    return client
-
-
 def process_submission(
     submission,
     currency: CryptoAsset,
@@ -287,31 +269,33 @@ def fetch_reddit_data_for_currency(
     source_id: int,
 ) -> List[CryptoRedditData]:
     """Fetch Reddit data for a specific cryptocurrency and subreddit."""
-    reddit = create_reddit_client()
     data = []
 
     # Search for both symbol and name
     search_terms = [currency.symbol, currency.name]
 
-    for search_term in search_terms:
-        try:
-            term_data = fetch_reddit_data_for_search_term(
-                reddit,
-                search_term,
-                currency,
-                subreddit,
-                time_range,
-                all_currencies,
-                source_id,
-                timestamp,
-            )
-            data.extend(term_data)
+    # Submissions load their comments lazily, so the client is held until
+    # they are processed
+    with get_reddit_client_pool().client() as reddit:
+        for search_term in search_terms:
+            try:
+                term_data = fetch_reddit_data_for_search_term(
+                    reddit,
+                    search_term,
+                    currency,
+                    subreddit,
+                    time_range,
+                    all_currencies,
+                    source_id,
+                    timestamp,
+                )
+                data.extend(term_data)
 
-        except Exception as e:
-            logger.error(
-                f"Error fetching Reddit data for {currency.symbol} "
-                f"with term '{search_term}': {e}",
-            )
+            except Exception as e:
+                logger.error(
+                    f"Error fetching Reddit data for {currency.symbol} "
+                    f"with term '{search_term}': {e}",
+                )
 
     return data
 
@@ -407,6 +391,14 @@ def store_reddit_data(
         f"in batches of {batch_size}",
     )
 
+    # Scored once here, so each text is looked up in the score cache once
+    for data, scores in zip(
+        reddit_data,
+        score_sentiments(data.text for data in reddit_data),
+    ):
+        for column, value in scores.items():
+            setattr(data, column, value)
+
     session = get_thread_session()
 
     try:
@@ -0,0 +1,140 @@
+import queue
+import threading
+from contextlib import contextmanager
+from logging import getLogger
+
+import praw
+from prawcore import Requestor
+
+from app.config import Config
+from app.env import REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT
+from app.utils.ratelimit import TokenBucket
+
+logger = getLogger(__name__)
+
+REMAINING_HEADER = "X-Ratelimit-Remaining"
+RESET_HEADER = "X-Ratelimit-Reset"
+# Reddit allows OAuth clients 100 requests per minute, averaged over a
+# 10 minute window. The headers take over from the first response.
+REDDIT_REQUESTS_PER_MINUTE = 100
+REDDIT_REQUEST_BURST = 10
+# One client per worker thread of the collection task
+REDDIT_CLIENT_POOL_SIZE = 10
+
+
+def track_rate_limit(limiter: TokenBucket, response):
+    """
+    Spreads the requests Reddit reports are left evenly over the rest of
+    its rate limit window, or holds back every request until the window
+    resets once none are left.
+    """
+    remaining = response.headers.get(REMAINING_HEADER)
+    reset = response.headers.get(RESET_HEADER)
+    if remaining is None or reset is None:
+        return
+    remaining, reset = float(remaining), float(reset)
+    if remaining < 1:
+        logger.warning(f"Reddit rate limit reached, pausing for {reset}s")
+        limiter.pause(reset)
+        return
+    limiter.set_rate(remaining / max(reset, 1))
+    limiter.cap(remaining)
+
+
+class RateLimitedRequestor(Requestor):
+    """
+    prawcore requestor that takes a token from a shared limiter before
+    every request and updates it from the rate limit headers of every
+    response.
+    """
+
+    def __init__(self, *args, limiter: TokenBucket, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def request(self, *args, **kwargs):
+        self.limiter.acquire()
+        response = super().request(*args, **kwargs)
+        track_rate_limit(self.limiter, response)
+        return response
+
+
+class RedditClientPool:
+    """
+    Thread-safe pool of up to `size` long-lived Reddit clients.
+
+    praw clients are not safe to share between threads, so each thread
+    checks one out for as long as it needs it, and waits for one to be
+    returned when all are in use. Clients are created on first use and
+    keep their OAuth token and connections across checkouts. All of them
+    share one rate limiter, as Reddit counts requests per OAuth client.
+    """
+
+    def __init__(
+        self,
+        size: int = REDDIT_CLIENT_POOL_SIZE,
+        limiter: TokenBucket | None = None,
+    ):
+        self.size = size
+        self.limiter = limiter or TokenBucket(
+            capacity=REDDIT_REQUEST_BURST,
+            rate=REDDIT_REQUESTS_PER_MINUTE / 60,
+        )
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_client(self) -> praw.Reddit:
+        return praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            redirect_uri=Config.SQLALCHEMY_DATABASE_URI,
+            user_agent=REDDIT_USER_AGENT,
+            requestor_class=RateLimitedRequestor,
+            requestor_kwargs={"limiter": self.limiter},
+        )
+
+    def _checkout(self) -> praw.Reddit:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return self._create_client()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def client(self):
+        """
+        Checks out a client for the duration of the `with` block.
+        """
+        reddit = self._checkout()
+        try:
+            yield reddit
+        finally:
+            self._idle.put(reddit)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_reddit_client_pool() -> RedditClientPool:
+    """
+    Returns the process-wide Reddit client pool, so all requests share one
+    set of clients and one rate limit.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RedditClientPool()
+        return _pool
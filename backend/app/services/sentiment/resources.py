@@ -0,0 +1,46 @@
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# NLTK resources used by the sentiment services, by downloader package
+NLTK_RESOURCES = {
+    "punkt_tab": "tokenizers/punkt_tab/english/",
+}
+
+
+class MissingNLTKResourceError(LookupError):
+    """
+    Raised when an NLTK resource has not been provisioned locally.
+    """
+
+    def __init__(self, package: str, search_paths: list[str]):
+        super().__init__(package, search_paths)
+        self.package = package
+        self.search_paths = search_paths
+
+    def __str__(self) -> str:
+        return (
+            f"NLTK resource '{self.package}' was not found in any of "
+            f"{', '.join(self.search_paths)}. Provision it ahead of time "
+            f"with `python -m nltk.downloader -d <dir> {self.package}` and "
+            f"point the NLTK_DATA environment variable at <dir>."
+        )
+
+
+@lru_cache(maxsize=None)
+def require_nltk_resource(package: str) -> str:
+    """
+    Returns the local path of an NLTK downloader `package`, looking it up
+    on first use only. Nothing is ever downloaded, so startup never depends
+    on the network: resources are provisioned at build time instead.
+    """
+    # Imported here so importing the sentiment services stays cheap
+    import nltk
+
+    try:
+        path = nltk.data.find(NLTK_RESOURCES[package])
+    except LookupError:
+        raise MissingNLTKResourceError(package, list(nltk.data.path))
+    logger.debug(f"Loaded NLTK resource {package} from {path}")
+    return str(path)
@@ -0,0 +1,395 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+import numpy as np
+from sqlalchemy import Connection, select, update
+from sqlalchemy.dialects.postgresql import insert
+from app.extensions import db
+from app.models import (
+    CachedSentimentScore,
+    CryptoNewsData,
+    CryptoRedditData,
+    YoutubeComment,
+)
+from app.utils.cache import CacheStats, LRUCache
+from app.utils.decorators import transactional
+
+logger = logging.getLogger(__name__)
+
+# Stored score columns, keyed by the VADER score they hold
+SENTIMENT_SCORE_COLUMNS = {
+    "pos": "sentiment_pos",
+    "neu": "sentiment_neu",
+    "neg": "sentiment_neg",
+    "compound": "sentiment_compound",
+}
+SCORE_BATCH_SIZE = 10_000
+# Texts sent to a scoring process at a time
+SCORE_CHUNK_SIZE = 500
+# Scores kept in memory by each process
+SCORE_CACHE_SIZE = 100_000
+
+_analyser = None
+
+
+def get_sentiment_analyser():
+    """
+    Returns the process-wide VADER analyser, loading its lexicon, which is
+    bundled with the package, on first use.
+    """
+    global _analyser
+    if _analyser is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+        _analyser = SentimentIntensityAnalyzer()
+    return _analyser
+
+
+def _score_chunk(texts: list[str]) -> np.ndarray:
+    analyser = get_sentiment_analyser()
+    scores = np.empty((len(texts), len(SENTIMENT_SCORE_COLUMNS)))
+    for row, text in enumerate(texts):
+        polarity = analyser.polarity_scores(text)
+        scores[row] = [polarity[key] for key in SENTIMENT_SCORE_COLUMNS]
+    return scores
+
+
+def score_texts(
+    texts,
+    workers: int | None = None,
+    chunk_size: int = SCORE_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Scores `texts` with VADER, returning one row of pos, neu, neg and
+    compound scores per text.
+
+    Texts are split into chunks of `chunk_size` and scored by up to
+    `workers` processes (all cores by default), each loading the lexicon
+    once. A single chunk, or a caller that is itself a daemon process and
+    so may not start children, is scored in this process.
+    """
+    texts = list(texts)
+    chunks = [
+        texts[start : start + chunk_size]
+        for start in range(0, len(texts), chunk_size)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return _score_chunk(texts)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=get_sentiment_analyser,
+    ) as executor:
+        return np.vstack(list(executor.map(_score_chunk, chunks)))
+
+
+def score_columns(scores: np.ndarray) -> list[dict[str, float]]:
+    """
+    Turns rows returned by `score_texts` into score column values.
+    """
+    columns = list(SENTIMENT_SCORE_COLUMNS.values())
+    return [dict(zip(columns, row)) for row in scores.tolist()]
+
+
+def text_hash(text: str) -> str:
+    """
+    Returns the cache key of `text`, the md5 of the text with whitespace
+    collapsed. VADER splits texts on whitespace, so this does not change
+    their scores.
+    """
+    return hashlib.md5(" ".join(text.split()).encode()).hexdigest()
+
+
+@contextmanager
+def _store_transaction():
+    """
+    Yields a connection in a transaction of its own, committed on exit.
+    Scores cached through it are kept when the caller's transaction is
+    rolled back or never committed, and their rows are not locked until
+    the caller commits.
+    """
+    bind = db.session.get_bind()
+    if isinstance(bind, Connection):
+        # A session bound to a single connection, as in tests, shares it
+        with bind.begin_nested():
+            yield bind
+    else:
+        with bind.begin() as connection:
+            yield connection
+
+
+@dataclass(frozen=True)
+class ScoreCacheStats:
+    memory: CacheStats
+    store_hits: int
+    scored: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory.hits + self.memory.misses
+        if not lookups:
+            return 0.0
+        return (self.memory.hits + self.store_hits) / lookups
+
+
+class SentimentScoreCache:
+    """
+    Memoises VADER scores by `text_hash`, in an in-process LRU in front of
+    the cached_sentiment_score table shared by every process.
+
+    With an `engine` from `app.services.sentiment.engines`, its scores are
+    memoised instead, under keys that also hash the engine's name so they
+    never mix with VADER's.
+    """
+
+    def __init__(self, maxsize: int = SCORE_CACHE_SIZE, engine=None):
+        self.engine = engine
+        self.memory = LRUCache(maxsize)
+        self.store_hits = 0
+        self.scored = 0
+
+    def _load(self, hashes: list[str]) -> dict[str, tuple]:
+        with _store_transaction() as connection:
+            rows = connection.execute(
+                select(
+                    CachedSentimentScore.text_hash,
+                    *(
+                        getattr(CachedSentimentScore, column)
+                        for column in SENTIMENT_SCORE_COLUMNS.values()
+                    ),
+                ).where(CachedSentimentScore.text_hash.in_(hashes)),
+            ).all()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def _save(self, scores: dict[str, tuple]):
+        columns = list(SENTIMENT_SCORE_COLUMNS.values())
+        with _store_transaction() as connection:
+            connection.execute(
+                insert(CachedSentimentScore).on_conflict_do_nothing(),
+                [
+                    {"text_hash": key, **dict(zip(columns, values))}
+                    for key, values in scores.items()
+                ],
+            )
+
+    def _key(self, text: str) -> str:
+        if self.engine is None or self.engine.name == "vader":
+            return text_hash(text)
+        return text_hash(f"{self.engine.name}:{text}")
+
+    def _score(self, texts: list[str], workers: int | None) -> np.ndarray:
+        if self.engine is None:
+            return score_texts(texts, workers)
+        return self.engine.score(texts, workers)
+
+    def score(self, texts, workers: int | None = None) -> np.ndarray:
+        """
+        Returns the same rows as `score_texts`, scoring only the texts that
+        neither this process nor the shared store has seen before.
+        """
+        texts = list(texts)
+        hashes = [self._key(text) for text in texts]
+        found = {}
+        missing = []
+        # Each distinct text is looked up once
+        for key in dict.fromkeys(hashes):
+            cached = self.memory.get(key)
+            if cached is None:
+                missing.append(key)
+            else:
+                found[key] = cached
+
+        if missing:
+            stored = self._load(missing)
+            text_of = dict(zip(hashes, texts))
+            unscored = [key for key in missing if key not in stored]
+            scores = self._score([text_of[key] for key in unscored], workers)
+            scored = dict(zip(unscored, map(tuple, scores.tolist())))
+            if scored:
+                self._save(scored)
+            self.store_hits += len(stored)
+            self.scored += len(scored)
+            for key, values in {**stored, **scored}.items():
+                self.memory.set(key, values)
+                found[key] = values
+
+        return np.array(
+            [found[key] for key in hashes],
+            dtype=float,
+        ).reshape(len(texts), len(SENTIMENT_SCORE_COLUMNS))
+
+    def stats(self) -> ScoreCacheStats:
+        return ScoreCacheStats(
+            memory=self.memory.stats(),
+            store_hits=self.store_hits,
+            scored=self.scored,
+        )
+
+
+score_cache = SentimentScoreCache()
+
+
+def score_sentiments(texts) -> list[dict[str, float]]:
+    """
+    Scores `texts` through the score cache, keyed by the columns the scores
+    are stored in.
+    """
+    return score_columns(score_cache.score(texts))
+
+
+def score_sentiment(text: str) -> dict[str, float]:
+    """
+    Scores `text` through the score cache, keyed by the columns the scores
+    are stored in.
+    """
+    return score_sentiments([text])[0]
+
+
+def log_score_cache_stats():
+    stats = score_cache.stats()
+    logger.info(
+        f"Sentiment score cache: {stats.hit_rate:.1%} hit rate, "
+        f"{stats.memory.hits} memory hits, {stats.store_hits} store hits, "
+        f"{stats.scored} scored, {stats.memory.evictions} evicted",
+    )
+
+
+def news_sentiment_text(title: str, description: str) -> str:
+    """Returns the text a news article is scored on."""
+    return (title or "") + (description or "")
+
+
+# Scored social data: model, primary key, text columns and time column
+SCORED_SOURCES = [
+    (
+        CryptoRedditData,
+        [
+            CryptoRedditData.symbol,
+            CryptoRedditData.subreddit,
+            CryptoRedditData.text,
+        ],
+        [CryptoRedditData.text],
+        CryptoRedditData.timestamp,
+    ),
+    (
+        CryptoNewsData,
+        [
+            CryptoNewsData.symbol,
+            CryptoNewsData.timestamp,
+            CryptoNewsData.source_url,
+        ],
+        [CryptoNewsData.title, CryptoNewsData.description],
+        CryptoNewsData.timestamp,
+    ),
+    (
+        YoutubeComment,
+        [YoutubeComment.comment_id],
+        [YoutubeComment.text_original],
+        YoutubeComment.published_at,
+    ),
+]
+
+
+def _select_texts(key_columns, text_of):
+    key_names = {column.key for column in key_columns}
+    return select(
+        *key_columns,
+        *(column for column in text_of if column.key not in key_names),
+    )
+
+
+def _store_scores(model, key_columns, text_of, rows, cache, workers=None):
+    texts = [
+        "".join(getattr(row, column.key) or "" for column in text_of)
+        for row in rows
+    ]
+    updates = [
+        {
+            **{column.key: getattr(row, column.key) for column in key_columns},
+            **scores,
+        }
+        for row, scores in zip(
+            rows,
+            score_columns(cache.score(texts, workers)),
+        )
+    ]
+    # Bulk UPDATE by primary key
+    db.session.execute(update(model), updates)
+
+
+@transactional
+def _score_unscored_batch(model, key_columns, text_of, since_column, since):
+    rows = db.session.execute(
+        _select_texts(key_columns, text_of)
+        .where(
+            model.sentiment_compound.is_(None),
+            since_column >= since,
+        )
+        .limit(SCORE_BATCH_SIZE),
+    ).all()
+    if rows:
+        _store_scores(model, key_columns, text_of, rows, score_cache)
+    return len(rows)
+
+
+def score_unscored_sentiment(since: datetime) -> int:
+    """
+    Scores and stores the social data since `since` that was ingested
+    before scores were stored. Returns the number of rows scored.
+    """
+    total = 0
+    for model, key_columns, text_of, since_column in SCORED_SOURCES:
+        while True:
+            scored = _score_unscored_batch(
+                model,
+                key_columns,
+                text_of,
+                since_column,
+                since,
+            )
+            total += scored
+            if scored < SCORE_BATCH_SIZE:
+                break
+    if total:
+        logger.info(f"Scored {total} social data points missing scores.")
+    return total
+
+
+@transactional
+def rescore_sentiment(
+    since: datetime,
+    until: datetime,
+    cache: SentimentScoreCache | None = None,
+    unscored_only: bool = False,
+    workers: int | None = None,
+) -> int:
+    """
+    Scores the social data from `since` until `until` again through
+    `cache`, the VADER score cache by default, and stores the new scores.
+    With `unscored_only`, only rows without scores are scored. Texts are
+    scored by up to `workers` processes, as in `score_texts`. Returns the
+    number of rows scored.
+    """
+    cache = cache or score_cache
+    total = 0
+    for model, key_columns, text_of, time_column in SCORED_SOURCES:
+        query = _select_texts(key_columns, text_of).where(
+            time_column >= since,
+            time_column < until,
+        )
+        if unscored_only:
+            query = query.where(model.sentiment_compound.is_(None))
+        # Streamed from a server-side cursor, one batch in memory at a time
+        result = db.session.execute(
+            query.execution_options(yield_per=SCORE_BATCH_SIZE),
+        )
+        for rows in result.partitions():
+            _store_scores(model, key_columns, text_of, rows, cache, workers)
+            total += len(rows)
+    return total
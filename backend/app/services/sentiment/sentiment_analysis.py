@@ -1,33 +1,51 @@
 import logging
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import nltk
 from app.models import (
     CryptoRedditData,
     CryptoCoingeckoSentimentData,
     CryptoSentimentAggregateData,
+    CryptoSentimentBucket,
     CryptoNewsData,
     YoutubeComment,
     YoutubeCommentAnalysis,
     CryptoMarketData,
 )
 from app.extensions import db
+from app.services.sentiment.resources import require_nltk_resource
+from app.services.sentiment.scoring import (
+    SENTIMENT_SCORE_COLUMNS,
+    log_score_cache_stats,
+    score_unscored_sentiment,
+)
+from app.utils import convert_timestamp_to_utc
 from app.utils.decorators import transactional
 from datetime import datetime, timedelta
 from collections import defaultdict
-from sqlalchemy import select
-from dataclasses import dataclass
+from sqlalchemy import Float, case, delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
 from app.constants import TOP_CRYPTOCURRENCIES_LIMIT
 
 
-nltk.download('punkt_tab')
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class SocialDataPoint:
-    symbol: str
-    text: str
-    confidence: float
+# Compound score from which a text counts as positive, or below its
+# negative as negative
+SENTIMENT_THRESHOLD = 0.05
+# Social data stored this long before the last bucket refresh is treated as
+# new, in case its transaction was still open when the refresh ran
+SENTIMENT_BUCKET_OVERLAP = timedelta(hours=1)
+# Sums returned by `aggregate_social_sentiment`, keyed to the bucket
+# columns they are stored in
+SENTIMENT_BUCKET_COLUMNS = {
+    "avg_positive_sentiment": "positive_sum",
+    "avg_neutral_sentiment": "neutral_sum",
+    "avg_negative_sentiment": "negative_sum",
+    "avg_compound_score": "compound_sum",
+    "total_weight": "total_weight",
+    "positive_count": "positive_count",
+    "negative_count": "negative_count",
+    "neutral_count": "neutral_count",
+    "data_points": "data_points",
+}
 
 
 def process_crypto_sentiment_analysis(days_to_fetch: int = 2):
@@ -37,6 +55,7 @@ def process_crypto_sentiment_analysis(days_to_fetch: int = 2):
     """
     logger.info("Starting sentiment analysis task.")
     analyse_and_store_sentiment(days_to_fetch)
+    log_score_cache_stats()
     logger.info("Sentiment analysis task completed.")
 
 
@@ -46,10 +65,13 @@ def analyse_and_store_sentiment(days_to_fetch):
     # Set time range
     earliest = datetime.today() - timedelta(days=days_to_fetch)
 
-    coingecko_data, social_data = fetch_sentiment_data(earliest)
+    score_unscored_sentiment(earliest)
+    # Only the buckets of newly stored data are recomputed, the window is
+    # summed from all
+    refresh_sentiment_buckets(stale_sentiment_buckets_since(earliest))
     processed_data = analyse_sentiment_data(
-        coingecko_data,
-        social_data,
+        fetch_coingecko_sentiment(),
+        sum_sentiment_buckets(earliest),
         earliest,
     )
 
@@ -63,13 +85,13 @@ def analyse_and_store_sentiment(days_to_fetch):
     )
 
 
-@transactional
-def fetch_sentiment_data(
-    earliest,
-) -> tuple[list[CryptoCoingeckoSentimentData], list[SocialDataPoint]]:
-    """Fetch data from various sources for sentiment analysis."""
-    logger.info("Retrieving social data for analysis...")
-
+def fetch_coingecko_sentiment(
+    until: datetime | None = None,
+) -> list[CryptoCoingeckoSentimentData]:
+    """
+    Returns the latest Coingecko sentiment snapshot of the top
+    cryptocurrencies, or the latest one taken by `until`.
+    """
     # Fetch the latest set of coingecko aggregate data for the top 50 cryptocurrencies
     query = (
         select(CryptoCoingeckoSentimentData)
@@ -84,82 +106,232 @@ def fetch_sentiment_data(
         )
         .limit(TOP_CRYPTOCURRENCIES_LIMIT)
     )
-    coingecko_data = db.session.execute(query).scalars().all()
-
-    # Fetch recent social data for cryptocurrencies
-    reddit_data = CryptoRedditData.query.filter(
-        CryptoRedditData.timestamp >= earliest,
-    ).all()
-    news_data = CryptoNewsData.query.filter(
-        CryptoNewsData.timestamp >= earliest,
-    ).all()
-
-    youtube_stmt = (
-        select(YoutubeComment, YoutubeCommentAnalysis)
+    if until is not None:
+        query = query.where(CryptoCoingeckoSentimentData.timestamp <= until)
+    return db.session.execute(query).scalars().all()
+
+
+def _stored_scores(model) -> list:
+    return [
+        getattr(model, column) for column in SENTIMENT_SCORE_COLUMNS.values()
+    ]
+
+
+def _scored_rows(weight, model, time_column, earliest, until):
+    query = select(
+        weight.label("weight"),
+        time_column.label("time"),
+        *_stored_scores(model),
+    ).where(
+        model.sentiment_compound.is_not(None),
+        time_column >= earliest,
+    )
+    if until is not None:
+        query = query.where(time_column < until)
+    return query
+
+
+def _scored_social_data(earliest, until=None):
+    """
+    Returns the scored Reddit, news and YouTube data since `earliest`, and
+    before `until` if given, as one subquery of symbol, time, weight and
+    score columns.
+    """
+    youtube_confidence = (
+        func.coalesce(YoutubeCommentAnalysis.confidence_score, 0)
+        + func.coalesce(YoutubeCommentAnalysis.relevance_score, 0)
+        + func.coalesce(YoutubeCommentAnalysis.quality_score, 0)
+    ) / 3.0
+    return union_all(
+        _scored_rows(
+            youtube_confidence,
+            YoutubeComment,
+            YoutubeComment.published_at,
+            earliest,
+            until,
+        )
+        .add_columns(YoutubeCommentAnalysis.crypto_symbol.label("symbol"))
         .join(
             YoutubeCommentAnalysis,
             YoutubeComment.comment_id == YoutubeCommentAnalysis.comment_id,
-        )
-        .where(YoutubeComment.published_at >= earliest)
-    )
-    youtube_raw = db.session.execute(youtube_stmt).all()
-
-    # Extract data into new data transfer object
-    social_data = []
-
-    # Process YouTube data
-    for comment, analysis in youtube_raw:
-        aggregated_confidence = (
-            (analysis.confidence_score or 0)
-            + (analysis.relevance_score or 0)
-            + (analysis.quality_score or 0)
-        ) / 3
-        social_data.append(
-            SocialDataPoint(
-                symbol=analysis.crypto_symbol,
-                text=comment.text_original,
-                confidence=aggregated_confidence,
+        ),
+        _scored_rows(
+            CryptoRedditData.confidence,
+            CryptoRedditData,
+            CryptoRedditData.timestamp,
+            earliest,
+            until,
+        ).add_columns(CryptoRedditData.symbol.label("symbol")),
+        _scored_rows(
+            literal(1.0, Float),
+            CryptoNewsData,
+            CryptoNewsData.timestamp,
+            earliest,
+            until,
+        ).add_columns(CryptoNewsData.symbol.label("symbol")),
+    ).subquery()
+
+
+def _sentiment_sums(scored) -> list:
+    weight = scored.c.weight
+    compound = scored.c.sentiment_compound
+    return [
+        func.sum(scored.c.sentiment_pos * weight).label(
+            "avg_positive_sentiment",
+        ),
+        func.sum(scored.c.sentiment_neu * weight).label(
+            "avg_neutral_sentiment",
+        ),
+        func.sum(scored.c.sentiment_neg * weight).label(
+            "avg_negative_sentiment",
+        ),
+        func.sum(compound * weight).label("avg_compound_score"),
+        func.sum(weight).label("total_weight"),
+        func.sum(
+            case((compound >= SENTIMENT_THRESHOLD, weight), else_=0.0),
+        ).label("positive_count"),
+        func.sum(
+            case((compound <= -SENTIMENT_THRESHOLD, weight), else_=0.0),
+        ).label("negative_count"),
+        func.sum(
+            case(
+                (compound >= SENTIMENT_THRESHOLD, 0.0),
+                (compound <= -SENTIMENT_THRESHOLD, 0.0),
+                else_=weight,
             ),
-        )
+        ).label("neutral_count"),
+        func.count().label("data_points"),
+    ]
 
-    # Process Reddit data
-    for comment in reddit_data:
-        social_data.append(
-            SocialDataPoint(
-                symbol=comment.symbol,
-                text=comment.text,
-                confidence=comment.confidence,
-            ),
-        )
 
-    # Process News data
-    for article in news_data:
-        social_data.append(
-            SocialDataPoint(
-                symbol=article.symbol,
-                text=article.title + article.description,
-                confidence=1.0,
-            ),
+def _sums_by_symbol(query) -> dict[str, dict[str, float]]:
+    sums = {}
+    for row in db.session.execute(query).mappings():
+        sums[row["symbol"]] = {
+            key: float(value)
+            for key, value in row.items()
+            if key != "symbol"
+        }
+    return sums
+
+
+@transactional
+def aggregate_social_sentiment(
+    earliest,
+    until=None,
+) -> dict[str, dict[str, float]]:
+    """
+    Sums the confidence-weighted scores and sentiment counts of the Reddit,
+    news and YouTube data since `earliest`, and before `until` if given,
+    per symbol, in one query, so only the sums leave the database.
+    """
+    scored = _scored_social_data(earliest, until)
+    return _sums_by_symbol(
+        select(scored.c.symbol, *_sentiment_sums(scored)).group_by(
+            scored.c.symbol,
+        ),
+    )
+
+
+def _hour(timestamp) -> datetime:
+    return convert_timestamp_to_utc(timestamp).to_pydatetime()
+
+
+@transactional
+def stale_sentiment_buckets_since(earliest) -> datetime:
+    """
+    Returns the earliest time of the social data stored since the sentiment
+    buckets were last refreshed, but not before `earliest`. News and
+    YouTube comments are often stored days after they were posted, so
+    their buckets go stale long after the hour they cover.
+    """
+    earliest = _hour(earliest)
+    refreshed = db.session.scalar(
+        select(func.max(CryptoSentimentBucket.refreshed_at)),
+    )
+    if refreshed is None:
+        return earliest
+    # Reddit data is timestamped when it is fetched
+    stored_since = refreshed - SENTIMENT_BUCKET_OVERLAP
+    news = select(func.min(CryptoNewsData.timestamp)).where(
+        CryptoNewsData.ingested_at >= stored_since,
+    )
+    youtube = (
+        select(func.min(YoutubeComment.published_at))
+        .join(
+            YoutubeCommentAnalysis,
+            YoutubeComment.comment_id == YoutubeCommentAnalysis.comment_id,
         )
+        .where(YoutubeCommentAnalysis.timestamp >= stored_since)
+    )
+    stale = [stored_since, db.session.scalar(news), db.session.scalar(youtube)]
+    return max(earliest, min(_hour(time) for time in stale if time))
 
-    logger.info("Data successfully retrieved.")
-    return (coingecko_data, social_data)
+
+@transactional
+def refresh_sentiment_buckets(since, until=None) -> int:
+    """
+    Recomputes the hourly sentiment buckets from the hour of `since`, and
+    before `until` if given, from the scored social data in those hours.
+    Returns the number of buckets stored.
+    """
+    since = _hour(since)
+    stale = delete(CryptoSentimentBucket).where(
+        CryptoSentimentBucket.timestamp >= since,
+    )
+    if until is not None:
+        until = _hour(until)
+        stale = stale.where(CryptoSentimentBucket.timestamp < until)
+    db.session.execute(stale)
+
+    scored = _scored_social_data(since, until)
+    hour = func.date_trunc("hour", scored.c.time)
+    sums = select(scored.c.symbol, hour, *_sentiment_sums(scored)).group_by(
+        scored.c.symbol,
+        hour,
+    )
+    result = db.session.execute(
+        insert(CryptoSentimentBucket).from_select(
+            ["symbol", "timestamp", *SENTIMENT_BUCKET_COLUMNS.values()],
+            sums,
+        ),
+    )
+    return result.rowcount
+
+
+@transactional
+def sum_sentiment_buckets(earliest, until=None) -> dict[str, dict[str, float]]:
+    """
+    Returns the same sums as `aggregate_social_sentiment` from the hourly
+    sentiment buckets, with `earliest` and `until` rounded down to the
+    hour, reading one row per symbol and hour rather than every data point.
+    """
+    query = select(
+        CryptoSentimentBucket.symbol,
+        *(
+            func.sum(getattr(CryptoSentimentBucket, column)).label(key)
+            for key, column in SENTIMENT_BUCKET_COLUMNS.items()
+        ),
+    ).where(CryptoSentimentBucket.timestamp >= _hour(earliest))
+    if until is not None:
+        query = query.where(CryptoSentimentBucket.timestamp < _hour(until))
+    return _sums_by_symbol(query.group_by(CryptoSentimentBucket.symbol))
 
 
 def analyse_sentiment_data(
     coingecko,
-    social_data,
+    social_sums,
     earliest,
 ) -> list[CryptoSentimentAggregateData]:
     """
-    Analyses and normalise all sentiment data from various social sources.
+    Analyses and normalise all sentiment data from various social sources,
+    given the per-symbol sums of `aggregate_social_sentiment`.
     Returns result in the form of CryptoSentimentAggregatedata database objects.
     """
     logger.info("Analysing social data with Vader Sentiment Analysis Tool.")
 
     # Map of all sentiment data for each of the top cryptocurrencies
     currency_map = dict()
-    analyser = SentimentIntensityAnalyzer()
 
     # Process Coingecko data
     for data in coingecko:
@@ -168,25 +340,11 @@ def analyse_sentiment_data(
         rec["sentiment_down_percentage"] = data.sentiment_down_percentage
 
     # Process social media data
-    for data in social_data:
-        rec = currency_map.setdefault(data.symbol, defaultdict(float))
-        sentiment_dict = analyser.polarity_scores(data.text)
-        confidence = data.confidence
-
-        rec["avg_positive_sentiment"] += sentiment_dict['pos'] * confidence
-        rec["avg_neutral_sentiment"] += sentiment_dict['neu'] * confidence
-        rec["avg_negative_sentiment"] += sentiment_dict['neg'] * confidence
-        rec["avg_compound_score"] += sentiment_dict['compound'] * confidence
-        rec["total_weight"] += confidence
-
-        # Add 'weighted' counts for positive, negative and neutral sentiment based on
-        # assigned confidence
-        if sentiment_dict['compound'] >= 0.05:
-            rec["positive_count"] += confidence
-        elif sentiment_dict['compound'] <= -0.05:
-            rec["negative_count"] += confidence
-        else:
-            rec["neutral_count"] += confidence
+    for symbol, sums in social_sums.items():
+        currency_map.setdefault(symbol, defaultdict(float)).update(sums)
+    data_points = sum(
+        sums.get("data_points", 0) for sums in social_sums.values()
+    )
 
     # Get average sentiment from all data points
     processed_data = []
@@ -262,7 +420,7 @@ def analyse_sentiment_data(
 
     logger.info(
         "Successfully analysed %d data points.",
-        len(social_data),
+        data_points,
     )
     return processed_data
 
@@ -319,7 +477,10 @@ def apply_laplace_smoothing(
     }
 
 
-def tokenise_sentences(sentence) -> str:
+def tokenise_sentences(sentence) -> list[str]:
     """Tokenize sentence into multiple sentences using NLTK."""
-    split_sentences = nltk.tokenize.sent_tokenize(sentence, language='english')
+    require_nltk_resource("punkt_tab")
+    from nltk.tokenize import sent_tokenize
+
+    split_sentences = sent_tokenize(sentence, language='english')
     return split_sentences
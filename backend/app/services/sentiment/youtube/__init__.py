@@ -5,6 +5,7 @@ from sqlalchemy.dialects.postgresql import insert
 from app.models.youtube import YoutubeComment, YoutubeCommentAnalysis
 from app.extensions import db
 from app.utils.decorators import transactional
+from app.services.sentiment.scoring import score_sentiments
 from app.schemas.youtube_schema import YoutubeVideoInfo
 from .youtube_client import (
     build_youtube_client,
@@ -133,6 +134,11 @@ def _store_comments_and_analysis(
 
     # Bulk insert new comments
     if new_comments:
+        scores = score_sentiments(
+            comment['text_original'] for comment in new_comments
+        )
+        for comment, score in zip(new_comments, scores):
+            comment.update(score)
         stmt = insert(YoutubeComment).values(new_comments)
         db.session.execute(stmt)
         logger.info(
@@ -1,5 +1,7 @@
 from .decorators import transactional, retry_request
 from .filters import compose_filters
+from .bulk import BulkInsertResult, copy_dataframe
+from .ratelimit import TokenBucket
 from pandas import Timestamp
 
 
@@ -27,4 +29,7 @@ __all__ = [
     "compose_filters",
     "retry_request",
     "model_to_dict",
+    "BulkInsertResult",
+    "copy_dataframe",
+    "TokenBucket",
 ]
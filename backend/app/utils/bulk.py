@@ -0,0 +1,73 @@
+import io
+import uuid
+from dataclasses import dataclass
+
+import pandas as pd
+
+from app.extensions import db
+
+COPY_CHUNK_ROWS = 50_000
+
+
+@dataclass
+class BulkInsertResult:
+    inserted: int = 0
+    skipped: int = 0
+
+    def __add__(self, other: "BulkInsertResult") -> "BulkInsertResult":
+        return BulkInsertResult(
+            inserted=self.inserted + other.inserted,
+            skipped=self.skipped + other.skipped,
+        )
+
+
+def copy_dataframe(
+    model,
+    df: pd.DataFrame,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> BulkInsertResult:
+    """
+    Bulk insert a DataFrame into a model's table, skipping conflicting rows.
+
+    Rows are streamed with COPY into a temporary staging table and moved
+    across with a single INSERT ... SELECT ... ON CONFLICT DO NOTHING, so no
+    ORM instances are built and no existing keys need to be loaded first.
+    DataFrame columns must match the table's column names; omitted columns
+    take their server defaults. Runs inside the current session transaction.
+    """
+    if df.empty:
+        return BulkInsertResult()
+
+    table = model.__table__.name
+    staging = f"_copy_{table}_{uuid.uuid4().hex[:8]}"
+    columns = ", ".join(f'"{column}"' for column in df.columns)
+
+    db.session.flush()
+    cursor = db.session.connection().connection.driver_connection.cursor()
+    try:
+        cursor.execute(
+            f'CREATE TEMP TABLE "{staging}" AS '
+            f'SELECT {columns} FROM "{table}" WITH NO DATA',
+        )
+        for start in range(0, len(df), chunk_rows):
+            buffer = io.StringIO()
+            df.iloc[start : start + chunk_rows].to_csv(
+                buffer,
+                index=False,
+                header=False,
+            )
+            buffer.seek(0)
+            cursor.copy_expert(
+                f'COPY "{staging}" ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+        cursor.execute(
+            f'INSERT INTO "{table}" ({columns}) '
+            f'SELECT {columns} FROM "{staging}" ON CONFLICT DO NOTHING',
+        )
+        inserted = cursor.rowcount
+        cursor.execute(f'DROP TABLE "{staging}"')
+    finally:
+        cursor.close()
+
+    return BulkInsertResult(inserted=inserted, skipped=len(df) - inserted)
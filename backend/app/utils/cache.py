@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+import redis
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedSet:
+    values: frozenset[str]
+    fetched_at: float
+
+
+class ReferenceSetCache:
+    """
+    Caches a set of strings, such as the symbols listed on an exchange, for
+    `ttl` seconds where every worker process can read it.
+
+    The set is kept in Redis when `redis_url` is given, and otherwise in a
+    JSON file in `directory`. Cache errors are logged and treated as a miss,
+    so callers fall back to fetching the set themselves.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        ttl: float,
+        redis_url: str | None = None,
+        directory: str | Path | None = None,
+        clock=time.time,
+    ):
+        self.key = key
+        self.ttl = ttl
+        self._clock = clock
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self._path = Path(directory or tempfile.gettempdir()) / f"{key}.json"
+
+    def _read(self) -> str | None:
+        if self._redis is not None:
+            payload = self._redis.get(self.key)
+            return payload.decode() if payload else None
+        try:
+            return self._path.read_text()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, payload: str):
+        if self._redis is not None:
+            self._redis.set(self.key, payload, ex=int(self.ttl))
+            return
+        # Write then rename, so readers never see a partial file
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_text(payload)
+        os.replace(temp_path, self._path)
+
+    def get(self) -> CachedSet | None:
+        """
+        Returns the cached set, or None when it is missing or expired.
+        """
+        try:
+            payload = self._read()
+        except (OSError, redis.RedisError) as e:
+            logger.warning(f"Could not read {self.key} from cache: {e}")
+            return None
+        if payload is None:
+            return None
+
+        cached = json.loads(payload)
+        if self._clock() - cached["fetched_at"] >= self.ttl:
+            return None
+        return CachedSet(
+            values=frozenset(cached["values"]),
+            fetched_at=cached["fetched_at"],
+        )
+
+    def set(self, values) -> CachedSet:
+        cached = CachedSet(values=frozenset(values), fetched_at=self._clock())
+        payload = json.dumps(
+            {
+                "fetched_at": cached.fetched_at,
+                "values": sorted(cached.values),
+            },
+        )
+        try:
+            self._write(payload)
+        except (OSError, redis.RedisError) as e:
+            logger.warning(f"Could not write {self.key} to cache: {e}")
+        return cached
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory cache holding the `maxsize` most recently used
+    entries, counting hits, misses and evictions.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
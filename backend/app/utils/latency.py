@@ -0,0 +1,61 @@
+import bisect
+import threading
+
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of request latencies with log-spaced buckets.
+
+    Buckets grow by `growth` from `min_seconds` up to `max_seconds`, so
+    percentiles are accurate to within one bucket at any scale. Once
+    `max_samples` have been recorded all counts are halved, so the
+    histogram follows recent latencies rather than all-time ones.
+    """
+
+    def __init__(
+        self,
+        min_seconds: float = 0.001,
+        max_seconds: float = 60.0,
+        growth: float = 1.25,
+        max_samples: int = 10_000,
+    ):
+        bounds = [min_seconds]
+        while bounds[-1] < max_seconds:
+            bounds.append(bounds[-1] * growth)
+        self.bounds = bounds
+        self.max_samples = max_samples
+        self._counts = [0] * len(bounds)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._total
+
+    def record(self, seconds: float):
+        bucket = min(
+            bisect.bisect_left(self.bounds, seconds),
+            len(self.bounds) - 1,
+        )
+        with self._lock:
+            self._counts[bucket] += 1
+            self._total += 1
+            if self._total >= self.max_samples:
+                self._counts = [count // 2 for count in self._counts]
+                self._total = sum(self._counts)
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Returns the upper bound of the bucket holding the `q` quantile
+        (0 < q <= 1), or None before anything was recorded.
+        """
+        with self._lock:
+            if not self._total:
+                return None
+            rank = q * self._total
+            seen = 0
+            for bound, count in zip(self.bounds, self._counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+        return self.bounds[-1]
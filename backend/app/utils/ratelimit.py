@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Holds up to `capacity` tokens and refills at `rate` tokens per second.
+    `acquire` reserves tokens straight away and sleeps off any shortfall, so
+    concurrent callers are served in the order they asked.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        rate: float,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.capacity = capacity
+        self.rate = rate
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def cap(self, tokens: float):
+        """
+        Lowers the available tokens to at most `tokens`, e.g. to what a
+        server reports is left. A negative value makes callers wait until
+        it has been refilled.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, tokens)
+
+    def set_rate(self, rate: float):
+        """
+        Changes the refill rate from now on, e.g. to spread what a server
+        reports is left evenly over the rest of its window.
+        """
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """
+        Holds back every caller for at least `seconds`.
+        """
+        self.cap(-seconds * self.rate)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes `tokens` only if they are available right away.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Takes `tokens` from the bucket, blocking until they are available.
+        Returns the number of seconds spent waiting.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+        if wait:
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,70 @@
+"""
+Benchmark of the vectorised indicator engine against the per-symbol `ta`
+loop it replaced.
+
+Run from the backend directory with the usual environment configured:
+
+    python -m benchmarks.indicators
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator, MACD
+
+from app.services.market.indicators import compute_indicators
+
+SYMBOL_COUNTS = (150, 500, 2000)
+HOURS = 192
+REPEATS = 3
+
+
+def random_close_matrix(symbols: int, hours: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2025-01-01", periods=hours, freq="h", tz="UTC")
+    returns = rng.normal(0, 0.01, size=(hours, symbols))
+    return pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=index,
+        columns=[f"SYM{i}" for i in range(symbols)],
+    )
+
+
+def per_symbol_loop(close: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    results = {}
+    for symbol in close.columns:
+        df = close[[symbol]].rename(columns={symbol: 'close'})
+        df['ema'] = EMAIndicator(close=df['close']).ema_indicator()
+        df['rsi'] = RSIIndicator(close=df['close']).rsi()
+        df['macd'] = MACD(close=df['close']).macd()
+        results[symbol] = df
+    return results
+
+
+def best_of(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(
+        f"{'symbols':>8} {'ta loop (s)':>12} {'vectorised (s)':>15} {'x':>6}"
+    )
+    for symbols in SYMBOL_COUNTS:
+        close = random_close_matrix(symbols, HOURS)
+        loop = best_of(per_symbol_loop, close)
+        vectorised = best_of(compute_indicators, close)
+        print(
+            f"{symbols:>8} {loop:>12.3f} {vectorised:>15.4f} "
+            f"{loop / vectorised:>6.0f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
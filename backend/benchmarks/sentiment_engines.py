@@ -0,0 +1,115 @@
+"""
+Throughput of the lexicon sentiment engine against VADER, and how often the
+two agree.
+
+Scores the most recent stored Reddit, news and YouTube texts, or a
+synthetic corpus when the database has none. Texts agree when both engines
+put them in the same positive, neutral or negative class. Run from the
+backend directory with the usual environment configured:
+
+    python -m benchmarks.sentiment_engines
+"""
+
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import create_app
+from app.extensions import db
+from app.models import CryptoNewsData, CryptoRedditData, YoutubeComment
+from app.services.sentiment.engines import LexiconEngine, VaderEngine
+from app.services.sentiment.scoring import (
+    SENTIMENT_SCORE_COLUMNS,
+    news_sentiment_text,
+)
+from app.services.sentiment.sentiment_analysis import SENTIMENT_THRESHOLD
+
+TEXTS = 50_000
+COMPOUND = list(SENTIMENT_SCORE_COLUMNS).index("compound")
+WORDS = (
+    "bitcoin eth moon crash dump pump great terrible love hate not very "
+    "really bullish bearish scam gains losses hodl rekt amazing awful :) :( "
+    "but no never least kind of so this isn't GREAT TERRIBLE extremely "
+    "barely 🚀 😭 ! ?? the price is and to a"
+).split()
+
+
+def stored_texts(count: int) -> list[str]:
+    per_source = count // 3
+    reddit = select(CryptoRedditData.text).order_by(
+        CryptoRedditData.timestamp.desc(),
+    )
+    news = select(CryptoNewsData.title, CryptoNewsData.description).order_by(
+        CryptoNewsData.timestamp.desc(),
+    )
+    youtube = select(YoutubeComment.text_original).order_by(
+        YoutubeComment.published_at.desc(),
+    )
+    texts = db.session.scalars(reddit.limit(per_source)).all()
+    texts += [
+        news_sentiment_text(row.title, row.description)
+        for row in db.session.execute(news.limit(per_source))
+    ]
+    texts += db.session.scalars(youtube.limit(per_source)).all()
+    return [text for text in texts if text]
+
+
+def random_texts(count: int) -> list[str]:
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(5, 60, size=count)
+    return [" ".join(rng.choice(WORDS, size=length)) for length in lengths]
+
+
+def sentiment_class(compound: np.ndarray) -> np.ndarray:
+    return np.select(
+        [compound >= SENTIMENT_THRESHOLD, compound <= -SENTIMENT_THRESHOLD],
+        [1, -1],
+        0,
+    )
+
+
+def timed(engine, texts) -> tuple[float, np.ndarray]:
+    start = time.perf_counter()
+    scores = engine.score(texts, workers=1)
+    return time.perf_counter() - start, scores
+
+
+def main():
+    with create_app().app_context():
+        try:
+            texts = stored_texts(TEXTS)
+        except SQLAlchemyError as e:
+            print(f"Could not read stored texts: {e}")
+            texts = []
+    corpus = "stored"
+    if not texts:
+        corpus = "synthetic"
+        texts = random_texts(TEXTS)
+
+    vader_seconds, vader = timed(VaderEngine(), texts)
+    lexicon_seconds, lexicon = timed(LexiconEngine(), texts)
+
+    agreement = np.mean(
+        sentiment_class(vader[:, COMPOUND])
+        == sentiment_class(lexicon[:, COMPOUND]),
+    )
+    identical = np.mean(np.all(np.isclose(vader, lexicon), axis=1))
+    error = np.mean(np.abs(vader[:, COMPOUND] - lexicon[:, COMPOUND]))
+
+    print(f"{len(texts)} {corpus} texts")
+    print(f"{'engine':>8} {'seconds':>9} {'texts/s':>10}")
+    for name, seconds in (
+        ("vader", vader_seconds),
+        ("lexicon", lexicon_seconds),
+    ):
+        print(f"{name:>8} {seconds:>9.2f} {len(texts) / seconds:>10.0f}")
+    print(f"speedup: {vader_seconds / lexicon_seconds:.1f}x")
+    print(f"class agreement: {agreement:.2%}")
+    print(f"identical scores: {identical:.2%}")
+    print(f"mean compound difference: {error:.4f}")
+
+
+if __name__ == "__main__":
+    main()
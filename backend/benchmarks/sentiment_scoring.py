@@ -0,0 +1,48 @@
+"""
+Throughput of the VADER scoring engine by number of worker processes.
+
+Run from the backend directory with the usual environment configured:
+
+    python -m benchmarks.sentiment_scoring
+"""
+
+import os
+import time
+
+import numpy as np
+
+from app.services.sentiment.scoring import score_texts
+
+TEXTS = 50_000
+WORDS = (
+    "bitcoin eth moon crash dump pump great terrible love hate not very "
+    "really bullish bearish scam gains losses hodl rekt amazing awful :) :("
+).split()
+
+
+def random_texts(count: int) -> list[str]:
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(5, 60, size=count)
+    return [" ".join(rng.choice(WORDS, size=length)) for length in lengths]
+
+
+def main():
+    texts = random_texts(TEXTS)
+    cores = os.cpu_count() or 1
+    workers = sorted({1, *(2**i for i in range(5) if 2**i <= cores), cores})
+
+    print(f"{'workers':>8} {'seconds':>9} {'texts/s':>10} {'x':>6}")
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        score_texts(texts, workers=count)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"{count:>8} {elapsed:>9.2f} {TEXTS / elapsed:>10.0f} "
+            f"{baseline / elapsed:>6.1f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import factory
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import func, select
+
+from app.cli.cron import backfill_market_data_command
+from app.models.crypto import (
+    CryptoBackfillCheckpoint,
+    CryptoIndicatorState,
+    CryptoMarketData,
+)
+from app.services.market.backfill import (
+    BackfillReport,
+    backfill_market_data,
+    store_backfill_page,
+)
+from app.services.market.constants import BINANCE_FETCH_MAX_WORKERS
+from tests.factories.crypto import CryptoAssetFactory
+
+SINCE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+UNTIL = SINCE + timedelta(hours=2499)
+
+
+def _klines(symbol, interval, limit, start_time, end_time):
+    index = pd.date_range(start=start_time, end=end_time, freq="h")[:limit]
+    hours = (index - SINCE) // pd.Timedelta(hours=1)
+    return pd.DataFrame({"close": 100.0 + hours}, index=index)
+
+
+def _stored_candles(db_session, symbol: str) -> int:
+    return db_session.scalar(
+        select(func.count()).where(
+            CryptoMarketData.symbol == symbol,
+            CryptoMarketData.interval == "1h",
+        ),
+    )
+
+
+@patch("app.services.market.backfill.fetch_binance_price_history")
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_backfill_pages_and_checkpoints_each_pair(
+    mock_binance_symbols,
+    mock_price_history,
+    db_session,
+):
+    CryptoAssetFactory.create_batch(
+        size=2,
+        symbol=factory.Iterator(["BTC", "ETH"]),
+        ranking=factory.Iterator([1, 2]),
+    )
+    mock_binance_symbols.return_value = ["BTCUSDT", "ETHUSDT"]
+    mock_price_history.side_effect = _klines
+
+    report = backfill_market_data(SINCE, workers=2, until=UNTIL)
+
+    # 2500 candles per pair take three pages of at most 1000
+    assert mock_price_history.call_count == 6
+    assert (report.symbols, report.pages, report.rows) == (2, 6, 5000)
+    assert report.rows_per_second > 0
+    assert _stored_candles(db_session, "BTC") == 2500
+
+    checkpoint = db_session.get(CryptoBackfillCheckpoint, ("BTC", "1h"))
+    assert checkpoint.since == SINCE
+    assert checkpoint.cursor == UNTIL + timedelta(hours=1)
+
+    state = db_session.get(CryptoIndicatorState, ("BTC", "1h"))
+    assert state.candle_count == 2500
+
+
+@patch("app.services.market.backfill.fetch_binance_price_history")
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_interrupted_backfill_resumes_from_checkpoint(
+    mock_binance_symbols,
+    mock_price_history,
+    db_session,
+):
+    CryptoAssetFactory(symbol="BTC", ranking=1)
+    mock_binance_symbols.return_value = ["BTCUSDT"]
+
+    def fail_after_first_page(symbol, interval, limit, start_time, end_time):
+        if start_time > SINCE:
+            raise ConnectionError("connection reset")
+        return _klines(symbol, interval, limit, start_time, end_time)
+
+    mock_price_history.side_effect = fail_after_first_page
+    report = backfill_market_data(SINCE, workers=1, until=UNTIL)
+    assert (report.failed, report.rows) == (1, 1000)
+
+    mock_price_history.side_effect = _klines
+    mock_price_history.reset_mock()
+    report = backfill_market_data(SINCE, workers=1, until=UNTIL)
+
+    first_start = mock_price_history.call_args_list[0].kwargs["start_time"]
+    assert first_start == SINCE + timedelta(hours=1000)
+    assert (report.failed, report.rows) == (0, 1500)
+    assert _stored_candles(db_session, "BTC") == 2500
+
+
+@patch("app.services.market.backfill.fetch_binance_price_history")
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_stopped_backfill_rebuilds_finished_pairs_on_resume(
+    mock_binance_symbols,
+    mock_price_history,
+    db_session,
+):
+    CryptoAssetFactory.create_batch(
+        size=2,
+        symbol=factory.Iterator(["BTC", "ETH"]),
+        ranking=factory.Iterator([1, 2]),
+    )
+    mock_binance_symbols.return_value = ["BTCUSDT", "ETHUSDT"]
+    mock_price_history.side_effect = _klines
+
+    def stop_at_eth(symbol, *args, **kwargs):
+        if symbol == "ETH":
+            raise RuntimeError("worker lost")
+        return store_backfill_page(symbol, *args, **kwargs)
+
+    # BTC is fully stored before the run stops, without its rebuild
+    with patch(
+        "app.services.market.backfill.store_backfill_page",
+        side_effect=stop_at_eth,
+    ):
+        with pytest.raises(RuntimeError):
+            backfill_market_data(SINCE, workers=1, until=UNTIL)
+    checkpoint = db_session.get(CryptoBackfillCheckpoint, ("BTC", "1h"))
+    assert checkpoint.needs_rebuild
+    assert db_session.get(CryptoIndicatorState, ("BTC", "1h")) is None
+
+    report = backfill_market_data(SINCE, workers=1, until=UNTIL)
+
+    assert (report.symbols, report.rows) == (1, 2500)
+    assert not checkpoint.needs_rebuild
+    state = db_session.get(CryptoIndicatorState, ("BTC", "1h"))
+    assert state.candle_count == 2500
+
+
+@patch("app.cli.cron.backfill_market_data")
+def test_backfill_command_clamps_workers_to_pool(mock_backfill, app):
+    mock_backfill.return_value = BackfillReport()
+
+    result = app.test_cli_runner().invoke(
+        backfill_market_data_command,
+        ["--since", "2025-01-01", "--workers", "64"],
+    )
+
+    assert result.exit_code == 0, result.output
+    mock_backfill.assert_called_once_with(
+        datetime(2025, 1, 1),
+        workers=BINANCE_FETCH_MAX_WORKERS,
+    )
@@ -0,0 +1,117 @@
+import pickle
+from unittest.mock import MagicMock
+import pytest
+
+from app.services.market.binance_client import (
+    BinanceClient,
+    BinanceRateLimitError,
+    get_binance_client,
+)
+from app.utils.ratelimit import TokenBucket
+
+
+def _response(status_code=200, headers=None, body=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = body
+    return response
+
+
+def _client(clock, responses, weight_per_minute=600):
+    session = MagicMock()
+    session.get.side_effect = responses
+    client = BinanceClient(
+        base_url="https://binance.test",
+        weight_per_minute=weight_per_minute,
+        session=session,
+        clock=clock,
+    )
+    client.limiter = TokenBucket(
+        capacity=client.limiter.capacity,
+        rate=client.limiter.rate,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    return client, session
+
+
+def test_returns_json_with_timeout(fake_clock):
+    client, session = _client(
+        fake_clock,
+        [_response(body={"price": "1.0"})],
+    )
+
+    assert client.get("/api/v3/ticker/price", {"symbol": "BTCUSDT"}) == {
+        "price": "1.0",
+    }
+    session.get.assert_called_once_with(
+        "https://binance.test/api/v3/ticker/price",
+        params={"symbol": "BTCUSDT"},
+        timeout=client.timeout,
+    )
+    assert fake_clock.slept == []
+
+
+def test_reported_weight_lowers_budget(fake_clock):
+    # 600 weight per minute leaves 480 to spend, refilled at 8 per second
+    client, _ = _client(
+        fake_clock,
+        [
+            _response(headers={"X-MBX-USED-WEIGHT-1m": "476"}),
+            _response(headers={"X-MBX-USED-WEIGHT-1m": "478"}),
+        ],
+    )
+    client.get("/api/v3/klines", weight=2)
+    client.get("/api/v3/klines", weight=8)
+
+    # Only 4 weight was left in this minute, so the request waited
+    assert fake_clock.slept == [0.5]
+
+
+def test_spent_budget_waits_for_next_minute(fake_clock):
+    client, _ = _client(
+        fake_clock,
+        [
+            _response(headers={"X-MBX-USED-WEIGHT-1m": "480"}),
+            _response(),
+        ],
+    )
+    fake_clock.now = 45.0
+    client.get("/api/v3/klines", weight=2)
+    client.get("/api/v3/klines", weight=2)
+
+    assert fake_clock.slept[0] >= 15.0
+
+
+def test_rate_limited_request_is_retried_after_retry_after(fake_clock):
+    client, session = _client(
+        fake_clock,
+        [
+            _response(429, headers={"Retry-After": "7"}),
+            _response(body=[]),
+        ],
+    )
+
+    assert client.get("/api/v3/klines", weight=2) == []
+    assert session.get.call_count == 2
+    assert fake_clock.slept[0] >= 7.0
+
+
+def test_ban_is_not_retried(fake_clock):
+    client, session = _client(
+        fake_clock,
+        [_response(418, headers={"Retry-After": "120"})],
+    )
+
+    with pytest.raises(BinanceRateLimitError) as error:
+        client.get("/api/v3/klines", weight=2)
+
+    assert error.value.status_code == 418
+    assert error.value.retry_after == 120.0
+    assert session.get.call_count == 1
+    # Survives pickling, e.g. as a Celery task result
+    copied = pickle.loads(pickle.dumps(error.value))
+    assert str(copied) == "Binance returned 418, retry after 120.0s"
+
+
+def test_client_is_shared():
+    assert get_binance_client() is get_binance_client()
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from app.services.market.binance import (
+    get_binance_usdt_pairs,
+    get_tradable_cryptos,
+)
+from tests.factories.crypto import CryptoAssetFactory
+
+
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_pairs_are_fetched_once_per_ttl(mock_binance_symbols):
+    mock_binance_symbols.return_value = ["BTCUSDT", "ETHBTC", "ETHUSDT"]
+
+    assert get_binance_usdt_pairs() == frozenset({"BTCUSDT", "ETHUSDT"})
+    assert get_binance_usdt_pairs() == frozenset({"BTCUSDT", "ETHUSDT"})
+    assert mock_binance_symbols.call_count == 1
+
+
+@patch("app.services.market.binance.time")
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_missing_pair_refreshes_stale_cache(
+    mock_binance_symbols,
+    mock_time,
+    binance_symbol_cache,
+    db_session,
+):
+    CryptoAssetFactory(symbol="BTC", ranking=1)
+    CryptoAssetFactory(symbol="NEW", ranking=2)
+    binance_symbol_cache.set(["BTCUSDT"])
+    mock_binance_symbols.return_value = ["BTCUSDT", "NEWUSDT"]
+
+    # A freshly filled cache is trusted even if a pair is missing
+    mock_time.time.return_value = binance_symbol_cache.get().fetched_at + 60
+    assert list(get_tradable_cryptos()) == ["BTCUSDT"]
+    mock_binance_symbols.assert_not_called()
+
+    # A cryptocurrency new to the top list refreshes the stale cache
+    CryptoAssetFactory(symbol="LATE", ranking=3)
+    mock_binance_symbols.return_value.append("LATEUSDT")
+    mock_time.time.return_value += 15 * 60
+    assert sorted(get_tradable_cryptos()) == [
+        "BTCUSDT",
+        "LATEUSDT",
+        "NEWUSDT",
+    ]
+    assert mock_binance_symbols.call_count == 1
+
+
+@patch("app.services.market.binance.time")
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_known_unlisted_pair_does_not_refresh_cache(
+    mock_binance_symbols,
+    mock_time,
+    binance_symbol_cache,
+    db_session,
+):
+    CryptoAssetFactory(symbol="BTC", ranking=1)
+    CryptoAssetFactory(symbol="OLD", ranking=2)
+    binance_symbol_cache.set(["BTCUSDT"])
+    mock_binance_symbols.return_value = ["BTCUSDT"]
+    mock_time.time.return_value = binance_symbol_cache.get().fetched_at
+
+    mock_time.time.return_value += 15 * 60
+    assert list(get_tradable_cryptos()) == ["BTCUSDT"]
+    assert mock_binance_symbols.call_count == 1
+
+    # Still unlisted, so later runs trust the cache until it expires
+    mock_time.time.return_value += 15 * 60
+    assert list(get_tradable_cryptos()) == ["BTCUSDT"]
+    assert mock_binance_symbols.call_count == 1
+
+    # A cryptocurrency new to the top list is looked up again
+    CryptoAssetFactory(symbol="NEW", ranking=3)
+    assert list(get_tradable_cryptos()) == ["BTCUSDT"]
+    assert mock_binance_symbols.call_count == 2
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+from datetime import timezone
+import pandas as pd
+
+from app.services.market.binance import (
+    fetch_binance_price_histories,
+)
+
+
+def _price_history(price: float) -> pd.DataFrame:
+    end = pd.Timestamp.utcnow().floor('h')
+    index = pd.date_range(end=end, periods=2, freq="h", tz=timezone.utc)
+    return pd.DataFrame({"close": [price, price + 1]}, index=index)
+
+
+@patch("app.services.market.binance.fetch_binance_price_history")
+def test_fetches_every_symbol(mock_price_history):
+    prices = {"BTCUSDT": 30000.0, "ETHUSDT": 2000.0, "XRPUSDT": 0.5}
+    mock_price_history.side_effect = lambda symbol: _price_history(
+        prices[symbol],
+    )
+
+    histories = fetch_binance_price_histories(list(prices), max_workers=2)
+
+    assert set(histories) == set(prices)
+    for symbol, price in prices.items():
+        assert histories[symbol]['close'].iloc[0] == price
+
+
+@patch("app.services.market.binance.fetch_binance_price_history")
+def test_failed_symbols_are_left_out(mock_price_history):
+    def fetch(symbol):
+        if symbol == "ETHUSDT":
+            raise ValueError("bad response")
+        return _price_history(1.0)
+
+    mock_price_history.side_effect = fetch
+
+    histories = fetch_binance_price_histories(["BTCUSDT", "ETHUSDT"])
+
+    assert list(histories) == ["BTCUSDT"]
+
+
+def test_no_symbols_returns_empty():
+    assert fetch_binance_price_histories([]) == {}
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from app.services.market.binance_client import BinanceClient
+
+
+class StubBinance:
+    """
+    Local HTTP server answering every GET after `delay` seconds with the
+    server's name and `status`.
+    """
+
+    def __init__(self, name: str, delay: float, status: int = 200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(stub.delay)
+                body = json.dumps({"host": stub.name}).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-MBX-USED-WEIGHT-1m", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            daemon=True,
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    with StubBinance("primary", 0.01) as primary:
+        with StubBinance("mirror", 0.01) as mirror:
+            yield primary, mirror
+
+
+def _client(primary, mirror, hedge_default_delay=0.05, **kwargs):
+    return BinanceClient(
+        base_url=primary.url,
+        mirror_urls=(mirror.url,),
+        hedge_default_delay=hedge_default_delay,
+        **kwargs,
+    )
+
+
+def test_fast_primary_is_not_hedged(stubs):
+    primary, mirror = stubs
+    client = _client(primary, mirror)
+
+    assert client.get("/api/v3/ping") == {"host": "primary"}
+    assert (primary.requests, mirror.requests) == (1, 0)
+
+
+def test_slow_primary_is_hedged_to_mirror(stubs):
+    primary, mirror = stubs
+    primary.delay = 0.5
+    client = _client(primary, mirror)
+
+    started = time.perf_counter()
+    assert client.get("/api/v3/ping") == {"host": "mirror"}
+    assert time.perf_counter() - started < 0.4
+    assert mirror.requests == 1
+
+
+def test_rejected_hedge_waits_for_primary(stubs):
+    primary, mirror = stubs
+    primary.delay = 0.3
+    mirror.status = 503
+    client = _client(primary, mirror)
+
+    assert client.get("/api/v3/ping") == {"host": "primary"}
+    assert mirror.requests == 1
+
+
+def test_hedge_delay_follows_primary_latency(stubs):
+    primary, mirror = stubs
+    client = _client(
+        primary,
+        mirror,
+        hedge_default_delay=1.0,
+        hedge_min_samples=5,
+    )
+
+    for _ in range(5):
+        client.get("/api/v3/ping")
+
+    # Learned from the ~10ms the primary takes rather than the default
+    assert client.hedge_delay(primary.url) < 0.2
+    primary.delay = 0.5
+    assert client.get("/api/v3/ping") == {"host": "mirror"}
@@ -0,0 +1,160 @@
+import io
+import queue
+import threading
+import zipfile
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+
+from app.models.crypto import (
+    CryptoImportedDump,
+    CryptoIndicatorState,
+    CryptoMarketData,
+)
+from app.services.market import dumps
+from app.services.market.dumps import import_binance_dumps, read_kline_csv
+from tests.factories.crypto import CryptoAssetFactory
+
+HEADER = (
+    "open_time,open,high,low,close,volume,close_time,quote_volume,count,"
+    "taker_buy_volume,taker_buy_quote_volume,ignore\n"
+)
+
+
+def _kline_csv(start: datetime, hours: int, unit: int, header=False) -> str:
+    lines = [HEADER] if header else []
+    for hour in range(hours):
+        open_time = int((start + timedelta(hours=hour)).timestamp()) * unit
+        close = 100.0 + hour
+        lines.append(
+            f"{open_time},{close},{close},{close},{close},1.0,"
+            f"{open_time + 3599 * unit},1.0,1,0.5,0.5,0\n",
+        )
+    return "".join(lines)
+
+
+def _write_dump(directory, name: str, csv: str):
+    with zipfile.ZipFile(directory / name, "w") as archive:
+        archive.writestr(name.replace(".zip", ".csv"), csv)
+
+
+def test_reads_millisecond_and_microsecond_open_times():
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for unit, header in ((1000, False), (1_000_000, True)):
+        csv = _kline_csv(start, 5, unit, header=header).encode()
+        chunks = list(read_kline_csv(io.BytesIO(csv), chunk_rows=2))
+
+        frame = pd.concat(chunks)
+        assert len(chunks) == 3
+        assert frame.index[0] == start
+        assert frame.index[-1] == start + timedelta(hours=4)
+        assert frame['close'].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+
+def test_reader_stops_while_queue_is_full(tmp_path, monkeypatch):
+    monkeypatch.setattr(dumps, "DUMP_QUEUE_TIMEOUT", 0.01)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    _write_dump(tmp_path, "BTCUSDT-1h-2025-01.zip", _kline_csv(start, 5, 1000))
+    chunks = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=dumps._decompress,
+        args=([tmp_path / "BTCUSDT-1h-2025-01.zip"], chunks, stop, 2),
+        daemon=True,
+    )
+    reader.start()
+
+    # Nothing takes from the queue, so the reader blocks after one chunk
+    reader.join(timeout=0.2)
+    assert reader.is_alive()
+    stop.set()
+    reader.join(timeout=5)
+
+    assert not reader.is_alive()
+    assert chunks.qsize() == 1
+
+
+def test_imports_each_dump_once(db_session, tmp_path):
+    CryptoAssetFactory(symbol="BTC", ranking=1)
+    december = datetime(2024, 12, 1, tzinfo=timezone.utc)
+    january = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    _write_dump(
+        tmp_path,
+        "BTCUSDT-1h-2024-12.zip",
+        _kline_csv(december, 744, 1000),
+    )
+    _write_dump(
+        tmp_path,
+        "BTCUSDT-1h-2025-01.zip",
+        _kline_csv(january, 744, 1_000_000, header=True),
+    )
+    _write_dump(tmp_path, "BTCUSDT-1d-2025-01.zip", _kline_csv(january, 1, 1))
+    _write_dump(tmp_path, "DOGEUSDT-1h-2025-01.zip", _kline_csv(january, 1, 1))
+
+    report = import_binance_dumps(tmp_path, chunk_rows=100)
+
+    assert (report.files, report.skipped, report.failed) == (2, 1, 0)
+    assert report.rows == 1488
+    stored = db_session.scalar(
+        select(func.count()).where(
+            CryptoMarketData.symbol == "BTC",
+            CryptoMarketData.interval == "1h",
+        ),
+    )
+    assert stored == 1488
+    assert db_session.get(CryptoImportedDump, "BTCUSDT-1h-2025-01.zip")
+    state = db_session.get(CryptoIndicatorState, ("BTC", "1h"))
+    assert state.candle_count == 1488
+
+    report = import_binance_dumps(tmp_path)
+    assert (report.files, report.skipped, report.rows) == (0, 3, 0)
+
+
+def test_stopped_import_rebuilds_imported_dumps_on_rerun(
+    db_session,
+    tmp_path,
+):
+    CryptoAssetFactory(symbol="BTC", ranking=1)
+    january = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    _write_dump(
+        tmp_path,
+        "BTCUSDT-1h-2025-01.zip",
+        _kline_csv(january, 48, 1000),
+    )
+
+    # The archive is committed, but the run stops before its rebuild
+    with patch(
+        "app.services.market.dumps.rebuild_imported_dumps",
+        side_effect=RuntimeError("worker lost"),
+    ):
+        with pytest.raises(RuntimeError):
+            import_binance_dumps(tmp_path)
+    dump = db_session.get(CryptoImportedDump, "BTCUSDT-1h-2025-01.zip")
+    assert dump.rebuild_since == january
+    assert db_session.get(CryptoIndicatorState, ("BTC", "1h")) is None
+
+    report = import_binance_dumps(tmp_path)
+
+    assert (report.files, report.skipped) == (0, 1)
+    assert dump.rebuild_since is None
+    state = db_session.get(CryptoIndicatorState, ("BTC", "1h"))
+    assert state.candle_count == 48
+
+
+@patch("app.services.market.dumps.rollup_and_calculate_indicators")
+def test_failed_dump_is_not_rebuilt(mock_rollup, db_session, tmp_path):
+    CryptoAssetFactory(symbol="ETH", ranking=1)
+    january = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Fails on its last chunk, after the chunks before it were stored
+    _write_dump(
+        tmp_path,
+        "ETHUSDT-1h-2025-01.zip",
+        _kline_csv(january, 4, 1000) + ",".join(["x"] * 12) + "\n",
+    )
+
+    report = import_binance_dumps(tmp_path, chunk_rows=2)
+
+    assert (report.files, report.failed) == (0, 1)
+    mock_rollup.assert_not_called()
@@ -0,0 +1,115 @@
+import factory
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import select
+
+from app.models.crypto import (
+    CryptoIndicatorState,
+    CryptoMarketData,
+    CryptoTechnicalIndicator,
+)
+from app.services.market.binance import (
+    incremental_kline_params,
+    sync_binance_crypto_market_information,
+)
+from tests.factories.crypto import CryptoAssetFactory
+
+NOW = datetime(2025, 8, 1, 12, 15, tzinfo=timezone.utc)
+
+
+def test_no_high_water_mark_fetches_default_window():
+    assert incremental_kline_params(None, now=NOW) == {}
+
+
+def test_up_to_date_series_is_skipped():
+    hwm = datetime(2025, 8, 1, 12, tzinfo=timezone.utc)
+    assert incremental_kline_params(hwm, now=NOW) is None
+
+
+def test_requests_candles_after_high_water_mark():
+    hwm = datetime(2025, 8, 1, 9, tzinfo=timezone.utc)
+    params = incremental_kline_params(hwm, now=NOW)
+    assert params == {
+        "start_time": datetime(2025, 8, 1, 10, tzinfo=timezone.utc),
+        "limit": 3,
+    }
+
+
+def test_long_gap_is_bounded():
+    hwm = NOW - timedelta(days=365)
+    params = incremental_kline_params(hwm, now=NOW)
+    assert params["limit"] == 1000
+    assert params["start_time"] == datetime(
+        2025,
+        8,
+        1,
+        12,
+        tzinfo=timezone.utc,
+    ) - timedelta(hours=999)
+
+
+def _candles(end: pd.Timestamp, periods: int, start_price: float):
+    index = pd.date_range(end=end, periods=periods, freq="h", tz=timezone.utc)
+    prices = [start_price + i * 10 for i in range(periods)]
+    return pd.DataFrame({"close": prices}, index=index)
+
+
+@patch("app.services.market.binance.fetch_binance_price_history")
+@patch("app.services.market.binance.fetch_binance_symbols")
+def test_incremental_sync_appends_new_candles(
+    mock_binance_symbols,
+    mock_binance_price_history,
+    db_session,
+):
+    CryptoAssetFactory.create_batch(
+        size=1,
+        symbol=factory.Iterator(["BTC"]),
+        name=factory.Iterator(["Bitcoin"]),
+        ranking=factory.Iterator([1]),
+    )
+    mock_binance_symbols.return_value = ["BTCUSDT"]
+    latest = pd.Timestamp.utcnow().floor('h')
+
+    # Seed 50 hours of history ending two hours ago
+    seed = _candles(latest - pd.Timedelta(hours=2), 50, 30000.0)
+    mock_binance_price_history.return_value = seed
+    sync_binance_crypto_market_information()
+    assert mock_binance_price_history.call_args.kwargs == {"interval": "1h"}
+
+    seeded_indicators = db_session.scalars(
+        select(CryptoTechnicalIndicator.timestamp).where(
+            CryptoTechnicalIndicator.interval == "1h",
+        ),
+    ).all()
+
+    # Next run only asks for, and stores, the two missing candles
+    mock_binance_price_history.return_value = _candles(latest, 2, 40000.0)
+    sync_binance_crypto_market_information()
+
+    kwargs = mock_binance_price_history.call_args.kwargs
+    assert kwargs["limit"] == 2
+    assert pd.Timestamp(kwargs["start_time"]) == latest - pd.Timedelta(
+        hours=1,
+    )
+
+    market_rows = db_session.scalars(
+        select(CryptoMarketData).where(
+            CryptoMarketData.symbol == "BTC",
+            CryptoMarketData.interval == "1h",
+        ),
+    ).all()
+    assert len(market_rows) == 52
+
+    # Indicators for the new candles use the stored history as warm-up
+    indicators = db_session.scalars(
+        select(CryptoTechnicalIndicator.timestamp).where(
+            CryptoTechnicalIndicator.interval == "1h",
+        ),
+    ).all()
+    assert len(indicators) == len(seeded_indicators) + 2
+
+    state = db_session.get(CryptoIndicatorState, ("BTC", "1h"))
+    assert state.candle_count == 52
+    assert state.timestamp == latest
+    assert state.last_close == 40010.0
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator, MACD
+
+from app.services.market.indicators import (
+    STATE_COLUMNS,
+    advance_indicators,
+    compute_indicators,
+    indicators_to_rows,
+)
+
+
+@pytest.fixture
+def close_matrix() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2025-01-01", periods=200, freq="h", tz="UTC")
+    returns = rng.normal(0, 0.01, size=(200, 4))
+    close = pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=index,
+        columns=["BTC", "ETH", "XRP", "USDC"],
+    )
+    close.iloc[:40, 1] = np.nan  # listed later than the others
+    close.iloc[[60, 61, 120], 2] = np.nan  # missing candles
+    close["USDC"] = 1.0  # flat price, no losses
+    return close
+
+
+def test_matches_ta_per_symbol(close_matrix):
+    indicators = compute_indicators(close_matrix)
+
+    for symbol in close_matrix.columns:
+        close = close_matrix[symbol].dropna()
+        expected = {
+            'ema': EMAIndicator(close=close).ema_indicator(),
+            'rsi': RSIIndicator(close=close).rsi(),
+            'macd': MACD(close=close).macd(),
+        }
+        for name, series in expected.items():
+            series = series.dropna()
+            actual = indicators[name][symbol].dropna()
+            assert actual.index.equals(series.index), (symbol, name)
+            np.testing.assert_allclose(actual, series, rtol=1e-10)
+
+
+def test_rows_drop_warm_up(close_matrix):
+    rows = indicators_to_rows(compute_indicators(close_matrix))
+
+    assert list(rows.columns) == [
+        'timestamp',
+        'symbol',
+        'ema',
+        'rsi',
+        'macd',
+    ]
+    assert not rows.isna().any().any()
+    # MACD needs 26 candles before its first value
+    first_btc = rows[rows['symbol'] == "BTC"]['timestamp'].min()
+    assert first_btc == close_matrix.index[25]
+
+
+def test_streaming_state_matches_batch(close_matrix):
+    expected = compute_indicators(close_matrix)
+
+    state = pd.DataFrame(columns=STATE_COLUMNS)
+    chunks = []
+    for start, end in [(0, 10), (10, 100), (100, 101), (101, 200)]:
+        state, indicators = advance_indicators(
+            state,
+            close_matrix.iloc[start:end],
+        )
+        chunks.append(indicators)
+
+    for name, frame in expected.items():
+        streamed = pd.concat([chunk[name] for chunk in chunks])
+        pd.testing.assert_frame_equal(
+            streamed,
+            frame,
+            rtol=1e-10,
+            check_freq=False,
+        )
+
+    signal = MACD(close=close_matrix["BTC"]).macd_signal().iloc[-1]
+    assert state.loc["BTC", "macd_signal"] == pytest.approx(signal)
+    assert state.loc["ETH", "candle_count"] == 160
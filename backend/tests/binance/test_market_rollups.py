@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+import pandas as pd
+from sqlalchemy import select
+
+from app.models.crypto import CryptoMarketData
+from app.services.market.binance import (
+    rollup_market_data,
+    store_crypto_market_data,
+)
+from tests.factories.crypto import CryptoAssetFactory, CryptoSourceFactory
+
+START = datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+
+def _hourly(start: datetime, prices: list[float]) -> pd.DataFrame:
+    index = pd.date_range(start=start, periods=len(prices), freq="h")
+    return pd.DataFrame({"close": prices}, index=index)
+
+
+def _candles(db_session, symbol: str, interval: str) -> dict:
+    rows = db_session.execute(
+        select(CryptoMarketData.timestamp, CryptoMarketData.price)
+        .where(
+            CryptoMarketData.symbol == symbol,
+            CryptoMarketData.interval == interval,
+        )
+        .order_by(CryptoMarketData.timestamp),
+    ).all()
+    return {row.timestamp.hour: float(row.price) for row in rows}
+
+
+def test_rollup_closes_on_last_candle_of_each_bucket(db_session):
+    asset = CryptoAssetFactory(symbol="BTC")
+    source = CryptoSourceFactory()
+    store_crypto_market_data(
+        asset.symbol,
+        source.id,
+        _hourly(START, [float(hour) for hour in range(10)]),
+    )
+
+    written = rollup_market_data([asset.symbol], source.id, "4h")
+
+    assert written == 3
+    assert _candles(db_session, "BTC", "4h") == {0: 3.0, 4: 7.0, 8: 9.0}
+
+
+def test_rollup_refreshes_bucket_in_progress(db_session):
+    asset = CryptoAssetFactory(symbol="BTC")
+    source = CryptoSourceFactory()
+    store_crypto_market_data(
+        asset.symbol,
+        source.id,
+        _hourly(START, [float(hour) for hour in range(10)]),
+    )
+    rollup_market_data([asset.symbol], source.id, "4h")
+
+    store_crypto_market_data(
+        asset.symbol,
+        source.id,
+        _hourly(START.replace(hour=10), [10.0, 11.0, 12.0]),
+    )
+    since = START.replace(hour=8)
+    written = rollup_market_data([asset.symbol], source.id, "4h", since)
+
+    # Only the bucket in progress and the new one are rewritten
+    assert written == 2
+    assert _candles(db_session, "BTC", "4h") == {
+        0: 3.0,
+        4: 7.0,
+        8: 11.0,
+        12: 12.0,
+    }
+
+
+def test_price_history_reads_interval_for_view(client, db_session):
+    asset = CryptoAssetFactory(symbol="BTC")
+    source = CryptoSourceFactory()
+    store_crypto_market_data(
+        asset.symbol,
+        source.id,
+        _hourly(START, [float(hour) for hour in range(10)]),
+    )
+    rollup_market_data([asset.symbol], source.id, "4h")
+
+    response = client.get("/api/crypto/price_history?symbol=BTC&interval=1M")
+    assert response.status_code == 200
+    assert [row["price"] for row in response.get_json()] == [3.0, 7.0, 9.0]
+
+    response = client.get("/api/crypto/price_history?symbol=BTC&interval=1D")
+    assert response.status_code == 200
+    assert len(response.get_json()) == 10
@@ -22,11 +22,17 @@ def test_fetch_and_store_inserts_data(
     assets = db_session.execute(stmt).scalars().all()
     assert len(assets) == 0
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "BTC")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "BTC",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 0
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "ETH")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "ETH",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 0
 
@@ -57,11 +63,17 @@ def test_fetch_and_store_inserts_data(
     source = db_session.execute(stmt).scalar_one_or_none()
     assert source is not None
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "BTC")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "BTC",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 2
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "ETH")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "ETH",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 2
 
@@ -100,17 +112,26 @@ def test_no_duplicate_market_data_insertions(
     source = db_session.execute(stmt).scalar_one_or_none()
     assert source is not None
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "BTC")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "BTC",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 2
 
     # Second run (should not insert duplicates)
     sync_binance_crypto_market_information()
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "BTC")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "BTC",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 2, "duplicate added"
 
-    stmt = select(CryptoMarketData).where(CryptoMarketData.symbol == "ETH")
+    stmt = select(CryptoMarketData).where(
+        CryptoMarketData.symbol == "ETH",
+        CryptoMarketData.interval == "1h",
+    )
     market_data = db_session.execute(stmt).scalars().all()
     assert len(market_data) == 2, "duplicate added"
@@ -1,10 +1,20 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from app.models.crypto import CryptoAsset, CryptoCoingeckoSentimentData
+from app.extensions import db
 from app.services.market.coingecko import (
+    changed_asset_fields,
+    _digest,
+    coingecko_get,
+    fetch_coingecko_market_data,
+    fetch_coingecko_metadata,
+    get_asset_index,
+    rank_coingecko_assets,
     sync_crypto_asset_with_coingecko,
     sync_top_coingecko_crypto_metadata,
 )
+from app.utils.ratelimit import TokenBucket
+from sqlalchemy import event
 from tests.factories.crypto import (
     CryptoAssetFactory,
     CryptoMarketDataFactory,
@@ -12,6 +22,22 @@ from tests.factories.crypto import (
 )
 
 
+@pytest.fixture
+def clock(monkeypatch, fake_clock):
+    clock = fake_clock
+    monkeypatch.setattr(
+        "app.services.market.coingecko.coingecko_limiter",
+        TokenBucket(capacity=1, rate=0.5, clock=clock, sleep=clock.sleep),
+    )
+    return clock
+
+
+def _response(status_code=200, headers=None, body=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = body
+    return response
+
+
 @pytest.fixture(scope="function")
 def coingecko():
     asset = CryptoAssetFactory(
@@ -71,7 +97,6 @@ def test_coingecko_ranking_fetch(coingecko):
 
 
 @patch("app.services.market.coingecko.fetch_coingecko_metadata")
-@patch("app.services.market.coingecko.FETCH_METADATA_INTERVAL_S", 0)
 def test_coingecko_metadata_store(mock_fetch_metadata, coingecko):
     to_insert = [
         CryptoAsset(
@@ -104,9 +129,213 @@ def test_coingecko_metadata_store(mock_fetch_metadata, coingecko):
     assert asset.homepage_url == to_insert[0].homepage_url
 
 
-@patch("app.services.market.coingecko.FETCH_METADATA_INTERVAL_S", 0)
 def test_coingecko_metadata_fetch(coingecko):
     sync_top_coingecko_crypto_metadata()
     sentiment = CryptoCoingeckoSentimentData.query.all()
     # May be 0 if no real API, but should not error
     assert isinstance(sentiment, list)
+
+
+@patch("app.services.market.coingecko.requests.get")
+def test_coingecko_get_spaces_requests(mock_get, clock):
+    mock_get.return_value = _response(body={"id": "bitcoin"})
+
+    assert coingecko_get("/coins/bitcoin") == {"id": "bitcoin"}
+    coingecko_get("/coins/bitcoin")
+    coingecko_get("/coins/bitcoin")
+
+    # The first request uses the one token, then one every two seconds
+    assert clock.slept == [2.0, 2.0]
+
+
+@patch("app.services.market.coingecko.requests.get")
+def test_coingecko_get_backs_off_on_429(mock_get, clock):
+    mock_get.side_effect = [
+        _response(429, headers={"Retry-After": "10"}),
+        _response(429),
+        _response(body=[]),
+    ]
+
+    assert coingecko_get("/coins/markets") == []
+    assert mock_get.call_count == 3
+    # Retry-After is honoured, then the 30s backoff, each plus the
+    # two seconds until the next token
+    assert clock.slept == [12.0, 32.0]
+
+
+@patch("app.services.market.coingecko.requests.get")
+def test_coingecko_get_gives_up_after_retries(mock_get, clock):
+    response = _response(429, headers={"Retry-After": "1"})
+    response.raise_for_status.side_effect = Exception("429")
+    mock_get.return_value = response
+
+    with pytest.raises(Exception, match="429"):
+        coingecko_get("/coins/markets")
+    assert mock_get.call_count == 4
+
+
+@patch("app.services.market.coingecko.store_coingecko_metadata")
+@patch("app.services.market.coingecko.fetch_coingecko_metadata")
+def test_coingecko_metadata_written_in_batches(
+    mock_fetch_metadata,
+    mock_store_metadata,
+):
+    source = CryptoSourceFactory(name="Binance")
+    for ranking in range(1, 6):
+        asset = CryptoAssetFactory(
+            symbol=f"C{ranking}",
+            ranking=ranking,
+            coingecko_id=f"coin-{ranking}",
+        )
+        CryptoMarketDataFactory(asset=asset, source=source, interval="1h")
+    mock_fetch_metadata.side_effect = lambda crypto: [crypto.symbol]
+
+    sync_top_coingecko_crypto_metadata(workers=2, batch_size=2)
+
+    assert mock_fetch_metadata.call_count == 5
+    batches = [call.args[1] for call in mock_store_metadata.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert sorted(sum(batches, [])) == ["C1", "C2", "C3", "C4", "C5"]
+
+
+def test_asset_index_detects_changed_fields(coingecko):
+    stored = get_asset_index()["BTC"]
+
+    assert (
+        changed_asset_fields(
+            stored,
+            {"symbol": "BTC", "name": "bitcoin", "coingecko_id": "bitcoin"},
+        )
+        == {}
+    )
+    assert changed_asset_fields(
+        stored,
+        {"symbol": "BTC", "name": "Bitcoin", "ranking": -1, "image": None},
+    ) == {"name": "Bitcoin"}
+
+
+@patch("app.services.market.coingecko.coingecko_get")
+def test_purchase_platforms_digest_ignores_ticker_order(mock_get):
+    crypto = CryptoAsset(
+        symbol="BTC",
+        ranking=1,
+        name="bitcoin",
+        coingecko_id="bitcoin",
+    )
+    markets = ["Kraken", "Binance", "Coinbase", "Binance"]
+    digests = set()
+    for names in (markets, markets[::-1]):
+        mock_get.return_value = {
+            "tickers": [
+                {"market": {"name": name}, "trust_score": "green"}
+                for name in names
+            ],
+        }
+        asset = fetch_coingecko_metadata(crypto)[0]
+        assert asset.purchase_platforms == "Binance, Coinbase, Kraken"
+        digests.add(_digest(asset.purchase_platforms))
+
+    assert len(digests) == 1
+
+
+@patch("app.services.market.coingecko.fetch_coingecko_market_data")
+def test_coingecko_ranking_skips_unchanged_assets(
+    mock_fetch_market_data,
+    coingecko,
+):
+    mock_fetch_market_data.return_value = [
+        {"symbol": "btc", "name": "bitcoin", "market_cap_rank": 1},
+        {"symbol": "eth", "name": "ethereum", "market_cap_rank": 2},
+    ]
+    sync_crypto_asset_with_coingecko()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        sync_crypto_asset_with_coingecko()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    # One SELECT for the index, and nothing to write
+    assert [s for s in statements if s.startswith("SELECT")]
+    writes = [
+        statement
+        for statement in statements
+        if statement.startswith(("INSERT", "UPDATE"))
+    ]
+    assert writes == []
+    assert CryptoAsset.query.filter_by(symbol="ETH").one().ranking == 2
+
+
+@patch("app.services.market.coingecko.COINGECKO_MARKETS_PAGE_SIZE", 2)
+@patch("app.services.market.coingecko.fetch_coingecko_market_page")
+def test_coingecko_market_pages_joined_in_rank_order(mock_fetch_page):
+    mock_fetch_page.side_effect = lambda page, per_page, vs_currency: [
+        {"id": f"coin-{rank}", "market_cap_rank": rank}
+        for rank in range((page - 1) * per_page + 1, page * per_page + 1)
+    ]
+
+    currency_data = fetch_coingecko_market_data(limit=5)
+
+    assert mock_fetch_page.call_count == 3
+    assert [curr["market_cap_rank"] for curr in currency_data] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+
+
+@patch("app.services.market.coingecko.COINGECKO_MARKETS_PAGE_SIZE", 2)
+@patch("app.services.market.coingecko.fetch_coingecko_market_page")
+def test_coingecko_market_pages_stop_at_failed_page(mock_fetch_page):
+    def fetch_page(page, per_page, vs_currency):
+        if page == 2:
+            raise Exception("500 Server Error")
+        return [{"id": f"page-{page}"}] * per_page
+
+    mock_fetch_page.side_effect = fetch_page
+
+    currency_data = fetch_coingecko_market_data(limit=6, workers=1)
+
+    assert [curr["id"] for curr in currency_data] == ["page-1", "page-1"]
+
+
+def test_rank_coingecko_assets_skips_stablecoins():
+    assets = rank_coingecko_assets(
+        [
+            {"id": "bitcoin", "symbol": "btc", "market_cap_rank": 1},
+            {"id": "tether", "symbol": "usdt", "market_cap_rank": 2},
+            {"id": "ethereum", "symbol": "eth", "market_cap_rank": 3},
+            {"id": "usd-coin", "symbol": "usdc", "market_cap_rank": 4},
+            {
+                "id": "solana",
+                "symbol": "sol",
+                "name": "Solana",
+                "market_cap_rank": None,
+                "market_cap": 7.5e10,
+            },
+        ],
+    )
+
+    assert [(asset["symbol"], asset["ranking"]) for asset in assets] == [
+        ("BTC", 1),
+        ("ETH", 2),
+        ("SOL", 3),
+    ]
+    assert assets[2] == {
+        "symbol": "SOL",
+        "name": "Solana",
+        "ranking": 3,
+        "image": "",
+        "coingecko_id": "solana",
+        "marketcap": 7.5e10,
+        "volume": None,
+    }
+    assert type(assets[0]["ranking"]) is int
+    assert rank_coingecko_assets([]) == []
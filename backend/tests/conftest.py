@@ -3,6 +3,19 @@ from app import create_app, db as _db
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
 @pytest.fixture(scope="session")
 def app():
     app = create_app(testing=True)
@@ -53,6 +66,42 @@ def bind_factory_session(db_session):
     BaseFactory._meta.sqlalchemy_session = db_session
 
 
+@pytest.fixture(scope="function", autouse=True)
+def binance_symbol_cache(tmp_path, monkeypatch):
+    # Keep cached Binance pairs from leaking between tests
+    from app.services.market import binance
+    from app.utils.cache import ReferenceSetCache
+
+    cache = ReferenceSetCache("binance_usdt_pairs", ttl=60, directory=tmp_path)
+    monkeypatch.setattr(binance, "_symbol_cache", cache)
+    monkeypatch.setattr(
+        binance,
+        "_unlisted_cache",
+        ReferenceSetCache(
+            "binance_unlisted_pairs",
+            ttl=60,
+            directory=tmp_path,
+        ),
+    )
+    return cache
+
+
+@pytest.fixture(scope="function", autouse=True)
+def sentiment_score_cache(monkeypatch):
+    # Scores cached in memory would outlive the rolled back store
+    from app.services.sentiment import scoring
+
+    cache = scoring.SentimentScoreCache()
+    monkeypatch.setattr(scoring, "score_cache", cache)
+    return cache
+
+
+@pytest.fixture(scope="function")
+def fake_clock():
+    # Stands in for time.monotonic and time.sleep of rate limiters and caches
+    return FakeClock()
+
+
 @pytest.fixture(scope="function")
 def test_user(app, db_session):
     # Ensure a test user exists for authentication.
@@ -109,6 +109,9 @@ def test_store_news_data():
     assert news_data.source_url == 'url'
     assert news_data.url_image == 'img'
     assert news_data.content == 'content'
+    # Scored once on ingest, on the title and description
+    assert news_data.sentiment_neu == 1.0
+    assert news_data.sentiment_compound == 0.0
 
 
 @patch('app.services.sentiment.newsapi.store_news_data')
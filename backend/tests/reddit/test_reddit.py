@@ -179,7 +179,7 @@ def test_preprocess_text_with_special_characters():
     assert len(clean_text.encode('utf-8')) <= 2000
 
 
-@patch('app.services.sentiment.reddit.create_reddit_client')
+@patch('app.services.sentiment.reddit.get_reddit_client_pool')
 def test_fetch_reddit_data_for_currency(mock_reddit_client, init_reddit_data):
     # Mock Reddit API objects
     mock_submission = MagicMock()
@@ -199,7 +199,8 @@ def test_fetch_reddit_data_for_currency(mock_reddit_client, init_reddit_data):
 
     mock_reddit_instance = MagicMock()
     mock_reddit_instance.subreddit.return_value = mock_subreddit
-    mock_reddit_client.return_value = mock_reddit_instance
+    pool = mock_reddit_client.return_value
+    pool.client.return_value.__enter__.return_value = mock_reddit_instance
 
     # Get test data
     currencies = CryptoAsset.query.all()
@@ -286,13 +287,15 @@ def test_fetch_reddit_data_concurrent_exception_handling(
     assert mock_fetch_data.call_count == 2
 
 
-@patch('app.services.sentiment.reddit.create_reddit_client')
+@patch('app.services.sentiment.reddit.get_reddit_client_pool')
 def test_fetch_reddit_data_for_currency_exception_handling(
     mock_reddit_client,
     init_reddit_data,
 ):
     # Mock Reddit client to raise an exception
-    mock_reddit_client.side_effect = Exception("Reddit API connection failed")
+    mock_reddit_client.return_value.client.side_effect = Exception(
+        "Reddit API connection failed",
+    )
 
     # Get test data
     currencies = CryptoAsset.query.all()
@@ -0,0 +1,135 @@
+import threading
+from unittest.mock import MagicMock, patch
+import pytest
+
+from app.services.sentiment.reddit_client import (
+    RateLimitedRequestor,
+    RedditClientPool,
+    get_reddit_client_pool,
+    track_rate_limit,
+)
+from app.utils.ratelimit import TokenBucket
+
+
+def _limiter(clock, capacity=10, rate=1):
+    return TokenBucket(
+        capacity=capacity,
+        rate=rate,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def _response(remaining, reset):
+    return MagicMock(
+        headers={
+            "X-Ratelimit-Remaining": str(remaining),
+            "X-Ratelimit-Reset": str(reset),
+        },
+    )
+
+
+def test_rate_follows_remaining_requests(fake_clock):
+    limiter = _limiter(fake_clock)
+
+    track_rate_limit(limiter, _response(remaining=300.0, reset=100))
+
+    assert limiter.rate == 3.0
+    # Headers are absent on token requests
+    track_rate_limit(limiter, MagicMock(headers={}))
+    assert limiter.rate == 3.0
+
+    track_rate_limit(limiter, _response(remaining=2.0, reset=100))
+    assert [limiter.acquire(), limiter.acquire()] == [0.0, 0.0]
+    assert limiter.acquire() > 0
+    assert limiter.rate == 0.02
+
+
+def test_pauses_until_reset_when_no_requests_left(fake_clock):
+    limiter = _limiter(fake_clock)
+
+    track_rate_limit(limiter, _response(remaining=0.0, reset=42))
+
+    assert limiter.acquire() == 43.0
+
+
+def test_requestor_shares_limiter(fake_clock):
+    clock = fake_clock
+    limiter = _limiter(clock, capacity=1)
+    session = MagicMock()
+    session.headers = {}
+    session.request.return_value = _response(remaining=0.0, reset=30)
+    requestor = RateLimitedRequestor(
+        "crypto-sentiment test",
+        session=session,
+        limiter=limiter,
+    )
+
+    assert requestor.request("GET", "https://oauth.reddit.com/r/test")
+    requestor.request("GET", "https://oauth.reddit.com/r/test")
+
+    assert session.request.call_count == 2
+    assert clock.slept == [31.0]
+
+
+@patch("app.services.sentiment.reddit_client.praw.Reddit")
+def test_pool_clients_share_limiter(mock_reddit):
+    pool = RedditClientPool()
+
+    with pool.client() as reddit:
+        assert reddit is mock_reddit.return_value
+
+    kwargs = mock_reddit.call_args.kwargs
+    assert kwargs["requestor_class"] is RateLimitedRequestor
+    assert kwargs["requestor_kwargs"] == {"limiter": pool.limiter}
+
+
+@patch.object(RedditClientPool, "_create_client")
+def test_pool_reuses_clients(mock_create):
+    mock_create.side_effect = lambda: MagicMock()
+    pool = RedditClientPool(size=2)
+
+    with pool.client() as first:
+        with pool.client() as second:
+            assert first is not second
+    with pool.client() as third:
+        assert third in (first, second)
+
+    assert mock_create.call_count == 2
+
+
+@patch.object(RedditClientPool, "_create_client")
+def test_pool_waits_for_a_free_client(mock_create):
+    mock_create.side_effect = lambda: MagicMock()
+    pool = RedditClientPool(size=1)
+    checked_out = []
+
+    def use_client():
+        with pool.client() as reddit:
+            checked_out.append(reddit)
+
+    with pool.client() as reddit:
+        thread = threading.Thread(target=use_client)
+        thread.start()
+        thread.join(timeout=0.1)
+        assert thread.is_alive()
+    thread.join()
+
+    assert checked_out == [reddit]
+    assert mock_create.call_count == 1
+
+
+@patch.object(RedditClientPool, "_create_client")
+def test_pool_recovers_from_failed_creation(mock_create):
+    mock_create.side_effect = [Exception("Reddit unavailable"), MagicMock()]
+    pool = RedditClientPool(size=1)
+
+    with pytest.raises(Exception, match="Reddit unavailable"):
+        with pool.client():
+            pass
+    with pool.client() as reddit:
+        assert reddit is not None
+
+
+def test_get_reddit_client_pool_is_shared():
+    assert get_reddit_client_pool() is get_reddit_client_pool()
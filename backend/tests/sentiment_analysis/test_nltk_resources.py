@@ -0,0 +1,40 @@
+import pickle
+import nltk
+import pytest
+
+from app.services.sentiment.resources import (
+    MissingNLTKResourceError,
+    require_nltk_resource,
+)
+from app.services.sentiment.sentiment_analysis import tokenise_sentences
+
+
+@pytest.fixture
+def nltk_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(nltk.data, "path", [str(tmp_path)])
+    require_nltk_resource.cache_clear()
+    yield tmp_path
+    require_nltk_resource.cache_clear()
+
+
+def test_missing_nltk_resource_is_reported(nltk_data):
+    with pytest.raises(MissingNLTKResourceError) as error:
+        require_nltk_resource("punkt_tab")
+
+    assert error.value.package == "punkt_tab"
+    assert str(nltk_data) in str(error.value)
+    assert "nltk.downloader" in str(error.value)
+    copied = pickle.loads(pickle.dumps(error.value))
+    assert str(copied) == str(error.value)
+    with pytest.raises(MissingNLTKResourceError):
+        tokenise_sentences("BTC is up. ETH is down.")
+
+
+def test_nltk_resource_loaded_from_local_path(nltk_data):
+    resource = nltk_data / "tokenizers" / "punkt_tab" / "english"
+    resource.mkdir(parents=True)
+
+    assert require_nltk_resource("punkt_tab") == str(resource)
+    # Looked up once, later calls do not touch the filesystem
+    resource.rmdir()
+    assert require_nltk_resource("punkt_tab") == str(resource)
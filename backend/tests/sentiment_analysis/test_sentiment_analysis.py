@@ -1,19 +1,37 @@
 import pytest
 from unittest.mock import patch
+from sqlalchemy import event
 from app.models.crypto import (
+    CryptoNewsData,
+    CryptoRedditData,
     CryptoSentimentAggregateData,
+    CryptoSentimentBucket,
     CryptoCoingeckoSentimentData,
 )
+from app.models.sentiment import CachedSentimentScore
+from app.models.youtube import YoutubeComment
 from app.services.sentiment.sentiment_analysis import (
+    aggregate_social_sentiment,
     analyse_and_store_sentiment,
-    fetch_sentiment_data,
-    SocialDataPoint,
+    fetch_coingecko_sentiment,
+    refresh_sentiment_buckets,
+    stale_sentiment_buckets_since,
+    sum_sentiment_buckets,
+)
+from app.services.sentiment import scoring
+from app.services.sentiment.scoring import (
+    SentimentScoreCache,
+    rescore_sentiment,
+    score_sentiment,
+    score_texts,
+    score_unscored_sentiment,
+    text_hash,
 )
 from tests.factories.youtube import (
     YoutubeCommentFactory,
     YoutubeCommentAnalysisFactory,
 )
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from tests.factories.crypto import (
     CryptoAssetFactory,
     CryptoSourceFactory,
@@ -84,47 +102,60 @@ def init_sentiment(app):
         yield
 
 
-def test_sentiment_analysis_fetch_data(init_sentiment):
-    earliest = datetime.today() - timedelta(days=2)
-    coingecko_aggregates, social_data = fetch_sentiment_data(earliest)
+def test_sentiment_analysis_fetch_coingecko(init_sentiment):
+    coingecko_aggregates = fetch_coingecko_sentiment()
     assert len(coingecko_aggregates) == 2
-    assert len(social_data) == 3
 
 
-@patch("app.services.sentiment.sentiment_analysis.fetch_sentiment_data")
-def test_sentiment_analysis_no_data_fetched(mock_fetch_data, init_sentiment):
-    mock_fetch_data.return_value = ([], [])
+@patch("app.services.sentiment.sentiment_analysis.sum_sentiment_buckets")
+@patch("app.services.sentiment.sentiment_analysis.fetch_coingecko_sentiment")
+def test_sentiment_analysis_no_data_fetched(
+    mock_fetch_coingecko,
+    mock_aggregate_social,
+    init_sentiment,
+):
+    mock_fetch_coingecko.return_value = []
+    mock_aggregate_social.return_value = {}
     analyse_and_store_sentiment(2)
-    mock_fetch_data.assert_called_once()
+    mock_aggregate_social.assert_called_once()
     sentiment_result = CryptoSentimentAggregateData.query.order_by(
         CryptoSentimentAggregateData.symbol,
     ).all()
     assert len(sentiment_result) == 0
 
 
-@patch("app.services.sentiment.sentiment_analysis.fetch_sentiment_data")
-def test_sentiment_analysis_analyse_data(mock_fetch_data, init_sentiment):
-    mock_fetch_data.return_value = (
-        [
-            CryptoCoingeckoSentimentData(
-                symbol="BTC",
-                sentiment_up_percentage=50,
-                sentiment_down_percentage=50,
-                reddit_average_posts_48h=0,
-                commit_count_4_weeks=1,
-                timestamp=datetime.now(),
-            ),
-        ],
-        [
-            SocialDataPoint(
-                symbol="BTC",
-                text="I love BTC!",
-                confidence=1.0,
-            ),
-        ],
-    )
+@patch("app.services.sentiment.sentiment_analysis.sum_sentiment_buckets")
+@patch("app.services.sentiment.sentiment_analysis.fetch_coingecko_sentiment")
+def test_sentiment_analysis_analyse_data(
+    mock_fetch_coingecko,
+    mock_aggregate_social,
+    init_sentiment,
+):
+    mock_fetch_coingecko.return_value = [
+        CryptoCoingeckoSentimentData(
+            symbol="BTC",
+            sentiment_up_percentage=50,
+            sentiment_down_percentage=50,
+            reddit_average_posts_48h=0,
+            commit_count_4_weeks=1,
+            timestamp=datetime.now(),
+        ),
+    ]
+    mock_aggregate_social.return_value = {
+        "BTC": {
+            "avg_positive_sentiment": 0.7,
+            "avg_neutral_sentiment": 0.3,
+            "avg_negative_sentiment": 0.0,
+            "avg_compound_score": 0.6,
+            "total_weight": 1.0,
+            "positive_count": 1.0,
+            "negative_count": 0.0,
+            "neutral_count": 0.0,
+            "data_points": 1,
+        },
+    }
     analyse_and_store_sentiment(2)
-    mock_fetch_data.assert_called_once()
+    mock_aggregate_social.assert_called_once()
     btc_sentiment = CryptoSentimentAggregateData.query.first()
     assert btc_sentiment is not None
     assert btc_sentiment.normalised_up_percentage > 0.5
@@ -180,3 +211,230 @@ def test_sentiment_analyser_end_to_end(init_sentiment):
     assert sentiment_result[1].normalised_up_percentage != 0
     assert sentiment_result[1].normalised_up_percentage != 0.5
     assert sentiment_result[1].normalised_down_percentage != 0
+
+
+def test_sentiment_scores_unscored_data(init_sentiment):
+    earliest = datetime.today() - timedelta(days=2)
+    assert aggregate_social_sentiment(earliest) == {}
+
+    assert score_unscored_sentiment(earliest) == 3
+    assert score_unscored_sentiment(earliest) == 0
+
+    reddit = CryptoRedditData.query.one()
+    assert (
+        reddit.sentiment_compound
+        == score_sentiment(reddit.text)["sentiment_compound"]
+    )
+    news = CryptoNewsData.query.one()
+    assert news.sentiment_compound is not None
+    comment = YoutubeComment.query.one()
+    assert comment.sentiment_compound < 0
+
+    sums = aggregate_social_sentiment(earliest)
+    assert sum(symbol["data_points"] for symbol in sums.values()) == 3
+
+
+def test_rescore_sentiment_streams_batches(
+    init_sentiment,
+    db_session,
+    monkeypatch,
+):
+    reddit = CryptoRedditData.query.one()
+    for text in ("eth is great", "eth is horrible"):
+        CryptoRedditDataFactory(
+            symbol="ETH",
+            source_id=reddit.source_id,
+            text=text,
+        )
+    monkeypatch.setattr(scoring, "SCORE_BATCH_SIZE", 2)
+    earliest = datetime.now(timezone.utc) - timedelta(days=2)
+    yield_per = []
+
+    def record_yield_per(state):
+        if state.is_select:
+            yield_per.append(state.execution_options.get("yield_per"))
+
+    event.listen(db_session(), "do_orm_execute", record_yield_per)
+    with patch(
+        "app.services.sentiment.scoring._store_scores",
+        wraps=scoring._store_scores,
+    ) as mock_store:
+        assert rescore_sentiment(earliest, datetime.now(timezone.utc)) == 5
+
+    # Rows are streamed from the database and stored one batch at a time
+    assert yield_per == [2, 2, 2]
+    batches = [len(call.args[3]) for call in mock_store.call_args_list]
+    assert sorted(batches) == [1, 1, 1, 2]
+    assert (
+        CryptoRedditData.query.filter(
+            CryptoRedditData.sentiment_compound.is_(None),
+        ).count()
+        == 0
+    )
+
+
+def test_sentiment_aggregated_in_sql(init_sentiment):
+    scores = {
+        YoutubeComment: (0.0, 0.4, 0.6, -0.5),
+        CryptoNewsData: (0.5, 0.5, 0.0, 0.02),
+        CryptoRedditData: (0.6, 0.4, 0.0, 0.7),
+    }
+    for model, (pos, neu, neg, compound) in scores.items():
+        model.query.update(
+            {
+                "sentiment_pos": pos,
+                "sentiment_neu": neu,
+                "sentiment_neg": neg,
+                "sentiment_compound": compound,
+            },
+        )
+
+    sums = aggregate_social_sentiment(datetime.today() - timedelta(days=2))
+
+    # The YouTube comment is weighted by its mean analysis score
+    youtube = (1 + 1 + 0.8) / 3
+    assert sums["BTC"] == pytest.approx(
+        {
+            "avg_positive_sentiment": 0.5,
+            "avg_neutral_sentiment": 0.4 * youtube + 0.5,
+            "avg_negative_sentiment": 0.6 * youtube,
+            "avg_compound_score": -0.5 * youtube + 0.02,
+            "total_weight": youtube + 1,
+            "positive_count": 0.0,
+            "negative_count": youtube,
+            "neutral_count": 1.0,
+            "data_points": 2,
+        },
+    )
+    assert sums["ETH"] == pytest.approx(
+        {
+            "avg_positive_sentiment": 0.6,
+            "avg_neutral_sentiment": 0.4,
+            "avg_negative_sentiment": 0.0,
+            "avg_compound_score": 0.7,
+            "total_weight": 1.0,
+            "positive_count": 1.0,
+            "negative_count": 0.0,
+            "neutral_count": 0.0,
+            "data_points": 1,
+        },
+    )
+
+
+def test_sentiment_buckets_match_sql_aggregates(init_sentiment):
+    earliest = datetime.today() - timedelta(days=2)
+    score_unscored_sentiment(earliest)
+    expected = aggregate_social_sentiment(earliest)
+
+    # Refreshing replaces buckets, so data is never counted twice
+    assert refresh_sentiment_buckets(earliest) == 2
+    assert refresh_sentiment_buckets(earliest) == 2
+    assert CryptoSentimentBucket.query.count() == 2
+    sums = sum_sentiment_buckets(earliest)
+
+    assert sums.keys() == expected.keys()
+    for symbol, aggregates in sums.items():
+        for key, value in aggregates.items():
+            assert value == pytest.approx(expected[symbol][key])
+    assert sum_sentiment_buckets(earliest, until=earliest) == {}
+
+
+def test_sentiment_buckets_refresh_recent_hours(init_sentiment):
+    score_unscored_sentiment(datetime.today() - timedelta(days=2))
+    CryptoRedditDataFactory(
+        symbol="ETH",
+        source_id=CryptoRedditData.query.one().source_id,
+        text="eth is awful",
+        timestamp=datetime.now() - timedelta(days=1, hours=2),
+        sentiment_pos=0.0,
+        sentiment_neu=0.0,
+        sentiment_neg=1.0,
+        sentiment_compound=-0.5,
+    )
+
+    refresh_sentiment_buckets(datetime.now() - timedelta(hours=1))
+    week = datetime.now() - timedelta(days=7)
+    assert sum_sentiment_buckets(week)["ETH"]["data_points"] == 1
+
+    # Older hours are only recounted when asked for
+    refresh_sentiment_buckets(week)
+    eth = sum_sentiment_buckets(week)["ETH"]
+    assert eth["data_points"] == 2
+    assert eth["negative_count"] == 1.0
+
+
+def test_sentiment_buckets_include_late_news(init_sentiment):
+    week = datetime.today() - timedelta(days=7)
+    analyse_and_store_sentiment(7)
+    assert sum_sentiment_buckets(week)["BTC"]["data_points"] == 2
+
+    # Yesterday's news is stored after its hours were bucketed
+    CryptoNewsDataFactory(
+        symbol="BTC",
+        source_url="https://madeup.com/btc-late",
+        timestamp=datetime.now(timezone.utc) - timedelta(hours=30),
+    )
+    since = stale_sentiment_buckets_since(week)
+    assert since <= datetime.now(timezone.utc) - timedelta(hours=30)
+    score_unscored_sentiment(week)
+    refresh_sentiment_buckets(since)
+
+    assert sum_sentiment_buckets(week)["BTC"]["data_points"] == 3
+
+
+def test_score_texts_in_worker_processes():
+    texts = [
+        "Bitcoin is horrible",
+        "I think eth is just neat :)",
+        "BTC going to crash again!",
+        "",
+        "HODL!!! to the moon",
+    ]
+
+    scores = score_texts(texts, workers=2, chunk_size=2)
+
+    assert scores.shape == (5, 4)
+    assert scores.tolist() == [
+        list(score_sentiment(text).values()) for text in texts
+    ]
+    assert score_texts([]).shape == (0, 4)
+
+
+@patch("app.services.sentiment.scoring.score_texts", wraps=score_texts)
+def test_sentiment_score_cache(mock_score_texts):
+    texts = ["BTC to the moon!", "BTC  to the\nmoon!", "Bitcoin is horrible"]
+    cache = SentimentScoreCache(maxsize=1)
+
+    scores = cache.score(texts)
+
+    # Texts differing only in whitespace share one entry
+    assert text_hash(texts[0]) == text_hash(texts[1])
+    assert scores.tolist()[0] == scores.tolist()[1]
+    assert len(mock_score_texts.call_args.args[0]) == 2
+    assert CachedSentimentScore.query.count() == 2
+
+    # A new process finds the scores in the shared store
+    fresh = SentimentScoreCache(maxsize=1)
+    assert fresh.score(texts).tolist() == scores.tolist()
+    assert mock_score_texts.call_count == 2
+    assert mock_score_texts.call_args.args[0] == []
+
+    stats = fresh.stats()
+    assert (stats.store_hits, stats.scored, stats.memory.evictions) == (
+        2,
+        0,
+        1,
+    )
+    assert stats.hit_rate == 1.0
+    assert cache.stats().hit_rate == 0.0
+
+
+def test_sentiment_score_cache_leaves_session_alone(db_session):
+    # Callers such as the Reddit ingest never commit the session
+    db_session.commit()
+
+    SentimentScoreCache().score(["BTC to the moon!"])
+    SentimentScoreCache().score(["BTC to the moon!", "ETH is dead"])
+
+    assert not db_session().in_transaction()
+    assert CachedSentimentScore.query.count() == 2
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from app.models.sentiment import CachedSentimentScore
+from app.services.sentiment.engines import (
+    LexiconEngine,
+    SentimentEngine,
+    VaderEngine,
+    get_sentiment_engine,
+)
+from app.services.sentiment.scoring import SentimentScoreCache
+
+TEXTS = [
+    "VADER is smart, handsome, and funny.",
+    "VADER is smart, handsome, and funny!",
+    "VADER is very smart, handsome, and funny.",
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "At least it isn't a horrible book.",
+    "The plot was good, but the characters are uncompelling.",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "bitcoin to the moon🚀🚀",
+    "no good no way",
+    "never so happy",
+    "without doubt great",
+    "least good",
+    "why???? is this so bad",
+    "great?? ok",
+    "I don't love it",
+    "this is not a scam, it's AMAZING",
+    "",
+    "   ",
+]
+
+
+def test_lexicon_engine_matches_vader():
+    vader = VaderEngine().score(TEXTS, workers=1)
+    lexicon = LexiconEngine().score(TEXTS)
+
+    assert lexicon.shape == (len(TEXTS), 4)
+    for text, expected, scores in zip(TEXTS, vader, lexicon):
+        assert scores == pytest.approx(expected), text
+    assert LexiconEngine().score([]).shape == (0, 4)
+
+
+def test_sentiment_score_cache_keys_by_engine():
+    texts = ["The book was only kind of good."]
+    vader = SentimentScoreCache(engine=get_sentiment_engine("vader"))
+    lexicon = SentimentScoreCache(engine=get_sentiment_engine("lexicon"))
+
+    vader_scores = vader.score(texts)
+    lexicon_scores = lexicon.score(texts)
+
+    # VADER's "kind of" idiom is not implemented by the lexicon engine
+    assert not np.allclose(vader_scores, lexicon_scores)
+    assert CachedSentimentScore.query.count() == 2
+    assert SentimentScoreCache().score(texts).tolist() == (
+        vader_scores.tolist()
+    )
+
+
+def test_unknown_sentiment_engine():
+    with pytest.raises(ValueError, match="Unknown sentiment engine"):
+        get_sentiment_engine("textblob")
+
+
+def test_engine_without_score_cannot_be_created():
+    class IncompleteEngine(SentimentEngine):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="score"):
+        IncompleteEngine()
@@ -0,0 +1,139 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from app.cli.cron import rebuild_sentiment_command
+from app.models.crypto import CryptoRedditData, CryptoSentimentAggregateData
+from app.services.sentiment.rebuild import (
+    SentimentRebuildReport,
+    _score_day,
+    day_partitions,
+    rebuild_sentiment,
+)
+from app.services.sentiment.scoring import score_sentiment, score_texts
+from tests.factories.coingecko import CryptoCoingeckoSentimentDataFactory
+from tests.factories.crypto import (
+    CryptoAssetFactory,
+    CryptoMarketDataFactory,
+    CryptoSourceFactory,
+)
+from tests.factories.reddit import CryptoRedditDataFactory
+
+DAY = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def reddit_history(app):
+    btc = CryptoAssetFactory(symbol="BTC", coingecko_id="bitcoin")
+    CryptoMarketDataFactory(
+        asset=btc,
+        source=CryptoSourceFactory(name="Binance"),
+    )
+    CryptoCoingeckoSentimentDataFactory(
+        symbol="BTC",
+        timestamp=DAY - timedelta(days=7),
+    )
+    source = CryptoSourceFactory(name="reddit", type="social")
+    texts = ["BTC is great", "BTC is horrible", "BTC is wonderful"]
+    for offset, text in enumerate(texts):
+        CryptoRedditDataFactory(
+            symbol="BTC",
+            source_id=source.id,
+            text=text,
+            timestamp=DAY + timedelta(days=offset, hours=12),
+        )
+    return texts
+
+
+def test_day_partitions():
+    days = day_partitions(DAY + timedelta(hours=5), DAY + timedelta(days=2))
+
+    assert days == [DAY, DAY + timedelta(days=1)]
+    assert day_partitions(DAY, DAY) == []
+
+
+def test_rebuild_sentiment(reddit_history):
+    report = rebuild_sentiment(
+        DAY,
+        DAY + timedelta(days=3),
+        workers=1,
+        window_days=1,
+    )
+
+    assert (report.days, report.rows, report.failed) == (3, 3, 0)
+    # Texts stored without scores are scored first
+    assert report.scored == 3
+    rows = CryptoSentimentAggregateData.query.order_by(
+        CryptoSentimentAggregateData.timestamp,
+    ).all()
+    assert [row.timestamp for row in rows] == [
+        DAY + timedelta(days=offset) for offset in (1, 2, 3)
+    ]
+    # Each day only covers its own window
+    assert [row.avg_compound_sentiment for row in rows] == [
+        pytest.approx(score_sentiment(text)["sentiment_compound"])
+        for text in reddit_history
+    ]
+    assert rows[0].earliest_post == DAY
+
+    # Rebuilding again replaces the stored days
+    report = rebuild_sentiment(
+        DAY,
+        DAY + timedelta(days=3),
+        workers=1,
+        window_days=2,
+    )
+    assert (report.rows, report.scored) == (3, 0)
+    assert CryptoSentimentAggregateData.query.count() == 3
+
+
+def test_rebuild_sentiment_rescores_with_engine(reddit_history):
+    report = rebuild_sentiment(
+        DAY + timedelta(days=1),
+        DAY + timedelta(days=2),
+        workers=1,
+        window_days=1,
+        engine="lexicon",
+    )
+
+    # The day before the first one is scored too, as its window covers it
+    assert (report.days, report.scored) == (1, 2)
+    assert (
+        CryptoRedditData.query.filter(
+            CryptoRedditData.sentiment_compound.is_not(None),
+        ).count()
+        == 2
+    )
+
+
+@pytest.mark.parametrize("engine", [None, "vader"])
+def test_rebuild_workers_score_in_process(reddit_history, engine):
+    module = "engines" if engine else "scoring"
+    with patch(
+        f"app.services.sentiment.{module}.score_texts",
+        wraps=score_texts,
+    ) as mock_score:
+        assert _score_day(DAY, engine) == 1
+
+    # Any other worker count would start a pool in each worker process
+    texts, workers = mock_score.call_args.args
+    assert (texts, workers) == (reddit_history[:1], 1)
+
+
+@patch("app.cli.cron.rebuild_sentiment")
+def test_rebuild_sentiment_command(mock_rebuild, app):
+    mock_rebuild.return_value = SentimentRebuildReport(days=2, rows=300)
+
+    result = app.test_cli_runner().invoke(
+        rebuild_sentiment_command,
+        ["--from", "2025-03-01", "--to", "2025-03-03", "--workers", "4"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Rebuilt 300 aggregates for 2 days" in result.output
+    mock_rebuild.assert_called_once_with(
+        datetime(2025, 3, 1),
+        datetime(2025, 3, 3),
+        workers=4,
+        window_days=2,
+        engine=None,
+    )
@@ -0,0 +1,62 @@
+from datetime import timezone
+from decimal import Decimal
+import pandas as pd
+from sqlalchemy import select
+
+from app.models.crypto import CryptoMarketData
+from app.utils.bulk import BulkInsertResult, copy_dataframe
+from tests.factories.crypto import CryptoAssetFactory, CryptoSourceFactory
+
+
+def _market_rows(source_id, start: str, periods: int) -> pd.DataFrame:
+    index = pd.date_range(
+        start=start,
+        periods=periods,
+        freq="h",
+        tz=timezone.utc,
+    )
+    return pd.DataFrame(
+        {
+            'symbol': "BTC",
+            'source_id': source_id,
+            'timestamp': index,
+            'interval': "1h",
+            'price': [30000.5 + i for i in range(periods)],
+        },
+    )
+
+
+def test_copy_inserts_and_skips_conflicts(db_session):
+    CryptoAssetFactory(symbol="BTC", name="Bitcoin", ranking=1)
+    source = CryptoSourceFactory(name="Binance")
+
+    first = copy_dataframe(
+        CryptoMarketData,
+        _market_rows(source.id, "2025-01-01", 3),
+    )
+    assert first == BulkInsertResult(inserted=3, skipped=0)
+
+    # Overlaps the last two hours of the first batch
+    second = copy_dataframe(
+        CryptoMarketData,
+        _market_rows(source.id, "2025-01-01 01:00", 4),
+    )
+    assert second == BulkInsertResult(inserted=2, skipped=2)
+
+    rows = db_session.scalars(
+        select(CryptoMarketData).order_by(CryptoMarketData.timestamp),
+    ).all()
+    assert len(rows) == 5
+    assert rows[0].price == Decimal("30000.5")
+    # Server default fills columns missing from the frame
+    assert rows[0].ingested_at is not None
+
+
+def test_copy_empty_frame_is_noop():
+    result = copy_dataframe(CryptoMarketData, pd.DataFrame())
+    assert result == BulkInsertResult()
+
+
+def test_results_add_up():
+    total = BulkInsertResult(1, 2) + BulkInsertResult(3, 4)
+    assert total == BulkInsertResult(inserted=4, skipped=6)
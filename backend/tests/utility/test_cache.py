@@ -0,0 +1,79 @@
+import redis
+
+from app.utils.cache import LRUCache, ReferenceSetCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key, (None,))[0]
+
+    def set(self, key, value, ex=None):
+        self.store[key] = (value.encode(), ex)
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise redis.ConnectionError("connection refused")
+
+    def set(self, key, value, ex=None):
+        raise redis.ConnectionError("connection refused")
+
+
+def test_disk_cache_is_shared_until_ttl(tmp_path, fake_clock):
+    clock = fake_clock
+    clock.now = 1000.0
+    writer = ReferenceSetCache("pairs", 60, directory=tmp_path, clock=clock)
+    reader = ReferenceSetCache("pairs", 60, directory=tmp_path, clock=clock)
+    assert reader.get() is None
+
+    writer.set(["ETHUSDT", "BTCUSDT"])
+    cached = reader.get()
+    assert cached.values == frozenset({"BTCUSDT", "ETHUSDT"})
+    assert cached.fetched_at == 1000.0
+
+    clock.now += 60
+    assert reader.get() is None
+
+
+def test_redis_cache_expires_with_ttl(tmp_path):
+    cache = ReferenceSetCache("pairs", 60, directory=tmp_path)
+    cache._redis = FakeRedis()
+
+    cache.set({"BTCUSDT"})
+
+    assert cache._redis.store["pairs"][1] == 60
+    assert cache.get().values == frozenset({"BTCUSDT"})
+    assert not (tmp_path / "pairs.json").exists()
+
+
+def test_redis_errors_are_a_miss(tmp_path):
+    cache = ReferenceSetCache("pairs", 60, directory=tmp_path)
+    cache._redis = BrokenRedis()
+
+    assert cache.set({"BTCUSDT"}).values == frozenset({"BTCUSDT"})
+    assert cache.get() is None
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (
+        3,
+        1,
+        1,
+        2,
+    )
+    assert stats.hit_rate == 0.75
+    assert LRUCache(maxsize=1).stats().hit_rate == 0.0
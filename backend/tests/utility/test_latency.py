@@ -0,0 +1,30 @@
+import pytest
+
+from app.utils.latency import LatencyHistogram
+
+
+def test_percentiles_are_bucket_accurate():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.record(0.010)
+    for _ in range(10):
+        histogram.record(0.500)
+
+    assert histogram.count == 100
+    assert histogram.percentile(0.5) == pytest.approx(0.010, rel=0.25)
+    assert histogram.percentile(0.95) == pytest.approx(0.500, rel=0.25)
+
+
+def test_empty_histogram_has_no_percentile():
+    assert LatencyHistogram().percentile(0.95) is None
+
+
+def test_old_samples_decay():
+    histogram = LatencyHistogram(max_samples=100)
+    for _ in range(99):
+        histogram.record(1.0)
+    for _ in range(150):
+        histogram.record(0.010)
+
+    assert histogram.count < 100
+    assert histogram.percentile(0.5) == pytest.approx(0.010, rel=0.25)
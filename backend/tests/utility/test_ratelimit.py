@@ -0,0 +1,30 @@
+from app.utils.ratelimit import TokenBucket
+
+
+def test_burst_up_to_capacity_does_not_wait(fake_clock):
+    clock = fake_clock
+    bucket = TokenBucket(capacity=4, rate=2, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.acquire(2), bucket.acquire(2)] == [0.0, 0.0]
+    assert clock.slept == []
+
+
+def test_waits_for_shortfall_at_refill_rate(fake_clock):
+    clock = fake_clock
+    bucket = TokenBucket(capacity=4, rate=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire(4)
+
+    assert bucket.acquire(2) == 1.0
+    # The next caller queues behind the reservation already made
+    clock.now = 1.0
+    assert bucket.acquire(2) == 1.0
+
+
+def test_idle_time_refills_up_to_capacity(fake_clock):
+    clock = fake_clock
+    bucket = TokenBucket(capacity=4, rate=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire(4)
+
+    clock.now = 60.0
+    assert bucket.acquire(4) == 0.0
+    assert bucket.acquire(1) == 0.5